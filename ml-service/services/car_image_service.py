@@ -4,9 +4,72 @@ Car Image Service - 차량 이미지 매핑
 브랜드/모델별 대표 이미지 URL 관리
 - 로컬 이미지 파일 사용 (235개 차량 이미지)
 - 모델명 유사도 기반 이미지 검색
+- 매핑에 없는 모델은 이미지 폴더 매니페스트에서 검색
+- 부분 매칭은 사전 구성한 키 인덱스 + (브랜드, 모델) 결과 메모이제이션
 """
 
-from typing import Dict, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from services.image_manifest import get_image_manifest
+
+# (브랜드, 모델) → 이미지 URL 메모 크기
+MODEL_IMAGE_CACHE_SIZE = 4096
+
+
+class ImageKeyMatcher:
+    """
+    모델명 → MODEL_IMAGES 키 부분 매칭 (키 목록당 1회 빌드)
+    
+    매칭 규칙:
+        1) 키가 모델명에 포함 → 가장 긴 키 (예: "더 뉴 쏘울 부스터" → "쏘울 부스터")
+        2) 모델명이 키에 포함 → 가장 짧은 키
+        같은 길이에서는 MODEL_IMAGES 등록 순서가 앞선 키
+    """
+    
+    def __init__(self, keys: Iterable[str]):
+        self.keys: List[str] = list(keys)
+        self._order: Dict[str, int] = {}
+        for idx, key in enumerate(self.keys):
+            self._order.setdefault(key, idx)
+        # 1) 모델명의 부분 문자열을 키 길이별로 조회 → 키 개수와 무관
+        self._lengths = sorted({len(key) for key in self.keys if key}, reverse=True)
+        # 2) 모델명 포함 키 검색용 결합 문자열과 키 시작 오프셋
+        self._joined = '\x00'.join(self.keys)
+        self._offsets: List[int] = []
+        offset = 0
+        for key in self.keys:
+            self._offsets.append(offset)
+            offset += len(key) + 1
+    
+    def _contained_in(self, model: str) -> Optional[str]:
+        for length in self._lengths:
+            best = None
+            for start in range(len(model) - length + 1):
+                idx = self._order.get(model[start:start + length])
+                if idx is not None and (best is None or idx < best):
+                    best = idx
+            if best is not None:
+                return self.keys[best]
+        return None
+    
+    def _containing(self, model: str) -> Optional[str]:
+        best = None
+        pos = self._joined.find(model)
+        while pos != -1:
+            idx = bisect_right(self._offsets, pos) - 1
+            rank = (len(self.keys[idx]), idx)
+            if best is None or rank < best:
+                best = rank
+            pos = self._joined.find(model, pos + 1)
+        return self.keys[best[1]] if best else None
+    
+    def match(self, model: str) -> Optional[str]:
+        """가장 적합한 키 (없으면 None)"""
+        if not model:
+            return None
+        return self._contained_in(model) or self._containing(model)
 
 class CarImageService:
     """차량 이미지 매핑 서비스"""
@@ -516,17 +579,31 @@ class CarImageService:
     DEFAULT_CAR_IMAGE = "https://cdn-icons-png.flaticon.com/512/3774/3774278.png"
     DEFAULT_BRAND_LOGO = "https://cdn-icons-png.flaticon.com/512/3774/3774278.png"
     
+    # 부분 매칭 인덱스 (MODEL_IMAGES 변경 시 재생성)
+    _matcher: Optional[ImageKeyMatcher] = None
+    
     @classmethod
     def get_model_image(cls, brand: str, model: str) -> str:
-        """모델별 이미지 URL 반환"""
+        """모델별 이미지 URL 반환 (결과 메모이제이션 - 매니페스트 갱신 시 자동 무효화)"""
+        return _cached_model_image(brand, model, get_image_manifest().version)
+    
+    @classmethod
+    def _find_model_image(cls, brand: str, model: str) -> str:
         # 정확한 모델명 매치
         if model in cls.MODEL_IMAGES:
             return cls.MODEL_IMAGES[model]
         
+        # 이미지 폴더의 실제 파일명 매치 (매핑에 없는 신규 이미지 포함)
+        entry = get_image_manifest().find_model_image(brand, model)
+        if entry is not None:
+            return entry.url
+        
         # 부분 매칭 시도
-        for key, url in cls.MODEL_IMAGES.items():
-            if key in model or model in key:
-                return url
+        if cls._matcher is None:
+            cls._matcher = ImageKeyMatcher(cls.MODEL_IMAGES)
+        key = cls._matcher.match(model)
+        if key is not None:
+            return cls.MODEL_IMAGES[key]
         
         # 브랜드 로고 반환
         return cls.get_brand_logo(brand)
@@ -542,17 +619,26 @@ class CarImageService:
         model_image = cls.get_model_image(brand, model)
         brand_logo = cls.get_brand_logo(brand)
         
+        has_real_image = model_image.startswith("/car-images/")
+        
         return {
             "model_image": model_image,
             "brand_logo": brand_logo,
-            "has_real_image": model in cls.MODEL_IMAGES,
-            "fallback_type": "model" if model in cls.MODEL_IMAGES else "brand"
+            "has_real_image": has_real_image,
+            "fallback_type": "model" if has_real_image else "brand"
         }
     
     @classmethod
     def add_model_image(cls, model: str, image_url: str):
         """새 모델 이미지 추가 (런타임)"""
         cls.MODEL_IMAGES[model] = image_url
+        cls._matcher = None
+        _cached_model_image.cache_clear()
+
+
+@lru_cache(maxsize=MODEL_IMAGE_CACHE_SIZE)
+def _cached_model_image(brand: str, model: str, manifest_version: int) -> str:
+    return CarImageService._find_model_image(brand, model)
 
 
 # 싱글톤 인스턴스
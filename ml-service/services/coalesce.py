@@ -0,0 +1,96 @@
+"""
+동일 요청 합치기 (Single-Flight Coalescing)
+=========================================
+앱 재렌더링/재시도로 같은 예측·타이밍 요청이 짧은 간격으로 여러 번 들어오는 경우
+- 실행 중인 같은 요청이 있으면 새로 계산하지 않고 그 결과를 함께 기다림
+- 끝난 결과는 짧은 TTL 동안 보관해 직후의 중복 요청에도 재사용
+- 합치기는 이벤트 루프에서 처리 → 기다리는 요청이 실행 풀 스레드를 점유하지 않음
+
+인자는 함수 시그니처에 바인딩해 정규화하므로 위치/키워드 인자 차이와 관계없이 같은 키가 된다.
+결과 객체는 요청 간에 공유되므로 호출자는 수정하지 않고 읽기만 한다.
+
+사용:
+    predict_call = Coalescer('predict', prediction_service.predict, workload='cpu')
+    result = await predict_call(brand, model, year, mileage, fuel=fuel)
+"""
+import asyncio
+import inspect
+import json
+import os
+from typing import Any, Callable, Dict
+
+from services.dispatch import get_dispatcher
+from services.response_cache import LRUCache
+
+# 완료 결과 보관 시간 / 최대 항목 수
+COALESCE_TTL_SECONDS = float(os.getenv("COALESCE_TTL_SECONDS", "3"))
+COALESCE_MAX_ENTRIES = 1024
+
+
+class Coalescer:
+    """동기 함수 fn을 워크로드 풀에서 실행하되 같은 인자의 호출은 합침"""
+
+    def __init__(self, name: str, fn: Callable, workload: str = 'cpu',
+                 ttl_seconds: float = COALESCE_TTL_SECONDS, max_entries: int = COALESCE_MAX_ENTRIES):
+        self.name = name
+        self.fn = fn
+        self.workload = workload
+        self._signature = inspect.signature(fn)
+        self._results = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds) if ttl_seconds > 0 else None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {'calls': 0, 'executions': 0, 'coalesced': 0, 'cache_hits': 0, 'errors': 0}
+
+    def _key(self, args: tuple, kwargs: dict) -> str:
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return json.dumps(bound.arguments, sort_keys=True, ensure_ascii=False, default=repr)
+
+    async def __call__(self, *args, **kwargs) -> Any:
+        self.stats['calls'] += 1
+        key = self._key(args, kwargs)
+
+        if self._results is not None:
+            cached = self._results.get(key)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(key, args, kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.stats['coalesced'] += 1
+        return await asyncio.shield(task)
+
+    async def _execute(self, key: str, args: tuple, kwargs: dict) -> Any:
+        self.stats['executions'] += 1
+        try:
+            result = await get_dispatcher().run(self.workload, self.fn, *args, **kwargs)
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+        if self._results is not None and result is not None:
+            self._results.set(key, result)
+        return result
+
+    def _done(self, key: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # 기다리는 요청이 모두 끊긴 경우 "never retrieved" 경고 방지
+
+    def clear(self):
+        """완료 결과 보관분 비우기 (모델 교체 등 결과가 바뀌는 시점) - 실행 중인 요청은 그대로"""
+        if self._results is not None:
+            self._results.clear()
+
+    def get_stats(self) -> Dict:
+        calls = self.stats['calls']
+        shared = self.stats['coalesced'] + self.stats['cache_hits']
+        return {
+            **self.stats,
+            'inflight': len(self._inflight),
+            'cached': self._results.get_stats()['entries'] if self._results is not None else 0,
+            'coalescing_ratio': round(shared / calls, 3) if calls else 0.0,
+        }
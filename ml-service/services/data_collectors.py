@@ -39,10 +39,94 @@ except ImportError as e:
     print(f"[data_collectors] Import warning: {e}")
 
 
+# 기본값 (수집 실패 / 모듈 없음)
+DEFAULT_MACRO = {'interest_rate': 3.5, 'exchange_rate': 1350, 'oil_price': 75, 'oil_trend': 'stable'}
+DEFAULT_TREND = {'trend_change': 0, 'current_index': 50}
+DEFAULT_SCHEDULE = {'upcoming_releases': []}
+
+# 소스별 캐시 TTL (초) - 거시경제/검색 트렌드는 하루 단위로 갱신됨
+SNAPSHOT_TTLS = {
+    'macro': 6 * 3600,
+    'trend': 6 * 3600,
+    'schedule': 3600,
+}
+SNAPSHOT_PATH = Path(__file__).parent.parent.parent / 'data' / 'timing_snapshot.json'
+
+# 기본값 대체로 간주하는 출처 표시
+_FALLBACK_SOURCES = ('fallback', 'default')
+# 검색 트렌드 실측 출처 (그 외는 NaverTrendAPI 내부 대체값 - 블로그 검색량 추정 등)
+_TREND_API_SOURCE = '네이버 데이터랩 API'
+
+
+def _fetch_macro():
+    """거시경제 데이터 (금리, 환율, 유가) - (data, ok)"""
+    if not RealMacroEconomicCollector:
+        return dict(DEFAULT_MACRO), False
+    macro = RealMacroEconomicCollector(os.getenv('BOK_API_KEY'))
+    indicators = macro.get_all_indicators()
+    data = {
+        'interest_rate': indicators['interest_rate']['rate'],
+        'exchange_rate': indicators['exchange_rate']['rate'],
+        'oil_price': indicators['oil_price']['price'],
+        'oil_trend': indicators['oil_price']['trend']
+    }
+    # 세 지표 모두 기본값이면 실패로 간주 (기존 정상 스냅샷 유지)
+    ok = any(indicators[k].get('source') not in _FALLBACK_SOURCES
+             for k in ('interest_rate', 'exchange_rate', 'oil_price'))
+    print(f"[DATA] 거시경제 갱신: 금리 {data['interest_rate']}%, 환율 {data['exchange_rate']}원, 유가 ${data['oil_price']}")
+    return data, ok
+
+
+def _fetch_trend(car_model):
+    """검색 트렌드 (네이버 데이터랩) - (data, ok)"""
+    naver_id = os.getenv('NAVER_CLIENT_ID')
+    naver_secret = os.getenv('NAVER_CLIENT_SECRET')
+    if not (NaverTrendAPI and naver_id and naver_secret):
+        return dict(DEFAULT_TREND), False
+    trend_api = NaverTrendAPI(naver_id, naver_secret)
+    data = trend_api.get_search_trend(car_model)
+    # API 오류(401/403/타임아웃 등) 시 추정값으로 대체되므로 실패로 간주 (기존 정상 스냅샷 유지)
+    ok = data.get('source') == _TREND_API_SOURCE
+    print(f"[DATA] 검색 트렌드 갱신: {car_model} {data.get('change_pct', 'N/A')}% 변화 ({data.get('source')})")
+    return data, ok
+
+
+def _fetch_schedule(car_model):
+    """신차 일정 (CSV) - (data, ok)"""
+    if not NewCarScheduleManager:
+        return dict(DEFAULT_SCHEDULE), False
+    schedule = NewCarScheduleManager()
+    return schedule.check_upcoming_release(car_model), True
+
+
+_snapshot_cache = None
+
+
+def get_snapshot_cache():
+    """거시경제/트렌드/신차일정 스냅샷 캐시 (싱글톤)"""
+    global _snapshot_cache
+    if _snapshot_cache is None:
+        from services.snapshot_cache import SnapshotCache
+        _snapshot_cache = SnapshotCache(SNAPSHOT_TTLS, SNAPSHOT_PATH)
+    return _snapshot_cache
+
+
+def _cached(source, key, fetch, default):
+    """스냅샷 캐시 조회 - 캐시 오류 시 기본값"""
+    try:
+        return get_snapshot_cache().get(source, key, fetch, default)
+    except Exception as e:
+        print(f"[WARN] {source} snapshot failed: {e}")
+        return default, 'fallback'
+
+
 def collect_real_data_only(car_model):
     """
     실제 데이터만 수집 (100% 객관적)
     
+    외부 API 결과는 스냅샷 캐시(소스별 TTL, 만료 시 기존 값 응답 + 백그라운드 갱신)에서 조회하므로
+    요청 지연이 외부 API 왕복 시간에 좌우되지 않는다.
+    
     Args:
         car_model: 차량 모델명
         
@@ -56,70 +140,23 @@ def collect_real_data_only(car_model):
     # Import가 없으면 기본값 반환
     if not _imports_available:
         return {
-            'macro': {'interest_rate': 3.5, 'exchange_rate': 1350, 'oil_price': 75, 'oil_trend': 'stable'},
-            'trend': {'trend_change': 0, 'current_index': 50},
-            'schedule': {'upcoming_releases': []},
+            'macro': dict(DEFAULT_MACRO),
+            'trend': dict(DEFAULT_TREND),
+            'schedule': dict(DEFAULT_SCHEDULE),
             'car_model': car_model,
             'collection_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'data_sources': {'macro': 'fallback', 'trend': 'fallback', 'schedule': 'fallback'}
         }
     
-    print("=" * 80)
-    print(f"[DATA] Collecting real data for: {car_model}")
-    print("=" * 80)
-    
-    # API 키
-    bok_key = os.getenv('BOK_API_KEY')
-    naver_id = os.getenv('NAVER_CLIENT_ID')
-    naver_secret = os.getenv('NAVER_CLIENT_SECRET')
-    
-    macro_data = {'interest_rate': 3.5, 'exchange_rate': 1350, 'oil_price': 75, 'oil_trend': 'stable'}
-    trend_data = {'trend_change': 0, 'current_index': 50}
-    schedule_data = {'upcoming_releases': []}
-    
-    # 1. 거시경제 데이터 (금리, 환율, 유가)
-    try:
-        if RealMacroEconomicCollector:
-            macro = RealMacroEconomicCollector(bok_key)
-            indicators = macro.get_all_indicators()
-            macro_data = {
-                'interest_rate': indicators['interest_rate']['rate'],
-                'exchange_rate': indicators['exchange_rate']['rate'],
-                'oil_price': indicators['oil_price']['price'],
-                'oil_trend': indicators['oil_price']['trend']
-            }
-    except Exception as e:
-        print(f"[WARN] Macro data collection failed: {e}")
+    # 1. 거시경제 데이터 (금리, 환율, 유가) - 모델 무관, 단일 키
+    macro_data, macro_state = _cached('macro', 'all', _fetch_macro, dict(DEFAULT_MACRO))
     
     # 2. 검색 트렌드 (네이버 데이터랩)
-    try:
-        if NaverTrendAPI and naver_id and naver_secret:
-            trend_api = NaverTrendAPI(naver_id, naver_secret)
-            trend_data = trend_api.get_search_trend(car_model)
-    except Exception as e:
-        print(f"[WARN] Trend data collection failed: {e}")
+    trend_data, trend_state = _cached('trend', car_model, lambda: _fetch_trend(car_model), dict(DEFAULT_TREND))
     
     # 3. 신차 일정
-    try:
-        if NewCarScheduleManager:
-            schedule = NewCarScheduleManager()
-            schedule_data = schedule.check_upcoming_release(car_model)
-    except Exception as e:
-        print(f"[WARN] Schedule data collection failed: {e}")
-    
-    print()
-    print("=" * 80)
-    print("✅ 실제 데이터 수집 완료!")
-    print("=" * 80)
-    print()
-    
-    print("📌 수집된 데이터:")
-    print(f"  ✅ 금리: {macro_data.get('interest_rate', 'N/A')}%")
-    print(f"  ✅ 환율: {macro_data.get('exchange_rate', 'N/A')}원")
-    print(f"  ✅ 유가: ${macro_data.get('oil_price', 'N/A')}")
-    print(f"  ✅ 검색 트렌드: {trend_data.get('trend_change', 'N/A')}% 변화")
-    print(f"  ✅ 신차 일정: {len(schedule_data.get('upcoming_releases', []))}개")
-    print()
+    schedule_data, schedule_state = _cached('schedule', car_model, lambda: _fetch_schedule(car_model),
+                                            dict(DEFAULT_SCHEDULE))
     
     return {
         'macro': macro_data,
@@ -131,7 +168,8 @@ def collect_real_data_only(car_model):
             'macro': '한국은행 API + Yahoo Finance',
             'trend': '네이버 데이터랩 API',
             'schedule': 'CSV 데이터'
-        }
+        },
+        'cache_state': {'macro': macro_state, 'trend': trend_state, 'schedule': schedule_state}
     }
 
 
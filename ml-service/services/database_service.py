@@ -6,16 +6,103 @@ Database Service - SQLite 기반 영구 저장소
 - AI 로그 (네고대본, 시그널, 허위매물)
 - 사용자 즐겨찾기/알림
 - 통계 데이터 (신뢰도, 일별 요청수)
+
+연결: 스레드별 읽기 연결 + 단일 writer 스레드 (services.sqlite_pool, WAL 모드)
+분석 이력 / AI 로그는 queue_analysis / queue_ai_log 로 write-behind 배치 저장 가능
+(services.write_behind, 조회 결과에는 최대 FLUSH_INTERVAL_MS 지연 반영)
 """
 
 import sqlite3
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
-from collections import defaultdict
+from collections import Counter, defaultdict
 import threading
 
+from services.sqlite_pool import SQLitePool
+from services.write_behind import WriteBehindQueue
+
+_ANALYSIS_INSERT = '''
+    INSERT INTO analysis_history
+    (user_id, brand, model, year, mileage, fuel_type, predicted_price,
+     confidence, timing_score, signal, detail_url, request_data, response_data, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_AI_LOG_INSERT = '''
+    INSERT INTO ai_logs
+    (user_id, log_type, car_info, request_data, response_data, success, ai_model, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# 일별 통계 (SET 절의 컬럼은 갱신 전 값)
+_DAILY_STATS_UPSERT = '''
+    INSERT INTO daily_stats (date, request_count, avg_confidence, total_confidence, confidence_count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(date) DO UPDATE SET
+        request_count = request_count + excluded.request_count,
+        total_confidence = total_confidence + excluded.total_confidence,
+        confidence_count = confidence_count + excluded.confidence_count,
+        avg_confidence = (total_confidence + excluded.total_confidence)
+                         / (confidence_count + excluded.confidence_count),
+        updated_at = CURRENT_TIMESTAMP
+'''
+
+_MODEL_STATS_UPSERT = '''
+    INSERT INTO model_stats (model_name, view_count)
+    VALUES (?, ?)
+    ON CONFLICT(model_name) DO UPDATE SET
+        view_count = view_count + excluded.view_count,
+        updated_at = CURRENT_TIMESTAMP
+'''
+
+
+# ===== 롤업 (쓰기 시 증분 갱신 → 대시보드는 O(일수) 행만 조회) =====
+# kind: 'analysis' (시세 분석) / 'view' (매물 조회) / 'ai_log' (AI 로그)
+_ROLLUP_DAILY_UPSERT = '''
+    INSERT INTO rollup_daily (date, kind, count) VALUES (?, ?, ?)
+    ON CONFLICT(date, kind) DO UPDATE SET count = count + excluded.count
+'''
+
+_ROLLUP_HOURLY_UPSERT = '''
+    INSERT INTO rollup_hourly (hour, kind, count) VALUES (?, ?, ?)
+    ON CONFLICT(hour, kind) DO UPDATE SET count = count + excluded.count
+'''
+
+# 누적 카운터: 'analysis', 'view', 'ai_log', 'ai_log:<log_type>', 'confidence_sum', 'confidence_count'
+_ROLLUP_COUNTER_UPSERT = '''
+    INSERT INTO rollup_counters (key, value) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = value + excluded.value
+'''
+
+# 원본 테이블 → 롤업 테이블 (created_at: 'YYYY-MM-DD HH:MM:SS' UTC)
+_ROLLUP_SOURCES = {'analysis': 'analysis_history', 'view': 'vehicle_views', 'ai_log': 'ai_logs'}
+
+
+def _update_rollups(conn: sqlite3.Connection, kind: str, timestamps: List[str],
+                    confidences: List = (), log_types: List[str] = ()):
+    """롤업 증분 갱신 (같은 트랜잭션 안에서 원본 INSERT와 함께 실행)"""
+    if not timestamps:
+        return
+    conn.executemany(_ROLLUP_DAILY_UPSERT,
+                     [(day, kind, n) for day, n in Counter(ts[:10] for ts in timestamps).items()])
+    conn.executemany(_ROLLUP_HOURLY_UPSERT,
+                     [(hour, kind, n) for hour, n in Counter(ts[:13] for ts in timestamps).items()])
+    counters = Counter({kind: len(timestamps)})
+    for confidence in confidences:
+        if confidence is not None and confidence > 0:
+            counters['confidence_sum'] += confidence
+            counters['confidence_count'] += 1
+    for log_type in log_types:
+        counters[f'ai_log:{log_type}'] += 1
+    conn.executemany(_ROLLUP_COUNTER_UPSERT, list(counters.items()))
+
+
+def _utc_timestamp() -> str:
+    """CURRENT_TIMESTAMP와 같은 형식 (UTC, 'YYYY-MM-DD HH:MM:SS')"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
 class DatabaseService:
     """SQLite 기반 영구 저장소 서비스"""
     
@@ -40,19 +127,24 @@ class DatabaseService:
         
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self.db_path = db_path
-        self._create_tables()
+        self._pool = SQLitePool(db_path)
+        self._pool.write(self._create_tables)
+        self._write_behind = WriteBehindQueue(self._apply_write_behind, name="db-write-behind")
+        if self._rollups_missing():
+            self.rebuild_rollups()
         self._initialized = True
-        print(f"✓ DB 초기화 완료: {db_path}")
+        print(f"✓ DB 초기화 완료: {db_path} (journal_mode={self._pool.journal_mode})")
     
     def _get_conn(self) -> sqlite3.Connection:
-        """스레드별 DB 연결"""
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """현재 스레드의 읽기 연결 (닫지 않고 재사용)"""
+        return self._pool.connection()
     
-    def _create_tables(self):
-        """테이블 생성"""
-        conn = self._get_conn()
+    def get_pool_stats(self) -> Dict:
+        """연결 계층 통계 (읽기 연결 수, 쓰기 대기열, 평균 대기/실행 시간, write-behind 버퍼)"""
+        return {**self._pool.get_stats(), 'write_behind': self._write_behind.get_stats()}
+    
+    def _create_tables(self, conn: sqlite3.Connection):
+        """테이블 생성 (writer 스레드에서 실행)"""
         cursor = conn.cursor()
         
         # 분석 이력 테이블
@@ -172,6 +264,30 @@ class DatabaseService:
             )
         ''')
         
+        # 롤업 테이블 (대시보드 통계용, 쓰기 시 증분 갱신)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rollup_daily (
+                date TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                count INTEGER DEFAULT 0,
+                PRIMARY KEY (date, kind)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rollup_hourly (
+                hour TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                count INTEGER DEFAULT 0,
+                PRIMARY KEY (hour, kind)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rollup_counters (
+                key TEXT PRIMARY KEY,
+                value REAL DEFAULT 0
+            )
+        ''')
+        
         # 페이지네이션 쿼리 최적화를 위한 인덱스 생성
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_history_created_at ON analysis_history(created_at DESC)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_history_user_id ON analysis_history(user_id)')
@@ -181,77 +297,72 @@ class DatabaseService:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_vehicle_views_user_id ON vehicle_views(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_notifications_user_id ON notifications(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_notifications_created_at ON notifications(created_at DESC)')
-        
-        conn.commit()
-        conn.close()
 
     # ========== 분석 이력 ==========
 
     def save_analysis(self, data: Dict) -> int:
-        """분석 결과 저장"""
-        conn = self._get_conn()
-        cursor = conn.cursor()
-
-        try:
-            today = datetime.now().strftime("%Y-%m-%d")
-            confidence = data.get('confidence', 85)
-            # user_id 정규화 (anonymous -> guest)
-            user_id = data.get('user_id', 'guest')
-            if user_id in ['anonymous', '', None]:
-                user_id = 'guest'
+        """분석 결과 저장 (동기, 저장된 id 반환)"""
+        row = self._analysis_row(data)
 
-            cursor.execute('''
-                INSERT INTO analysis_history
-                (user_id, brand, model, year, mileage, fuel_type, predicted_price,
-                 confidence, timing_score, signal, detail_url, request_data, response_data)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                user_id,
-                data.get('brand', ''),
-                data.get('model', ''),
-                data.get('year'),
-                data.get('mileage'),
-                data.get('fuel_type', ''),
-                data.get('predicted_price'),
-                confidence,
-                data.get('timing_score'),
-                data.get('signal'),
-                data.get('detail_url'),
-                json.dumps(data.get('request', {}), ensure_ascii=False),
-                json.dumps(data.get('response', {}), ensure_ascii=False)
-            ))
-
-            # 일별 통계 업데이트
-            cursor.execute('''
-                INSERT INTO daily_stats (date, request_count, avg_confidence, total_confidence, confidence_count)
-                VALUES (?, 1, ?, ?, 1)
-                ON CONFLICT(date) DO UPDATE SET
-                    request_count = request_count + 1,
-                    total_confidence = total_confidence + ?,
-                    confidence_count = confidence_count + 1,
-                    avg_confidence = (total_confidence + ?) / (confidence_count + 1),
-                    updated_at = CURRENT_TIMESTAMP
-            ''', (today, confidence, confidence, confidence, confidence))
+        def write(conn: sqlite3.Connection) -> int:
+            analysis_id = conn.execute(_ANALYSIS_INSERT, row[0]).lastrowid
+            self._update_request_stats(conn, [row])
+            return analysis_id
 
-            # 모델별 통계 업데이트
-            model_name = data.get('model', '')
-            if model_name:
-                cursor.execute('''
-                    INSERT INTO model_stats (model_name, view_count)
-                    VALUES (?, 1)
-                    ON CONFLICT(model_name) DO UPDATE SET
-                        view_count = view_count + 1,
-                        updated_at = CURRENT_TIMESTAMP
-                ''', (model_name,))
-
-            conn.commit()
-            return cursor.lastrowid
+        try:
+            return self._pool.write(write)
         except Exception as e:
             print(f"분석 저장 오류: {e}")
-            conn.rollback()
             return -1
-        finally:
-            conn.close()
+
+    def queue_analysis(self, data: Dict):
+        """분석 결과 저장 (write-behind, 즉시 반환)"""
+        self._write_behind.put('analysis', self._analysis_row(data))
+
+    @staticmethod
+    def _analysis_row(data: Dict) -> tuple:
+        """(INSERT 파라미터, 날짜, 신뢰도, 모델명) - 요청 시각 기준으로 생성"""
+        now = datetime.now()
+        confidence = data.get('confidence', 85)
+        # user_id 정규화 (anonymous -> guest)
+        user_id = data.get('user_id', 'guest')
+        if user_id in ['anonymous', '', None]:
+            user_id = 'guest'
+        params = (
+            user_id,
+            data.get('brand', ''),
+            data.get('model', ''),
+            data.get('year'),
+            data.get('mileage'),
+            data.get('fuel_type', ''),
+            data.get('predicted_price'),
+            confidence,
+            data.get('timing_score'),
+            data.get('signal'),
+            data.get('detail_url'),
+            json.dumps(data.get('request', {}), ensure_ascii=False),
+            json.dumps(data.get('response', {}), ensure_ascii=False),
+            _utc_timestamp()
+        )
+        return params, now.strftime("%Y-%m-%d"), confidence, data.get('model', '')
+
+    @staticmethod
+    def _update_request_stats(conn: sqlite3.Connection, rows: List[tuple]):
+        """일별 통계 / 모델별 통계 업데이트 (날짜·모델별로 합산 후 upsert)"""
+        daily = defaultdict(lambda: [0, 0.0])
+        models = defaultdict(int)
+        for _, date, confidence, model_name in rows:
+            daily[date][0] += 1
+            daily[date][1] += confidence or 0
+            if model_name:
+                models[model_name] += 1
+
+        conn.executemany(_DAILY_STATS_UPSERT, [
+            (date, count, total / count, total, count) for date, (count, total) in daily.items()
+        ])
+        if models:
+            conn.executemany(_MODEL_STATS_UPSERT, list(models.items()))
+        _update_rollups(conn, 'analysis', [row[0][-1] for row in rows], [row[2] for row in rows])
 
     def get_analysis_history(self, user_id: str = None, limit: int = 50, offset: int = 0) -> List[Dict]:
         """분석 이력 조회 (페이지네이션 지원)"""
@@ -271,7 +382,6 @@ class DatabaseService:
             ''', (limit, offset))
 
         rows = cursor.fetchall()
-        conn.close()
 
         return [dict(row) for row in rows]
 
@@ -284,51 +394,76 @@ class DatabaseService:
             if user_id and user_id not in ['anonymous', 'guest', '']:
                 cursor.execute('SELECT COUNT(*) as cnt FROM analysis_history WHERE user_id = ?', (user_id,))
             else:
-                cursor.execute('SELECT COUNT(*) as cnt FROM analysis_history')
+                return int(self._get_counters(cursor, 'analysis').get('analysis', 0))
             
             row = cursor.fetchone()
             return row['cnt'] if row else 0
         except Exception as e:
             print(f"분석 건수 조회 오류: {e}")
             return 0
-        finally:
-            conn.close()
 
     # ========== AI 로그 ==========
 
     def save_ai_log(self, log_type: str, data: Dict) -> int:
-        """AI 로그 저장 (네고대본, 시그널, 허위매물)"""
-        conn = self._get_conn()
-        cursor = conn.cursor()
+        """AI 로그 저장 (네고대본, 시그널, 허위매물) - 동기, 저장된 id 반환"""
+        params = self._ai_log_row(log_type, data)
+        def write(conn: sqlite3.Connection) -> int:
+            log_id = conn.execute(_AI_LOG_INSERT, params).lastrowid
+            _update_rollups(conn, 'ai_log', [params[-1]], log_types=[log_type])
+            return log_id
 
         try:
-            # user_id 정규화
-            user_id = data.get('user_id', 'guest')
-            if user_id in ['anonymous', '', None]:
-                user_id = 'guest'
-                
-            cursor.execute('''
-                INSERT INTO ai_logs
-                (user_id, log_type, car_info, request_data, response_data, success, ai_model)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                user_id,
-                log_type,
-                data.get('car_info', ''),
-                json.dumps(data.get('request', {}), ensure_ascii=False),
-                json.dumps(data.get('response', {}), ensure_ascii=False),
-                1 if data.get('success', True) else 0,
-                data.get('ai_model', 'Rule-based')
-            ))
-
-            conn.commit()
-            return cursor.lastrowid
+            return self._pool.write(write)
         except Exception as e:
             print(f"AI 로그 저장 오류: {e}")
-            conn.rollback()
             return -1
-        finally:
-            conn.close()
+
+    def queue_ai_log(self, log_type: str, data: Dict):
+        """AI 로그 저장 (write-behind, 즉시 반환)"""
+        self._write_behind.put('ai_log', self._ai_log_row(log_type, data))
+
+    @staticmethod
+    def _ai_log_row(log_type: str, data: Dict) -> tuple:
+        # user_id 정규화
+        user_id = data.get('user_id', 'guest')
+        if user_id in ['anonymous', '', None]:
+            user_id = 'guest'
+        return (
+            user_id,
+            log_type,
+            data.get('car_info', ''),
+            json.dumps(data.get('request', {}), ensure_ascii=False),
+            json.dumps(data.get('response', {}), ensure_ascii=False),
+            1 if data.get('success', True) else 0,
+            data.get('ai_model', 'Rule-based'),
+            _utc_timestamp()
+        )
+
+    # ========== Write-Behind ==========
+
+    def _apply_write_behind(self, items: List[tuple]):
+        """write-behind 배치를 한 트랜잭션으로 저장"""
+        analysis = [row for kind, row in items if kind == 'analysis']
+        ai_logs = [row for kind, row in items if kind == 'ai_log']
+
+        def write(conn: sqlite3.Connection):
+            if analysis:
+                conn.executemany(_ANALYSIS_INSERT, [row[0] for row in analysis])
+                self._update_request_stats(conn, analysis)
+            if ai_logs:
+                conn.executemany(_AI_LOG_INSERT, ai_logs)
+                _update_rollups(conn, 'ai_log', [row[-1] for row in ai_logs],
+                                log_types=[row[1] for row in ai_logs])
+
+        self._pool.write(write)
+
+    def flush(self):
+        """write-behind 버퍼 즉시 저장"""
+        self._write_behind.flush()
+
+    def close(self):
+        """종료 시 write-behind 버퍼 저장"""
+        self._write_behind.close()
 
     def get_ai_logs(self, log_type: str = None, limit: int = 100, offset: int = 0) -> List[Dict]:
         """AI 로그 조회 (페이지네이션 지원)"""
@@ -348,7 +483,6 @@ class DatabaseService:
             ''', (limit, offset))
 
         rows = cursor.fetchall()
-        conn.close()
 
         result = []
         for row in rows:
@@ -371,32 +505,24 @@ class DatabaseService:
             if log_type:
                 cursor.execute('SELECT COUNT(*) as cnt FROM ai_logs WHERE log_type = ?', (log_type,))
             else:
-                cursor.execute('SELECT COUNT(*) as cnt FROM ai_logs')
+                return int(self._get_counters(cursor, 'ai_log').get('ai_log', 0))
             
             row = cursor.fetchone()
             return row['cnt'] if row else 0
         except Exception as e:
             print(f"AI 로그 건수 조회 오류: {e}")
             return 0
-        finally:
-            conn.close()
 
     def get_ai_stats(self) -> Dict:
         """AI 사용 통계"""
         conn = self._get_conn()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT COUNT(*) as total FROM ai_logs')
-        total = cursor.fetchone()['total']
-
-        cursor.execute('''
-            SELECT log_type, COUNT(*) as count
-            FROM ai_logs
-            GROUP BY log_type
-        ''')
-        by_type = {row['log_type']: row['count'] for row in cursor.fetchall()}
-
-        conn.close()
+        # 롤업 카운터 ('ai_log', 'ai_log:<log_type>')
+        cursor.execute("SELECT key, value FROM rollup_counters WHERE key = 'ai_log' OR key LIKE 'ai_log:%'")
+        counters = {row['key']: int(row['value']) for row in cursor.fetchall()}
+        total = counters.get('ai_log', 0)
+        by_type = {key.split(':', 1)[1]: value for key, value in counters.items() if ':' in key}
 
         return {
             "total_calls": total,
@@ -424,13 +550,10 @@ class DatabaseService:
         row = cursor.fetchone()
         total_count = row['total'] if row and row['total'] else 0
 
-        # 평균 신뢰도 (전체)
-        cursor.execute('''
-            SELECT AVG(confidence) as avg_conf FROM analysis_history
-            WHERE confidence IS NOT NULL AND confidence > 0
-        ''')
-        row = cursor.fetchone()
-        avg_confidence = round(row['avg_conf'], 1) if row and row['avg_conf'] else 0
+        # 평균 신뢰도 (전체) - 롤업 누적 합계 / 건수
+        counters = self._get_counters(cursor, 'confidence_sum', 'confidence_count')
+        conf_count = counters.get('confidence_count', 0)
+        avg_confidence = round(counters['confidence_sum'] / conf_count, 1) if conf_count else 0
 
         # 인기 모델 Top 5
         cursor.execute('''
@@ -440,8 +563,6 @@ class DatabaseService:
         ''')
         popular_models = [dict(row) for row in cursor.fetchall()]
 
-        conn.close()
-
         return {
             "success": True,
             "todayCount": today_count,
@@ -466,7 +587,6 @@ class DatabaseService:
         ''', (start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")))
 
         data = [dict(row) for row in cursor.fetchall()]
-        conn.close()
 
         # 빈 날짜 채우기
         date_map = {d['day']: d['count'] for d in data}
@@ -481,24 +601,88 @@ class DatabaseService:
 
         return {"success": True, "data": result}
 
+    def get_hourly_counts(self, hours: int = 24, kind: str = 'analysis') -> Dict:
+        """시간대별 건수 (최근 N시간, UTC 기준 - 빈 시간대는 0)"""
+        conn = self._get_conn()
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        start = now - timedelta(hours=hours - 1)
+        rows = conn.execute('''
+            SELECT hour, count FROM rollup_hourly
+            WHERE kind = ? AND hour >= ? ORDER BY hour ASC
+        ''', (kind, start.strftime("%Y-%m-%d %H"))).fetchall()
+        hour_map = {row['hour']: row['count'] for row in rows}
+        data = []
+        for i in range(hours):
+            hour = (start + timedelta(hours=i)).strftime("%Y-%m-%d %H")
+            data.append({"hour": hour, "count": hour_map.get(hour, 0)})
+        return {"success": True, "kind": kind, "data": data}
+
+    # ========== 롤업 ==========
+
+    @staticmethod
+    def _get_counters(cursor: sqlite3.Cursor, *keys: str) -> Dict[str, float]:
+        placeholders = ', '.join('?' * len(keys))
+        cursor.execute(f'SELECT key, value FROM rollup_counters WHERE key IN ({placeholders})', keys)
+        return {row['key']: row['value'] for row in cursor.fetchall()}
+
+    def _rollups_missing(self) -> bool:
+        """롤업 테이블이 비어 있는데 원본 데이터가 있으면 True (최초 배포 시 자동 백필)"""
+        conn = self._get_conn()
+        if conn.execute('SELECT 1 FROM rollup_counters LIMIT 1').fetchone():
+            return False
+        return any(conn.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone()
+                   for table in _ROLLUP_SOURCES.values())
+
+    def rebuild_rollups(self) -> Dict:
+        """원본 테이블(analysis_history, vehicle_views, ai_logs)에서 롤업 전체 재계산"""
+        self.flush()
+        start = datetime.now()
+
+        def write(conn: sqlite3.Connection):
+            for table in ('rollup_daily', 'rollup_hourly', 'rollup_counters'):
+                conn.execute(f'DELETE FROM {table}')
+            for kind, table in _ROLLUP_SOURCES.items():
+                conn.execute(f'''
+                    INSERT INTO rollup_daily (date, kind, count)
+                    SELECT substr(created_at, 1, 10), ?, COUNT(*) FROM {table} GROUP BY 1
+                ''', (kind,))
+                conn.execute(f'''
+                    INSERT INTO rollup_hourly (hour, kind, count)
+                    SELECT substr(created_at, 1, 13), ?, COUNT(*) FROM {table} GROUP BY 1
+                ''', (kind,))
+                conn.execute(f'INSERT INTO rollup_counters (key, value) SELECT ?, COUNT(*) FROM {table}', (kind,))
+            conn.execute('''
+                INSERT INTO rollup_counters (key, value)
+                SELECT 'confidence_sum', COALESCE(SUM(confidence), 0) FROM analysis_history WHERE confidence > 0
+                UNION ALL
+                SELECT 'confidence_count', COUNT(*) FROM analysis_history WHERE confidence > 0
+            ''')
+            conn.execute('''
+                INSERT INTO rollup_counters (key, value)
+                SELECT 'ai_log:' || log_type, COUNT(*) FROM ai_logs GROUP BY log_type
+            ''')
+            return {row['key']: row['value'] for row in conn.execute('SELECT key, value FROM rollup_counters')}
+
+        counters = self._pool.write(write)
+        elapsed = (datetime.now() - start).total_seconds()
+        print(f"✓ 대시보드 롤업 재계산: 분석 {int(counters.get('analysis', 0)):,}건, "
+              f"조회 {int(counters.get('view', 0)):,}건, AI 로그 {int(counters.get('ai_log', 0)):,}건 ({elapsed:.2f}초)")
+        return counters
+
     # ========== 즐겨찾기 ==========
 
     def add_favorite(self, user_id: str, car_id: int, car_info: Dict) -> bool:
         """즐겨찾기 추가"""
-        conn = self._get_conn()
-        cursor = conn.cursor()
+        params = (user_id, car_id, json.dumps(car_info, ensure_ascii=False))
         try:
-            cursor.execute('''
+            self._pool.write(lambda conn: conn.execute('''
                 INSERT OR REPLACE INTO favorites (user_id, car_id, car_info)
                 VALUES (?, ?, ?)
-            ''', (user_id, car_id, json.dumps(car_info, ensure_ascii=False)))
-            conn.commit()
+            ''', params))
             return True
         except Exception as e:
             print(f"즐겨찾기 추가 실패: {e}")
             return False
-        finally:
-            conn.close()
 
     def get_favorites(self, user_id: str) -> List[Dict]:
         """즐겨찾기 조회"""
@@ -508,7 +692,6 @@ class DatabaseService:
             SELECT * FROM favorites WHERE user_id = ? ORDER BY created_at DESC
         ''', (user_id,))
         rows = cursor.fetchall()
-        conn.close()
 
         result = []
         for row in rows:
@@ -522,26 +705,14 @@ class DatabaseService:
 
     def remove_favorite(self, user_id: str, car_id: int) -> bool:
         """즐겨찾기 삭제"""
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM favorites WHERE user_id = ? AND car_id = ?', (user_id, car_id))
-        conn.commit()
-        deleted = cursor.rowcount > 0
-        conn.close()
-        return deleted
+        return self._pool.write(lambda conn: conn.execute(
+            'DELETE FROM favorites WHERE user_id = ? AND car_id = ?', (user_id, car_id)).rowcount > 0)
 
     # ========== 알림 시스템 ==========
 
     def add_notification(self, data: Dict) -> int:
         """알림 추가 (허위매물 고위험 등)"""
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO notifications
-            (user_id, notification_type, title, message, car_id, car_info, risk_level, risk_score)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        params = (
             data.get('user_id', 'guest'),
             data.get('notification_type', 'fraud_alert'),
             data.get('title', ''),
@@ -550,12 +721,13 @@ class DatabaseService:
             json.dumps(data.get('car_info', {}), ensure_ascii=False),
             data.get('risk_level', ''),
             data.get('risk_score', 0)
-        ))
+        )
         
-        conn.commit()
-        last_id = cursor.lastrowid
-        conn.close()
-        return last_id
+        return self._pool.write(lambda conn: conn.execute('''
+            INSERT INTO notifications
+            (user_id, notification_type, title, message, car_id, car_info, risk_level, risk_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', params).lastrowid)
 
     def get_notifications(self, user_id: str = 'guest', limit: int = 50, unread_only: bool = False) -> List[Dict]:
         """알림 조회"""
@@ -576,7 +748,6 @@ class DatabaseService:
             ''', (user_id, limit))
         
         rows = cursor.fetchall()
-        conn.close()
         
         result = []
         for row in rows:
@@ -590,13 +761,8 @@ class DatabaseService:
 
     def mark_notification_read(self, notification_id: int) -> bool:
         """알림 읽음 처리"""
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE notifications SET is_read = 1 WHERE id = ?', (notification_id,))
-        conn.commit()
-        updated = cursor.rowcount > 0
-        conn.close()
-        return updated
+        return self._pool.write(lambda conn: conn.execute(
+            'UPDATE notifications SET is_read = 1 WHERE id = ?', (notification_id,)).rowcount > 0)
 
     def get_unread_notification_count(self, user_id: str = 'guest') -> int:
         """읽지 않은 알림 개수"""
@@ -604,22 +770,24 @@ class DatabaseService:
         cursor = conn.cursor()
         cursor.execute('SELECT COUNT(*) as cnt FROM notifications WHERE user_id = ? AND is_read = 0', (user_id,))
         row = cursor.fetchone()
-        conn.close()
         return row['cnt'] if row else 0
 
     # ========== 매물 조회 이력 ==========
 
     def add_vehicle_view(self, data: Dict) -> int:
         """개별 매물 조회 기록 (추천탭 등에서)"""
-        conn = self._get_conn()
+        return self._pool.write(lambda conn: self._insert_vehicle_view(conn, data))
+
+    def _insert_vehicle_view(self, conn: sqlite3.Connection, data: Dict) -> int:
         cursor = conn.cursor()
         
         today = datetime.now().strftime("%Y-%m-%d")
+        created_at = _utc_timestamp()
         
         cursor.execute('''
             INSERT INTO vehicle_views
-            (user_id, car_id, brand, model, year, mileage, price, view_source)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            (user_id, car_id, brand, model, year, mileage, price, view_source, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             data.get('user_id', 'guest'),
             data.get('car_id', ''),
@@ -628,8 +796,10 @@ class DatabaseService:
             data.get('year'),
             data.get('mileage'),
             data.get('price'),
-            data.get('view_source', 'recommendation')
+            data.get('view_source', 'recommendation'),
+            created_at
         ))
+        view_id = cursor.lastrowid
         
         # 일별 통계 업데이트 (조회수 증가)
         cursor.execute('''
@@ -651,10 +821,8 @@ class DatabaseService:
                     updated_at = CURRENT_TIMESTAMP
             ''', (model_name,))
         
-        conn.commit()
-        last_id = cursor.lastrowid
-        conn.close()
-        return last_id
+        _update_rollups(conn, 'view', [created_at])
+        return view_id
 
     def get_vehicle_views(self, user_id: str = None, limit: int = 50) -> List[Dict]:
         """매물 조회 이력 조회"""
@@ -674,7 +842,6 @@ class DatabaseService:
             ''', (limit,))
         
         rows = cursor.fetchall()
-        conn.close()
         return [dict(row) for row in rows]
 
     def get_total_views_count(self) -> Dict:
@@ -689,23 +856,19 @@ class DatabaseService:
         row = cursor.fetchone()
         today_predictions = row['request_count'] if row else 0
         
-        # 오늘 매물 조회 수
-        cursor.execute('SELECT COUNT(*) as cnt FROM vehicle_views WHERE date(created_at) = ?', (today,))
+        # 오늘 매물 조회 수 (롤업)
+        cursor.execute("SELECT count FROM rollup_daily WHERE date = ? AND kind = 'view'", (today,))
         row = cursor.fetchone()
-        today_views = row['cnt'] if row else 0
+        today_views = row['count'] if row else 0
         
         # 전체 시세 예측 수
         cursor.execute('SELECT SUM(request_count) as total FROM daily_stats')
         row = cursor.fetchone()
         total_predictions = row['total'] if row and row['total'] else 0
         
-        # 전체 매물 조회 수
-        cursor.execute('SELECT COUNT(*) as cnt FROM vehicle_views')
-        row = cursor.fetchone()
-        total_views = row['cnt'] if row else 0
-        
-        conn.close()
-        
+        # 전체 매물 조회 수 (롤업)
+        total_views = int(self._get_counters(cursor, 'view').get('view', 0))
+
         return {
             "today_predictions": today_predictions,
             "today_views": today_views,
@@ -725,3 +888,17 @@ def get_database_service() -> DatabaseService:
         _db_service = DatabaseService()
     return _db_service
 
+
+if __name__ == "__main__":
+    # 롤업 백필: cd ml-service && python -m services.database_service --rebuild-rollups
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Car-Sentix DB 관리")
+    parser.add_argument('--rebuild-rollups', action='store_true', help="대시보드 롤업 테이블 재계산")
+    parser.add_argument('--db', default=None, help="DB 파일 경로 (기본: data/car_sentix.db)")
+    args = parser.parse_args()
+
+    service = DatabaseService(args.db)
+    if args.rebuild_rollups:
+        print(json.dumps(service.rebuild_rollups(), ensure_ascii=False, indent=2))
+    service.close()
@@ -0,0 +1,199 @@
+"""
+워크로드별 실행 풀 (Async Dispatch)
+==================================
+- async 핸들러 안의 동기 작업(pandas/XGBoost, 외부 API 호출, sqlite 쓰기)을
+  이벤트 루프 밖의 스레드 풀로 보내 다른 요청이 막히지 않도록 한다
+- 워크로드 종류마다 풀/동시 실행 수/대기열 한도를 따로 둔다
+    cpu : 예측, 추천/유사 차량 분석 등 pandas·numpy·XGBoost 연산
+    io  : TimingService(외부 API), Groq 등 네트워크 대기
+    db  : sqlite 저장 (쓰기 충돌 방지를 위해 기본 1개)
+- 풀별 대기열 길이 / 대기 시간 / 실행 시간 통계 제공 → 풀 크기 조정 근거
+
+사용:
+    result = await get_dispatcher().run('cpu', prediction_service.predict, brand, model, year, mileage)
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+# 대기/실행 시간 통계에 보관할 최근 샘플 수
+LATENCY_SAMPLES = 1024
+
+
+@dataclass
+class WorkloadConfig:
+    """워크로드별 풀 설정"""
+    max_workers: int
+    max_queue: int  # 실행 대기 작업 한도 (초과 시 DispatchOverloaded)
+
+
+# 기본 설정 - 환경변수 DISPATCH_<NAME>_WORKERS / DISPATCH_<NAME>_QUEUE 로 조정
+DEFAULT_WORKLOADS = {
+    'cpu': WorkloadConfig(max_workers=min(4, os.cpu_count() or 1), max_queue=64),
+    'io': WorkloadConfig(max_workers=16, max_queue=128),
+    'db': WorkloadConfig(max_workers=1, max_queue=256),
+}
+
+
+class DispatchOverloaded(Exception):
+    """대기열 한도 초과"""
+
+
+class _WorkloadPool:
+    """단일 워크로드 풀 + 통계"""
+
+    def __init__(self, name: str, config: WorkloadConfig):
+        self.name = name
+        self.config = config
+        self.executor = ThreadPoolExecutor(max_workers=config.max_workers,
+                                           thread_name_prefix=f"dispatch-{name}")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._wait_ms = deque(maxlen=LATENCY_SAMPLES)
+        self._run_ms = deque(maxlen=LATENCY_SAMPLES)
+
+    def acquire(self):
+        with self._lock:
+            if self.queued >= self.config.max_queue:
+                self.rejected += 1
+                raise DispatchOverloaded(f"{self.name} 풀 대기열 초과 ({self.queued}/{self.config.max_queue})")
+            self.queued += 1
+            self.submitted += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+    def wrap(self, fn: Callable, enqueued_at: float) -> Callable:
+        """워커 스레드에서 실행될 함수 (대기/실행 시간 기록)"""
+        def runner():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self._wait_ms.append((started - enqueued_at) * 1000)
+            ok = False
+            try:
+                result = fn()
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self._run_ms.append((time.perf_counter() - started) * 1000)
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+        return runner
+
+    def cancel(self):
+        """실행 전에 취소된 작업 (대기열에서 제거)"""
+        with self._lock:
+            self.queued -= 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            waits = np.array(self._wait_ms, dtype=np.float64)
+            runs = np.array(self._run_ms, dtype=np.float64)
+            stats = {
+                'max_workers': self.config.max_workers,
+                'max_queue': self.config.max_queue,
+                'queued': self.queued,
+                'running': self.running,
+                'max_queued': self.max_queued,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+            }
+        stats['wait_ms'] = _summarize(waits)
+        stats['run_ms'] = _summarize(runs)
+        return stats
+
+
+def _summarize(samples: np.ndarray) -> Dict:
+    if len(samples) == 0:
+        return {'avg': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    p50, p95 = np.percentile(samples, [50, 95])
+    return {
+        'avg': round(float(samples.mean()), 2),
+        'p50': round(float(p50), 2),
+        'p95': round(float(p95), 2),
+        'max': round(float(samples.max()), 2),
+    }
+
+
+class Dispatcher:
+    """워크로드 이름 → 스레드 풀 라우팅"""
+
+    def __init__(self, workloads: Optional[Dict[str, WorkloadConfig]] = None):
+        workloads = workloads or DEFAULT_WORKLOADS
+        self._pools: Dict[str, _WorkloadPool] = {}
+        for name, config in workloads.items():
+            key = name.upper()
+            config = WorkloadConfig(
+                max_workers=int(os.getenv(f"DISPATCH_{key}_WORKERS", config.max_workers)),
+                max_queue=int(os.getenv(f"DISPATCH_{key}_QUEUE", config.max_queue)),
+            )
+            self._pools[name] = _WorkloadPool(name, config)
+        print("✓ 디스패처 초기화: " + ", ".join(
+            f"{name}={pool.config.max_workers}" for name, pool in self._pools.items()))
+
+    async def run(self, workload: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        동기 함수를 워크로드 풀에서 실행하고 결과를 기다림
+
+        Raises:
+            KeyError: 등록되지 않은 워크로드
+            DispatchOverloaded: 대기열 한도 초과
+        """
+        pool = self._pools[workload]
+        pool.acquire()
+        call = functools.partial(fn, *args, **kwargs)
+        runner = pool.wrap(call, time.perf_counter())
+        try:
+            future = pool.executor.submit(runner)
+        except BaseException:
+            pool.cancel()
+            raise
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # 요청이 끊겨도 이미 시작한 작업은 끝까지 실행됨 - 시작 전이면 대기열에서 제거
+            if future.cancel():
+                pool.cancel()
+            raise
+
+    def get_stats(self) -> Dict:
+        """풀별 대기열 / 대기 시간 / 실행 시간 통계"""
+        return {name: pool.stats() for name, pool in self._pools.items()}
+
+    def shutdown(self, wait: bool = True):
+        for pool in self._pools.values():
+            pool.executor.shutdown(wait=wait)
+
+
+# 싱글톤
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> Dispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = Dispatcher()
+    return _dispatcher
@@ -0,0 +1,298 @@
+"""
+차량 이미지 리사이즈 캐시 (메모리 LRU + 디스크)
+===============================================
+- 메모리: 바이트 총량 기준 LRU (항목 수가 아니라 용량으로 제한 → 어떤 키든 계속 캐시됨)
+- 디스크: 리사이즈된 JPEG 변형을 파일로 보관 → 재시작 후에도 재압축 없음
+- 캐시 키 = (원본 경로, 원본 mtime/크기, size, quality)
+  → 원본 이미지가 바뀌면 자동으로 새 키 (무효화 불필요)
+- ETag = 캐시 키 해시 → 원본 stat만으로 계산되므로 304 응답 시 이미지를 읽지 않음
+- 같은 키의 동시 압축은 한 번만 실행 (single-flight)
+
+사용:
+    cache = get_image_cache()
+    etag = cache.etag(file_path, size, quality)
+    image = cache.peek(file_path, size, quality) or cache.get(file_path, size, quality)
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# 이미지 압축용 (선택적)
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# 메모리 캐시 용량 / 디스크 캐시 용량 (환경변수로 조정)
+MEMORY_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MEMORY_MB", "64")) * 1024 * 1024
+DISK_MAX_BYTES = int(os.getenv("IMAGE_CACHE_DISK_MB", "512")) * 1024 * 1024
+
+# 디스크 캐시 위치
+IMAGE_CACHE_DIR = Path(__file__).parent.parent.parent / 'data' / 'image_cache'
+
+# 디스크 용량 초과 시 이 비율까지 오래된 파일부터 삭제
+DISK_PRUNE_RATIO = 0.8
+
+_MEDIA_TYPES = {'.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg'}
+
+
+@dataclass
+class CachedImage:
+    data: bytes
+    etag: str
+    media_type: str
+
+
+def compress_image(file_path: str, max_size: int = 400, quality: int = 85) -> Optional[bytes]:
+    """이미지를 max_size 이내 JPEG로 압축 (5MB → ~50KB). PIL 없거나 실패 시 None"""
+    if not PIL_AVAILABLE:
+        return None
+    try:
+        with Image.open(file_path) as img:
+            # RGBA to RGB (PNG → JPEG 변환 시 필요)
+            if img.mode in ('RGBA', 'LA', 'P'):
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                if img.mode == 'P':
+                    img = img.convert('RGBA')
+                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            # 크기 조절
+            img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+            # JPEG로 압축
+            buffer = BytesIO()
+            img.save(buffer, format='JPEG', quality=quality, optimize=True)
+            return buffer.getvalue()
+    except Exception as e:
+        print(f"⚠️ 이미지 압축 실패 {file_path}: {e}")
+        return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 etag와 일치하는지 (목록, W/ 약한 검사기, * 지원)"""
+    if not if_none_match or not etag:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ImageCache:
+    """리사이즈된 이미지 2단 캐시"""
+
+    def __init__(self, cache_dir: Optional[Path] = IMAGE_CACHE_DIR,
+                 memory_max_bytes: int = MEMORY_MAX_BYTES, disk_max_bytes: int = DISK_MAX_BYTES):
+        """
+        Args:
+            cache_dir: 디스크 캐시 폴더 (None이면 메모리만 사용)
+            memory_max_bytes: 메모리 캐시 총 용량
+            disk_max_bytes: 디스크 캐시 총 용량
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, CachedImage]" = OrderedDict()
+        self._memory_bytes = 0
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0,
+                      'disk_writes': 0, 'disk_pruned': 0, 'uncached': 0}
+
+        if self.cache_dir is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._disk_bytes = sum(p.stat().st_size for p in self.cache_dir.glob('*.jpg'))
+            except OSError as e:
+                print(f"⚠️ 이미지 디스크 캐시 비활성화: {e}")
+                self.cache_dir = None
+
+    # ========== 키 / ETag ==========
+
+    @staticmethod
+    def _key(file_path: str, max_size: int, quality: int) -> Optional[Tuple[str, str]]:
+        """(캐시 키, ETag) - 원본이 없으면 None"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        raw = f"{os.path.abspath(file_path)}:{st.st_mtime_ns}:{st.st_size}:{max_size}:{quality}:{int(PIL_AVAILABLE)}"
+        digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
+        return digest, f'"{digest}"'
+
+    def etag(self, file_path: str, max_size: int, quality: int) -> Optional[str]:
+        """원본 stat만으로 ETag 계산 (조건부 요청 처리용)"""
+        key = self._key(file_path, max_size, quality)
+        return key[1] if key else None
+
+    # ========== 조회 ==========
+
+    def peek(self, file_path: str, max_size: int, quality: int) -> Optional[CachedImage]:
+        """메모리 캐시만 조회 (이벤트 루프에서 바로 호출 가능)"""
+        key = self._key(file_path, max_size, quality)
+        if key is None:
+            return None
+        with self._lock:
+            image = self._memory.get(key[0])
+            if image is not None:
+                self._memory.move_to_end(key[0])
+                self.stats['memory_hits'] += 1
+        return image
+
+    def get(self, file_path: str, max_size: int, quality: int) -> CachedImage:
+        """메모리 → 디스크 → 압축 순으로 조회 (압축은 블로킹이므로 워커 스레드에서 호출)"""
+        key = self._key(file_path, max_size, quality)
+        if key is None:
+            raise FileNotFoundError(file_path)
+        digest, etag = key
+
+        while True:
+            with self._lock:
+                image = self._memory.get(digest)
+                if image is not None:
+                    self._memory.move_to_end(digest)
+                    self.stats['memory_hits'] += 1
+                    return image
+                done = self._inflight.get(digest)
+                if done is None:
+                    done = threading.Event()
+                    self._inflight[digest] = done
+                    break
+            # 다른 스레드가 같은 키를 압축 중 - 끝나면 메모리에서 다시 조회
+            done.wait()
+
+        try:
+            image = self._load_disk(digest, etag)
+            if image is not None:
+                self.stats['disk_hits'] += 1
+            else:
+                self.stats['misses'] += 1
+                data = compress_image(file_path, max_size, quality)
+                if data is None:
+                    # PIL 없음/압축 실패 - 원본 그대로 (캐시하지 않음)
+                    self.stats['uncached'] += 1
+                    with open(file_path, 'rb') as f:
+                        data = f.read()
+                    media_type = _MEDIA_TYPES.get(os.path.splitext(file_path)[1].lower(), 'application/octet-stream')
+                    return CachedImage(data, etag, media_type)
+                image = CachedImage(data, etag, 'image/jpeg')
+                self._save_disk(digest, data)
+            self._remember(digest, image)
+            return image
+        finally:
+            with self._lock:
+                self._inflight.pop(digest, None)
+            done.set()
+
+    def _remember(self, digest: str, image: CachedImage):
+        size = len(image.data)
+        if size > self.memory_max_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(digest, None)
+            if old is not None:
+                self._memory_bytes -= len(old.data)
+            self._memory[digest] = image
+            self._memory_bytes += size
+            while self._memory_bytes > self.memory_max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.data)
+                self.stats['evictions'] += 1
+
+    # ========== 디스크 ==========
+
+    def _load_disk(self, digest: str, etag: str) -> Optional[CachedImage]:
+        if self.cache_dir is None:
+            return None
+        path = self.cache_dir / f"{digest}.jpg"
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # 최근 사용 시각 갱신 (정리 시 LRU 기준)
+        except OSError:
+            pass
+        return CachedImage(data, etag, 'image/jpeg')
+
+    def _save_disk(self, digest: str, data: bytes):
+        """원자적 저장 (임시 파일 → rename)"""
+        if self.cache_dir is None:
+            return
+        path = self.cache_dir / f"{digest}.jpg"
+        tmp_path = path.with_name(path.name + f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ 이미지 디스크 캐시 저장 실패: {e}")
+            return
+        self.stats['disk_writes'] += 1
+        with self._disk_lock:
+            self._disk_bytes += len(data)
+            if self._disk_bytes > self.disk_max_bytes:
+                self._prune_disk()
+
+    def _prune_disk(self):
+        """오래 사용되지 않은 파일부터 삭제 (원본 변경으로 남은 이전 변형 포함)"""
+        files = []
+        for p in self.cache_dir.glob('*.jpg'):
+            try:
+                st = p.stat()
+                files.append((st.st_mtime, st.st_size, p))
+            except OSError:
+                continue
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        target = self.disk_max_bytes * DISK_PRUNE_RATIO
+        for _, size, p in files:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+                total -= size
+                self.stats['disk_pruned'] += 1
+            except OSError:
+                continue
+        self._disk_bytes = total
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            entries = len(self._memory)
+            memory_bytes = self._memory_bytes
+        return {**self.stats, 'memory_entries': entries, 'memory_bytes': memory_bytes,
+                'memory_max_bytes': self.memory_max_bytes, 'disk_bytes': self._disk_bytes,
+                'disk_max_bytes': self.disk_max_bytes,
+                'disk_dir': str(self.cache_dir) if self.cache_dir else None}
+
+
+# 싱글톤
+_image_cache = None
+_image_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageCache:
+    global _image_cache
+    if _image_cache is None:
+        with _image_cache_lock:
+            if _image_cache is None:
+                _image_cache = ImageCache()
+    return _image_cache
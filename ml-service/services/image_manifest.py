@@ -0,0 +1,202 @@
+"""
+차량 이미지 매니페스트
+======================
+- 서버 시작 시 이미지 폴더를 한 번 스캔해 "정규화된 이름 → 파일" 사전 구성
+  → 요청마다 os.path.exists / os.listdir 하지 않음
+- 폴더 mtime 폴링으로 파일 추가/삭제/이름 변경 반영 (조회 실패 시에도 즉시 확인)
+- 이름 정규화: 유니코드 NFC (macOS에서 복사된 한글 파일명 NFD 대응) + 소문자 + 공백 정리
+- 모델명 → 이미지 퍼지 매칭 (CarImageService.get_model_image 폴백)
+
+사용:
+    manifest = get_image_manifest()
+    entry = manifest.resolve("그랜저.png")   # 확장자 유무 무관
+    entry.path, entry.size, entry.categories
+"""
+import os
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 모든 차량 이미지 (국산/외제 공용 폴더 - run_server의 CAR_IMAGES_DIR / CAR_IMAGES_IMPORTED_DIR)
+CAR_IMAGES_DIR = Path(__file__).parent.parent.parent / '차량 이미지'
+IMAGE_DIRS = [(CAR_IMAGES_DIR, 'domestic'), (CAR_IMAGES_DIR, 'imported')]
+
+# 같은 이름이 여러 확장자로 있을 때 우선순위
+EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# 폴더 변경 확인 주기 (초)
+POLL_SECONDS = int(os.getenv("IMAGE_MANIFEST_POLL_SECONDS", "30"))
+
+
+def normalize_name(name: str) -> str:
+    """파일명/모델명 비교용 정규화 (확장자 제거, NFC, 소문자, 연속 공백 정리)"""
+    name = unicodedata.normalize('NFC', name).strip()
+    base, ext = os.path.splitext(name)
+    if ext.lower() in EXTENSIONS:
+        name = base
+    return ' '.join(name.lower().split())
+
+
+@dataclass
+class ImageEntry:
+    name: str                # 확장자 제외 파일명 (원본 표기)
+    path: str
+    size: int
+    categories: List[str] = field(default_factory=list)
+
+    @property
+    def url(self) -> str:
+        return f"/car-images/{os.path.basename(self.path)}"
+
+
+class ImageManifest:
+    """이미지 폴더 스냅샷 + 변경 폴링"""
+
+    def __init__(self, dirs: List[Tuple[Path, str]] = IMAGE_DIRS, poll_seconds: int = POLL_SECONDS):
+        """
+        Args:
+            dirs: (폴더, 카테고리) 목록 - 같은 이름은 앞 폴더가 우선
+            poll_seconds: 폴더 mtime 확인 주기 (0이면 폴링 안 함)
+        """
+        self.dirs = [(Path(d), category) for d, category in dirs]
+        self.poll_seconds = poll_seconds
+        self._entries: Dict[str, ImageEntry] = {}
+        self._by_length: List[str] = []  # 퍼지 매칭 순서 (긴 이름 우선)
+        self._dir_mtimes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._poller: Optional[threading.Thread] = None
+        self.stats = {'builds': 0, 'lookups': 0, 'misses': 0}
+        self.refresh(force=True)
+
+    # ========== 스캔 ==========
+
+    def _scan_mtimes(self) -> Dict[str, int]:
+        mtimes = {}
+        for d, _ in self.dirs:
+            try:
+                mtimes[str(d)] = os.stat(d).st_mtime_ns
+            except OSError:
+                mtimes[str(d)] = -1
+        return mtimes
+
+    def refresh(self, force: bool = False) -> bool:
+        """폴더가 바뀌었으면 다시 스캔 (바뀌었으면 True)"""
+        mtimes = self._scan_mtimes()
+        if not force and mtimes == self._dir_mtimes:
+            return False
+
+        entries: Dict[str, ImageEntry] = {}
+        scanned: Dict[str, List[os.DirEntry]] = {}
+        for d, category in self.dirs:
+            key = str(d)
+            if key not in scanned:
+                try:
+                    with os.scandir(d) as it:
+                        files = [e for e in it if e.is_file() and os.path.splitext(e.name)[1].lower() in EXTENSIONS]
+                except OSError:
+                    files = []
+                # 폴더 내에서는 확장자 우선순위 순
+                files.sort(key=lambda e: EXTENSIONS.index(os.path.splitext(e.name)[1].lower()))
+                scanned[key] = files
+            for e in scanned[key]:
+                norm = normalize_name(e.name)
+                entry = entries.get(norm)
+                if entry is None:
+                    stem = unicodedata.normalize('NFC', os.path.splitext(e.name)[0])
+                    entry = ImageEntry(stem, e.path, e.stat().st_size)
+                    entries[norm] = entry
+                if category not in entry.categories:
+                    entry.categories.append(category)
+
+        # 길이 내림차순, 같은 길이는 이름순 → 퍼지 매칭 결과 결정적
+        by_length = sorted(entries, key=lambda n: (-len(n), n))
+        with self._lock:
+            self._entries = entries
+            self._by_length = by_length
+            self._dir_mtimes = mtimes
+        self.stats['builds'] += 1
+        if self.stats['builds'] > 1:
+            print(f"✓ 이미지 매니페스트 갱신: {len(entries)}개")
+        return True
+
+    def _ensure_poller(self):
+        if self._poller is not None or self.poll_seconds <= 0:
+            return
+        with self._lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll_loop, name="image-manifest", daemon=True)
+                self._poller.start()
+
+    def _poll_loop(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ 이미지 매니페스트 갱신 실패: {e}")
+
+    # ========== 조회 ==========
+
+    def resolve(self, name: str) -> Optional[ImageEntry]:
+        """파일명(확장자 유무 무관) → 이미지 항목"""
+        self._ensure_poller()
+        self.stats['lookups'] += 1
+        norm = normalize_name(name)
+        entry = self._entries.get(norm)
+        if entry is None and self.refresh():
+            # 폴링 주기 전에 추가된 파일
+            entry = self._entries.get(norm)
+        if entry is None:
+            self.stats['misses'] += 1
+        return entry
+
+    @property
+    def version(self) -> int:
+        """스캔 횟수 - 목록이 바뀔 때마다 증가 (조회 결과 메모 무효화용)"""
+        return self.stats['builds']
+
+    def entries(self) -> List[ImageEntry]:
+        self._ensure_poller()
+        return list(self._entries.values())
+
+    def find_model_image(self, brand: str, model: str) -> Optional[ImageEntry]:
+        """
+        모델명 → 이미지 퍼지 매칭
+
+        1) 모델명 / "브랜드 모델명" 정확 일치
+        2) 모델명에 포함된 이미지 이름 중 가장 긴 것 (예: "더 뉴 그랜저 IG" → 그랜저)
+           2글자 이하 이름(K5, ES 등)은 단어 단위로만 일치
+        """
+        entries, by_length = self._entries, self._by_length
+        model_norm = normalize_name(model or '')
+        if not model_norm:
+            return None
+        for candidate in (model_norm, normalize_name(f"{brand or ''} {model}")):
+            if candidate in entries:
+                return entries[candidate]
+        tokens = set(model_norm.split())
+        for norm in by_length:
+            if (norm in model_norm) if len(norm) > 2 else (norm in tokens):
+                return entries[norm]
+        return None
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'entries': len(self._entries),
+                'dirs': sorted({str(d) for d, _ in self.dirs})}
+
+
+# 싱글톤
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_image_manifest() -> ImageManifest:
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                _manifest = ImageManifest()
+    return _manifest
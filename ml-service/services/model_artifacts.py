@@ -0,0 +1,361 @@
+"""
+컴팩트 모델 아티팩트
+===================
+joblib 피클 대신 빠르게 열리고 워커끼리 메모리를 공유하는 저장 포맷
+- 부스터: XGBoost 네이티브 UBJSON (<name>.ubj) - 파이썬 객체 역직렬화 없음, XGBoost 버전 간 호환
+- 인코더: 문자열 키 → 값 사전을 바이너리 해시 테이블로 (<name>_encoders.bin)
+  → np.memmap으로 열기만 하면 됨 (파싱/사전 생성 없음, 페이지 캐시를 워커끼리 공유)
+- 메타: 피처 순서, 스칼라 인코더 값, 테이블 위치, 원본 피클 지문 (<name>_artifact.json)
+  → 메타 파일을 마지막에 쓰므로 메타가 있으면 아티팩트가 완전함
+
+인코더 테이블은 원본 사전의 키 순서를 유지한다 (ModelNameResolver 동순위 규칙이 키 순서에 의존).
+
+변환:
+    cd ml-service && python -m services.model_artifacts          # models/의 피클 세트 전체
+    cd ml-service && python -m services.model_artifacts domestic_v12
+"""
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+# XGBoost (선택적 - 없으면 피클 로드만 가능)
+try:
+    import xgboost as xgb
+    XGBOOST_AVAILABLE = True
+except ImportError:
+    XGBOOST_AVAILABLE = False
+
+ARTIFACT_VERSION = 1
+
+# 해시 테이블 적재율 상한 (슬롯 수 = 키 수 / 적재율 이상의 2의 거듭제곱)
+MAX_LOAD_FACTOR = 0.5
+
+# 배열 시작 위치 정렬 (바이트)
+ALIGN = 8
+
+
+def pickle_paths(model_dir: Path, name: str) -> Dict[str, Path]:
+    """피클 세트 경로 (model / encoders / features)"""
+    model_dir = Path(model_dir)
+    return {
+        'model': model_dir / f"{name}.pkl",
+        'encoders': model_dir / f"{name}_encoders.pkl",
+        'features': model_dir / f"{name}_features.pkl",
+    }
+
+
+def artifact_paths(model_dir: Path, name: str) -> Dict[str, Path]:
+    """컴팩트 아티팩트 경로 (booster / encoders / meta)"""
+    model_dir = Path(model_dir)
+    return {
+        'booster': model_dir / f"{name}.ubj",
+        'encoders': model_dir / f"{name}_encoders.bin",
+        'meta': model_dir / f"{name}_artifact.json",
+    }
+
+
+def source_fingerprint(model_dir: Path, name: str) -> Dict[str, List[int]]:
+    """원본 피클 파일별 (mtime_ns, size) - 피클이 바뀌면 아티팩트는 오래된 것으로 간주"""
+    fp = {}
+    for path in pickle_paths(model_dir, name).values():
+        try:
+            st = os.stat(path)
+            fp[path.name] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            continue
+    return fp
+
+
+# ========== 인코더 해시 테이블 ==========
+
+def _hash(raw: bytes) -> int:
+    return zlib.crc32(raw)
+
+
+def _is_table(value) -> bool:
+    """바이너리 테이블로 저장 가능한 사전인지 (문자열 키 + 숫자 값)"""
+    if not isinstance(value, dict):
+        return False
+    return all(isinstance(k, str) for k in value) and \
+        all(isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool)
+            for v in value.values())
+
+
+class EncoderTable(Mapping):
+    """
+    읽기 전용 문자열 키 → float 사전 (memmap 해시 테이블)
+
+    dict와 같은 인터페이스(get/in/len/keys/items)를 제공하므로 기존 인코더 사전 자리에 그대로 쓴다.
+    """
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray, values: np.ndarray, slots: np.ndarray):
+        """
+        Args:
+            offsets: 키 i의 바이트 범위 = blob[offsets[i]:offsets[i+1]] (int64, 키 수 + 1)
+            blob: UTF-8 키를 원본 순서대로 이어 붙인 바이트 (uint8)
+            values: 키 i의 값 (float64)
+            slots: 해시 슬롯 → 키 인덱스, 빈 슬롯은 -1 (int32, 2의 거듭제곱 길이)
+        """
+        self._offsets = offsets
+        self._blob = blob
+        self._values = values
+        self._slots = slots
+        self._mask = len(slots) - 1
+        # 조회 경로는 memoryview로 (numpy 스칼라 생성 없이 파이썬 int/float/bytes 비교)
+        self._offsets_mv = memoryview(offsets)
+        self._blob_mv = memoryview(blob)
+        self._values_mv = memoryview(values)
+        self._slots_mv = memoryview(slots)
+
+    @classmethod
+    def build(cls, mapping: Dict[str, float]) -> "EncoderTable":
+        """사전 → 메모리 테이블 (export 용)"""
+        keys = [k.encode('utf-8') for k in mapping]
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(k) for k in keys], dtype=np.int64)
+        blob = np.frombuffer(b''.join(keys), dtype=np.uint8)
+        values = np.array([float(v) for v in mapping.values()], dtype=np.float64)
+
+        capacity = 8
+        while capacity * MAX_LOAD_FACTOR < len(keys):
+            capacity *= 2
+        slots = np.full(capacity, -1, dtype=np.int32)
+        mask = capacity - 1
+        for idx, raw in enumerate(keys):
+            pos = _hash(raw) & mask
+            while slots[pos] >= 0:
+                pos = (pos + 1) & mask
+            slots[pos] = idx
+        return cls(offsets, blob, values, slots)
+
+    def _key_bytes(self, idx: int) -> bytes:
+        return self._blob_mv[self._offsets_mv[idx]:self._offsets_mv[idx + 1]].tobytes()
+
+    def _index(self, key) -> int:
+        if not isinstance(key, str):
+            return -1
+        raw = key.encode('utf-8')
+        slots, offsets, blob, mask = self._slots_mv, self._offsets_mv, self._blob_mv, self._mask
+        pos = _hash(raw) & mask
+        while True:
+            idx = slots[pos]
+            if idx < 0:
+                return -1
+            if blob[offsets[idx]:offsets[idx + 1]] == raw:
+                return idx
+            pos = (pos + 1) & mask
+
+    def __getitem__(self, key) -> float:
+        idx = self._index(key)
+        if idx < 0:
+            raise KeyError(key)
+        return self._values_mv[idx]
+
+    def get(self, key, default=None):
+        idx = self._index(key)
+        return default if idx < 0 else self._values_mv[idx]
+
+    def __contains__(self, key) -> bool:
+        return self._index(key) >= 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[str]:
+        for idx in range(len(self._values)):
+            yield self._key_bytes(idx).decode('utf-8')
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {'offsets': self._offsets, 'blob': self._blob, 'values': self._values, 'slots': self._slots}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays().values())
+
+
+# ========== 저장 / 로드 ==========
+
+def _write_atomic(path: Path, write):
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp{path.suffix}")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def write_encoder_tables(path: Path, encoders: Dict):
+    """
+    인코더 사전 → 바이너리 테이블 파일 (원자적 쓰기)
+
+    문자열 키 → 숫자 값 사전은 해시 테이블로 파일에, 나머지(스칼라 등)는 호출자가 메타 JSON에 넣는다.
+
+    Returns:
+        (테이블 위치 layout, 스칼라 값 dict, 파일 크기) - load_encoders()에 meta로 넘기는 정보
+    """
+    tables, scalars = {}, {}
+    for key, value in encoders.items():
+        if _is_table(value):
+            tables[key] = EncoderTable.build(value)
+        else:
+            json.dumps(value)  # 직렬화 불가 값은 여기서 실패
+            scalars[key] = value
+
+    layout = {}
+    chunks = []
+    offset = 0
+    for key, table in tables.items():
+        entry = {'count': len(table)}
+        for part, arr in table.arrays().items():
+            pad = (-offset) % ALIGN
+            if pad:
+                chunks.append(b'\x00' * pad)
+                offset += pad
+            data = np.ascontiguousarray(arr).tobytes()
+            entry[part] = [offset, str(arr.dtype), len(arr)]
+            chunks.append(data)
+            offset += len(data)
+        layout[key] = entry
+    payload = b''.join(chunks)
+
+    _write_atomic(Path(path), lambda p: p.write_bytes(payload))
+    return layout, scalars, len(payload)
+
+
+def export_artifact(model_dir: Path, name: str, model=None, encoders: Optional[Dict] = None,
+                    features: Optional[List[str]] = None, version: Optional[str] = None) -> Dict:
+    """
+    피클 세트 → 컴팩트 아티팩트
+
+    model/encoders/features를 넘기지 않으면 피클에서 읽는다.
+
+    Returns:
+        저장된 메타 정보
+    """
+    if not XGBOOST_AVAILABLE:
+        raise RuntimeError("xgboost가 설치되지 않아 부스터를 저장할 수 없습니다")
+    model_dir = Path(model_dir)
+    if model is None or encoders is None or features is None:
+        import joblib
+        src = pickle_paths(model_dir, name)
+        model = joblib.load(src['model']) if model is None else model
+        encoders = joblib.load(src['encoders']) if encoders is None else encoders
+        features = joblib.load(src['features']) if features is None else features
+    if not hasattr(model, 'save_model'):
+        raise TypeError(f"{type(model).__name__}는 네이티브 저장을 지원하지 않습니다")
+
+    paths = artifact_paths(model_dir, name)
+
+    layout, scalars, size = write_encoder_tables(paths['encoders'], encoders)
+    _write_atomic(paths['booster'], lambda p: model.save_model(str(p)))
+
+    meta = {
+        'artifact_version': ARTIFACT_VERSION,
+        'name': name,
+        'version': version,
+        'estimator': type(model).__name__,
+        'features': list(features),
+        'encoder_order': list(encoders.keys()),
+        'tables': layout,
+        'scalars': scalars,
+        'files': {
+            'booster': os.path.getsize(paths['booster']),
+            'encoders': size,
+        },
+        'source': source_fingerprint(model_dir, name),
+        'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    # 메타는 마지막에 - 메타가 있으면 나머지 파일은 완전함
+    _write_atomic(paths['meta'], lambda p: p.write_text(
+        json.dumps(meta, ensure_ascii=False, indent=1), encoding='utf-8'))
+    return meta
+
+
+def read_meta(model_dir: Path, name: str) -> Optional[Dict]:
+    """아티팩트 메타 (없거나 파일 크기가 맞지 않으면 None)"""
+    paths = artifact_paths(model_dir, name)
+    try:
+        meta = json.loads(paths['meta'].read_text(encoding='utf-8'))
+        if meta.get('artifact_version') != ARTIFACT_VERSION:
+            return None
+        if os.path.getsize(paths['booster']) != meta['files']['booster'] or \
+                os.path.getsize(paths['encoders']) != meta['files']['encoders']:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return meta
+
+
+def load_encoders(path: Path, meta: Dict) -> Dict:
+    """인코더 바이너리를 memmap으로 열어 원본과 같은 키 순서의 사전 구성"""
+    tables = {}
+    if meta['tables']:
+        buf = np.memmap(path, dtype=np.uint8, mode='r')
+        for key, entry in meta['tables'].items():
+            parts = {}
+            for part in ('offsets', 'blob', 'values', 'slots'):
+                start, dtype, count = entry[part]
+                dtype = np.dtype(dtype)
+                parts[part] = buf[start:start + dtype.itemsize * count].view(dtype)
+            tables[key] = EncoderTable(**parts)
+    encoders = {}
+    for key in meta['encoder_order']:
+        encoders[key] = tables[key] if key in tables else meta['scalars'][key]
+    return encoders
+
+
+def load_artifact(model_dir: Path, name: str, meta: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    컴팩트 아티팩트 로드
+
+    Returns:
+        {'model', 'encoders', 'features', 'meta'} 또는 None (아티팩트 없음/불완전)
+    """
+    if not XGBOOST_AVAILABLE:
+        return None
+    meta = meta or read_meta(model_dir, name)
+    if meta is None:
+        return None
+    paths = artifact_paths(model_dir, name)
+    estimator = getattr(xgb, meta.get('estimator', 'XGBRegressor'), None)
+    if estimator is None or not hasattr(estimator, 'load_model'):
+        return None
+    model = estimator()
+    model.load_model(str(paths['booster']))
+    return {
+        'model': model,
+        'encoders': load_encoders(paths['encoders'], meta),
+        'features': list(meta['features']),
+        'meta': meta,
+    }
+
+
+def find_pickle_sets(model_dir: Path) -> List[str]:
+    """models/ 안의 완전한 피클 세트 이름 (model + encoders + features)"""
+    names = []
+    for path in sorted(Path(model_dir).glob('*_features.pkl')):
+        name = path.name[:-len('_features.pkl')]
+        if all(p.exists() for p in pickle_paths(model_dir, name).values()):
+            names.append(name)
+    return names
+
+
+if __name__ == "__main__":
+    from services.prediction_v12 import MODEL_DIR
+
+    names = sys.argv[1:] or find_pickle_sets(MODEL_DIR)
+    for name in names:
+        start = time.perf_counter()
+        meta = export_artifact(MODEL_DIR, name)
+        total = sum(meta['files'].values())
+        print(f"✓ {name}: {len(meta['tables'])}개 인코더 테이블, {total / 1024:.0f}KB "
+              f"({time.perf_counter() - start:.2f}s)")
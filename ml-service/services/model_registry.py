@@ -0,0 +1,478 @@
+"""
+프로세스 공용 모델 레지스트리
+=============================
+- 국산/외제 세그먼트별 모델(부스터 + 인코더 + 피처 순서)을 프로세스당 한 번만 로드
+  → 예측 서비스, 추천 서비스(가치 평가 인덱스) 등 모든 서비스가 같은 객체를 공유
+- 컴팩트 아티팩트(model_artifacts)가 있고 원본 피클과 지문이 맞으면 우선 사용
+  (UBJSON 부스터 + memmap 인코더 → 빠른 콜드 스타트, 인코더 페이지를 워커끼리 공유)
+- 아티팩트가 없거나 오래됐으면 피클로 로드하고, MODEL_ARTIFACT_AUTOEXPORT=1(기본)이면
+  다음 시작부터 쓰도록 아티팩트를 생성
+
+버전 롤아웃 (재시작 없이 교체):
+- models/의 <세그먼트>_v<N> 세트를 버전으로 인식 (기본 라이브 = 가장 높은 버전, MODEL_VERSION_<세그먼트>로 고정)
+- stage(): 백그라운드 스레드에서 로드 → 고정 배치로 워밍업 → 라이브 참조를 원자적으로 교체
+  (진행 중인 요청은 잡고 있던 이전 번들로 끝까지 처리, 워밍업은 서빙 스레드/풀을 쓰지 않음)
+- shadow 모드: 후보를 라이브로 올리지 않고 단건 예측마다 후보 예측을 비동기로 계산해
+  라이브 예측과 나란히 logs/shadow_predictions.log에 기록 (대기열이 차면 버림 → 서빙 지연 없음)
+- promote(): 섀도 후보를 라이브로, rollback(): 직전 라이브로
+
+사용:
+    bundle = get_model_registry().get('domestic')
+    bundle.model, bundle.pipeline, bundle.features, bundle.version
+    get_model_registry().stage('domestic', 'V12', mode='shadow')
+"""
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services import model_artifacts
+from services.feature_pipeline import FeaturePipeline
+from services.model_utils import ModelNameResolver
+
+MODEL_DIR = Path(__file__).parent.parent.parent / 'models'
+LOG_DIR = Path(__file__).parent.parent.parent / 'logs'
+
+SEGMENTS = ('domestic', 'imported')
+
+# 피클 로드 후 컴팩트 아티팩트 자동 생성
+AUTO_EXPORT = os.getenv("MODEL_ARTIFACT_AUTOEXPORT", "1") == "1"
+
+# 섀도 비교 샘플링 비율 / 대기열 한도
+SHADOW_SAMPLE_RATE = float(os.getenv("MODEL_SHADOW_SAMPLE_RATE", "1.0"))
+SHADOW_MAX_QUEUE = 256
+
+# 섀도 오차 분위수 계산에 쓰는 최근 비교 수
+SHADOW_WINDOW = 2000
+
+_LABELS = {'domestic': 'Domestic', 'imported': 'Imported'}
+_NAME_PATTERN = re.compile(r'^(domestic|imported)_v(\d+)$')
+
+
+@dataclass
+class ModelBundle:
+    """세그먼트 하나의 예측에 필요한 모든 것"""
+    segment: str               # domestic / imported
+    version: str               # V12, V14 ...
+    name: str                  # 파일 이름 (domestic_v12)
+    model: Any
+    encoders: Dict
+    features: List[str]
+    source: str                # compact / pickle
+    load_seconds: float
+    resolver: Optional[ModelNameResolver] = None
+    pipeline: Optional[FeaturePipeline] = None
+    loaded_at: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        if self.resolver is None:
+            self.resolver = ModelNameResolver((self.encoders or {}).get('model_enc', {}))
+        if self.pipeline is None:  # 모르는 피처가 있으면 ValueError → 로드 실패
+            self.pipeline = FeaturePipeline(self.segment, self.features, self.encoders or {},
+                                            resolver=self.resolver)
+
+    def describe(self) -> Dict:
+        return {'version': self.version, 'name': self.name, 'source': self.source,
+                'features': len(self.features), 'load_seconds': round(self.load_seconds, 3),
+                'loaded_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.loaded_at))}
+
+
+class ShadowRecorder:
+    """후보 모델 예측을 별도 스레드에서 계산해 라이브 예측과 함께 기록"""
+
+    def __init__(self, log_path: Path = LOG_DIR / 'shadow_predictions.log',
+                 max_queue: int = SHADOW_MAX_QUEUE, sample_rate: float = SHADOW_SAMPLE_RATE):
+        self.max_queue = max_queue
+        self.sample_rate = sample_rate
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-shadow')
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+        self._errors: Dict[str, deque] = {}
+
+        self._log = logging.getLogger('car_sentix.shadow')
+        self._log.propagate = False
+        if not self._log.handlers:
+            try:
+                Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(log_path, maxBytes=10 * 1024 * 1024, backupCount=3, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self._log.addHandler(handler)
+                self._log.setLevel(logging.INFO)
+            except OSError as e:
+                print(f"⚠️ 섀도 예측 로그 비활성화: {e}")
+
+    def _segment_stats(self, segment: str) -> Dict:
+        stats = self._stats.get(segment)
+        if stats is None:
+            stats = self._stats[segment] = {'submitted': 0, 'compared': 0, 'dropped': 0,
+                                            'sampled_out': 0, 'errors': 0, 'abs_pct_sum': 0.0}
+            self._errors[segment] = deque(maxlen=SHADOW_WINDOW)
+        return stats
+
+    def submit(self, segment: str, live: ModelBundle, candidate: ModelBundle, live_price: float,
+               compute: Callable[[], float], request: Dict):
+        """후보 예측 예약 (즉시 반환 - 대기열이 차 있으면 버림)"""
+        with self._lock:
+            stats = self._segment_stats(segment)
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                stats['sampled_out'] += 1
+                return
+            if self._pending >= self.max_queue:
+                stats['dropped'] += 1
+                return
+            self._pending += 1
+            stats['submitted'] += 1
+        self._executor.submit(self._run, segment, live.version, candidate.version,
+                              float(live_price), compute, request)
+
+    def _run(self, segment: str, live_version: str, candidate_version: str, live_price: float,
+             compute: Callable[[], float], request: Dict):
+        try:
+            start = time.perf_counter()
+            candidate_price = float(compute())
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            diff_pct = (candidate_price - live_price) / max(live_price, 1) * 100
+            with self._lock:
+                stats = self._segment_stats(segment)
+                stats['compared'] += 1
+                stats['abs_pct_sum'] += abs(diff_pct)
+                self._errors[segment].append(abs(diff_pct))
+            self._log.info(json.dumps({
+                'ts': time.strftime('%Y-%m-%dT%H:%M:%S'), 'segment': segment,
+                'live_version': live_version, 'candidate_version': candidate_version,
+                'live_price': live_price, 'candidate_price': candidate_price,
+                'diff_pct': round(diff_pct, 2), 'candidate_ms': round(elapsed_ms, 2),
+                'request': request,
+            }, ensure_ascii=False, default=str))
+        except Exception as e:
+            with self._lock:
+                self._segment_stats(segment)['errors'] += 1
+            print(f"⚠️ 섀도 예측 실패 ({segment} {candidate_version}): {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def reset(self, segment: str):
+        with self._lock:
+            self._stats.pop(segment, None)
+            self._errors.pop(segment, None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            out = {}
+            for segment, stats in self._stats.items():
+                errors = np.fromiter(self._errors[segment], dtype=np.float64)
+                compared = stats['compared']
+                out[segment] = {
+                    **{k: v for k, v in stats.items() if k != 'abs_pct_sum'},
+                    'mean_abs_diff_pct': round(stats['abs_pct_sum'] / compared, 2) if compared else None,
+                    'p50_abs_diff_pct': round(float(np.percentile(errors, 50)), 2) if len(errors) else None,
+                    'p95_abs_diff_pct': round(float(np.percentile(errors, 95)), 2) if len(errors) else None,
+                }
+            return {'pending': self._pending, 'max_queue': self.max_queue,
+                    'sample_rate': self.sample_rate, 'segments': out}
+
+
+class ModelRegistry:
+    """세그먼트 → 라이브 ModelBundle (지연 로드, 프로세스당 1회) + 버전 롤아웃"""
+
+    def __init__(self, model_dir: Path = MODEL_DIR, auto_export: bool = AUTO_EXPORT,
+                 shadow_recorder: Optional[ShadowRecorder] = None):
+        self.model_dir = Path(model_dir)
+        self.auto_export = auto_export
+        self._live: Dict[str, Optional[ModelBundle]] = {}
+        self._previous: Dict[str, ModelBundle] = {}
+        self._shadows: Dict[str, ModelBundle] = {}
+        self._rollouts: Dict[str, Dict] = {}
+        self._listeners: List[Callable[[str, ModelBundle], None]] = []
+        self._warmer: Optional[Callable[[ModelBundle], Dict]] = None
+        self._shadow_recorder = shadow_recorder
+        self._lock = threading.Lock()
+        self._rollout_lock = threading.Lock()
+        self.stats = {'loads': 0, 'compact_loads': 0, 'pickle_loads': 0, 'exports': 0, 'errors': 0, 'swaps': 0}
+
+    # ========== 조회 ==========
+
+    def get(self, segment: str) -> Optional[ModelBundle]:
+        """세그먼트 라이브 모델 (없으면 None) - 처음 호출 시 로드"""
+        if segment in self._live:
+            return self._live[segment]
+        with self._lock:
+            if segment not in self._live:
+                self._live[segment] = self._load_default(segment)
+            return self._live[segment]
+
+    def load_all(self) -> Dict[str, Optional[ModelBundle]]:
+        return {segment: self.get(segment) for segment in SEGMENTS}
+
+    def shadow(self, segment: str) -> Optional[ModelBundle]:
+        """섀도 후보 (없으면 None)"""
+        return self._shadows.get(segment)
+
+    @property
+    def shadow_recorder(self) -> ShadowRecorder:
+        if self._shadow_recorder is None:
+            with self._lock:
+                if self._shadow_recorder is None:
+                    self._shadow_recorder = ShadowRecorder()
+        return self._shadow_recorder
+
+    def live_tag(self) -> str:
+        """라이브 모델 이름 조합 (교체 시 바뀜 - 예측값 캐시 무효화용)"""
+        return ','.join(f"{segment}={bundle.name if bundle else 'none'}"
+                        for segment, bundle in sorted(self.load_all().items()))
+
+    def available(self, segment: str) -> List[Dict]:
+        """디스크에 있는 세그먼트 버전 목록 (높은 버전 먼저)"""
+        found: Dict[str, Dict] = {}
+        for path in self.model_dir.glob(f'{segment}_v*'):
+            for suffix in ('_features.pkl', '_artifact.json'):
+                if not path.name.endswith(suffix):
+                    continue
+                name = path.name[:-len(suffix)]
+                match = _NAME_PATTERN.match(name)
+                if not match or match.group(1) != segment or name in found:
+                    continue
+                meta, has_pickle = self._available(name, quiet=True)
+                if meta is None and not has_pickle:
+                    continue
+                found[name] = {'version': f"V{match.group(2)}", 'name': name,
+                               'compact': meta is not None, 'pickle': has_pickle}
+        return sorted(found.values(), key=lambda v: -int(v['version'][1:]))
+
+    # ========== 로드 ==========
+
+    def _available(self, name: str, quiet: bool = False) -> Tuple[Optional[Dict], bool]:
+        """(최신 아티팩트 메타 또는 None, 피클 세트 존재 여부)"""
+        pickles = model_artifacts.pickle_paths(self.model_dir, name)
+        has_pickle = pickles['model'].exists() and pickles['features'].exists()
+        meta = model_artifacts.read_meta(self.model_dir, name)
+        if meta is not None and has_pickle and \
+                meta.get('source') != model_artifacts.source_fingerprint(self.model_dir, name):
+            if not quiet:
+                print(f"[WARN] {name} compact artifact is stale - loading pickle")
+            meta = None
+        return meta, has_pickle
+
+    def _load_default(self, segment: str) -> Optional[ModelBundle]:
+        """MODEL_VERSION_<세그먼트> 고정 버전, 없으면 가장 높은 버전부터"""
+        candidates = self.available(segment)
+        pinned = os.getenv(f"MODEL_VERSION_{segment.upper()}", "").upper()
+        if pinned:
+            if any(c['version'] == pinned for c in candidates):
+                candidates.sort(key=lambda c: c['version'] != pinned)
+            else:
+                print(f"[WARN] MODEL_VERSION_{segment.upper()}={pinned} not found - using latest")
+        for idx, candidate in enumerate(candidates):
+            try:
+                bundle = self.load_version(segment, candidate['version'])
+            except Exception as e:
+                print(f"[WARN] Model load failed ({candidate['name']}): {e}")
+                continue
+            note = '' if idx == 0 else f" ({candidates[0]['version']} failed)"
+            print(f"[OK] {_LABELS.get(segment, segment)} {bundle.version} model loaded "
+                  f"[{bundle.source}, {bundle.load_seconds:.2f}s]{note}")
+            return bundle
+        return None
+
+    def load_version(self, segment: str, version: str) -> ModelBundle:
+        """지정 버전 로드 (레지스트리에 설치하지 않음)"""
+        name = f"{segment}_v{version.upper().lstrip('V')}"
+        meta, has_pickle = self._available(name)
+        if meta is None and not has_pickle:
+            raise FileNotFoundError(f"{name} 모델 파일이 없습니다")
+        try:
+            return self._load_bundle(segment, version.upper(), name, meta)
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+
+    def _load_bundle(self, segment: str, version: str, name: str, meta: Optional[Dict]) -> ModelBundle:
+        start = time.perf_counter()
+        artifact = None
+        if meta is not None:
+            try:
+                artifact = model_artifacts.load_artifact(self.model_dir, name, meta)
+            except Exception as e:
+                print(f"[WARN] {name} compact artifact load failed - loading pickle: {e}")
+
+        if artifact is not None:
+            source = 'compact'
+            model, encoders, features = artifact['model'], artifact['encoders'], artifact['features']
+        else:
+            import joblib
+            source = 'pickle'
+            paths = model_artifacts.pickle_paths(self.model_dir, name)
+            model = joblib.load(paths['model'])
+            encoders = joblib.load(paths['encoders'])
+            features = joblib.load(paths['features'])
+        elapsed = time.perf_counter() - start
+
+        self.stats['loads'] += 1
+        self.stats[f'{source}_loads'] += 1
+        if source == 'pickle' and self.auto_export and model_artifacts.XGBOOST_AVAILABLE:
+            self._export(name, version, model, encoders, features)
+
+        return ModelBundle(segment=segment, version=version, name=name, model=model,
+                           encoders=encoders, features=list(features), source=source,
+                           load_seconds=elapsed)
+
+    def _export(self, name: str, version: str, model, encoders: Dict, features: List[str]):
+        """다음 시작부터 쓸 컴팩트 아티팩트 생성 (실패해도 서비스에는 영향 없음)"""
+        try:
+            model_artifacts.export_artifact(self.model_dir, name, model, encoders, features, version)
+            self.stats['exports'] += 1
+            print(f"✓ {name} compact artifact exported")
+        except Exception as e:
+            print(f"[WARN] {name} compact artifact export failed: {e}")
+
+    # ========== 롤아웃 ==========
+
+    def set_warmer(self, warmer: Callable[[ModelBundle], Dict]):
+        """후보 번들 워밍업 함수 (예측 서비스가 등록 - 실패 시 예외)"""
+        self._warmer = warmer
+
+    def add_listener(self, listener: Callable[[str, ModelBundle], None]):
+        """라이브 교체 시 호출 (segment, 새 번들) - 결과 캐시 비우기 등"""
+        self._listeners.append(listener)
+
+    def stage(self, segment: str, version: str, mode: str = 'swap') -> Dict:
+        """
+        백그라운드 롤아웃 시작 (즉시 반환)
+
+        Args:
+            mode: swap (워밍업 후 라이브 교체) / shadow (워밍업 후 섀도 후보로 설치)
+
+        Raises:
+            ValueError: 알 수 없는 세그먼트/모드/버전
+            RuntimeError: 같은 세그먼트 롤아웃이 진행 중
+        """
+        if segment not in SEGMENTS:
+            raise ValueError(f"알 수 없는 세그먼트: {segment}")
+        if mode not in ('swap', 'shadow'):
+            raise ValueError(f"알 수 없는 모드: {mode}")
+        version = version.upper()
+        if not version.startswith('V'):
+            version = f"V{version}"
+        if not any(v['version'] == version for v in self.available(segment)):
+            raise ValueError(f"{segment} {version} 모델 파일이 없습니다")
+
+        with self._rollout_lock:
+            current = self._rollouts.get(segment)
+            if current and current['state'] in ('loading', 'warming'):
+                raise RuntimeError(f"{segment} 롤아웃 진행 중: {current['version']} ({current['state']})")
+            status = {'version': version, 'mode': mode, 'state': 'loading',
+                      'started_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'error': None}
+            self._rollouts[segment] = status
+        threading.Thread(target=self._run_rollout, args=(segment, version, mode, status),
+                         name=f"model-rollout-{segment}", daemon=True).start()
+        return dict(status)
+
+    def _run_rollout(self, segment: str, version: str, mode: str, status: Dict):
+        start = time.perf_counter()
+        try:
+            bundle = self.load_version(segment, version)
+            status['state'] = 'warming'
+            if self._warmer is not None:
+                status['warmup'] = self._warmer(bundle)
+            if mode == 'swap':
+                self._install(segment, bundle)
+                status['state'] = 'live'
+            else:
+                self.shadow_recorder.reset(segment)
+                self._shadows[segment] = bundle
+                status['state'] = 'shadow'
+                print(f"✓ {segment} {version} 섀도 모드 시작")
+        except Exception as e:
+            status['state'] = 'failed'
+            status['error'] = str(e) or type(e).__name__
+            print(f"⚠️ {segment} {version} 롤아웃 실패: {status['error']}")
+        status['seconds'] = round(time.perf_counter() - start, 3)
+
+    def _install(self, segment: str, bundle: ModelBundle):
+        """라이브 참조 원자적 교체 (진행 중 요청은 이전 번들로 끝남)"""
+        self.get(segment)  # 최초 로드가 끝난 뒤 교체
+        with self._lock:
+            previous = self._live.get(segment)
+            if previous is not None:
+                self._previous[segment] = previous
+            self._live[segment] = bundle
+            if self._shadows.get(segment) is bundle:
+                self._shadows.pop(segment)
+        self.stats['swaps'] += 1
+        print(f"✓ {segment} 모델 교체: {previous.version if previous else '-'} → {bundle.version}")
+        for listener in list(self._listeners):
+            try:
+                listener(segment, bundle)
+            except Exception as e:
+                print(f"⚠️ 모델 교체 리스너 실패: {e}")
+
+    def promote(self, segment: str) -> Dict:
+        """섀도 후보를 라이브로 (이미 워밍업됨)"""
+        bundle = self._shadows.get(segment)
+        if bundle is None:
+            raise ValueError(f"{segment} 섀도 후보가 없습니다")
+        self._install(segment, bundle)
+        status = self._rollouts.get(segment)
+        if status is not None and status.get('version') == bundle.version:
+            status['state'] = 'live'
+        return bundle.describe()
+
+    def rollback(self, segment: str) -> Dict:
+        """직전 라이브 번들로 되돌림"""
+        bundle = self._previous.get(segment)
+        if bundle is None:
+            raise ValueError(f"{segment} 이전 버전이 없습니다")
+        self._install(segment, bundle)
+        return bundle.describe()
+
+    def clear_shadow(self, segment: str) -> bool:
+        return self._shadows.pop(segment, None) is not None
+
+    def submit_shadow(self, segment: str, live: ModelBundle, live_price: float,
+                      compute: Callable[[ModelBundle], float], request: Dict):
+        """섀도 후보가 있으면 후보 예측을 비동기로 기록 (없으면 아무것도 안 함)"""
+        candidate = self._shadows.get(segment)
+        if candidate is None or candidate is live:
+            return
+        self.shadow_recorder.submit(segment, live, candidate, live_price,
+                                    lambda: compute(candidate), request)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'model_dir': str(self.model_dir),
+            'segments': {segment: (bundle.describe() if bundle else None)
+                         for segment, bundle in self._live.items()},
+            'previous': {segment: bundle.describe() for segment, bundle in self._previous.items()},
+            'shadows': {segment: bundle.describe() for segment, bundle in self._shadows.items()},
+            'rollouts': {segment: dict(status) for segment, status in self._rollouts.items()},
+            'available': {segment: self.available(segment) for segment in SEGMENTS},
+            'shadow_comparisons': self._shadow_recorder.get_stats() if self._shadow_recorder else None,
+        }
+
+
+# 싱글톤
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -3,9 +3,13 @@
 =====================
 - 정확한 모델 계열 매칭 (E-클래스 ↔ E-클래스, GLE-클래스 ↔ GLE-클래스)
 - 테슬라 모델 구분 (모델 3 ↔ 모델 3, 모델 Y ↔ 모델 Y)
+- 인코더 키 퍼지 매칭 리졸버 (사전 인덱스 + LRU 메모이제이션)
 """
 import re
-from typing import Optional
+from bisect import bisect_right
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 
 def extract_model_core(model_name: str) -> str:
@@ -102,3 +106,98 @@ def create_model_filter(df, model_column: str, target_model: str):
         pandas Series (boolean mask)
     """
     return df[model_column].apply(lambda x: is_model_match(target_model, str(x)))
+
+
+class ModelNameResolver:
+    """
+    모델명 → 인코더 키 퍼지 매칭 (인코더 세트당 1회 빌드)
+    
+    매칭 규칙 (PredictionServiceV12 기존 규칙과 동일):
+        - 후보: 괄호 앞 모델명이 키에 포함되거나, 괄호 앞 키가 모델명에 포함
+        - 우선순위: 일반(하이브리드/전기 제외) > 세대 코드 "(...)" > "뉴" > 100~8000 범위 > 나머지,
+          같은 순위에서는 인코딩 값이 큰 키, 그다음 키 순서가 앞선 키
+    
+    키별 정규화/순위를 미리 계산하고 결과는 LRU로 메모이제이션한다.
+    """
+    
+    def __init__(self, model_enc: Dict, cache_size: int = 4096):
+        self.keys: List[str] = list(model_enc.keys())
+        self.cache_size = cache_size
+        
+        # 정규화 키 (괄호 앞) → 키 인덱스 목록
+        self._clean_buckets: Dict[str, List[int]] = defaultdict(list)
+        # 부분 문자열 검색용 결합 문자열과 키 시작 오프셋
+        self._joined = '\x00'.join(self.keys)
+        self._offsets: List[int] = []
+        
+        ranked = []
+        offset = 0
+        for idx, key in enumerate(self.keys):
+            self._offsets.append(offset)
+            offset += len(key) + 1
+            
+            self._clean_buckets[key.split('(')[0].strip()].append(idx)
+            
+            value = model_enc[key]
+            is_regular = not ('하이브리드' in key or 'HEV' in key or '전기' in key or 'EV' in key)
+            if '(' in key and ')' in key:
+                tier = 0  # 세대 코드 (예: (GN7), (W213), (G30))
+            elif '뉴' in key:
+                tier = 1  # "더 뉴" / "뉴"
+            elif 100 <= value <= 8000:
+                tier = 2  # 합리적인 가격 범위
+            else:
+                tier = 3
+            ranked.append((0 if is_regular else 1, tier, -value, idx))
+        
+        # 키별 우선순위 (작을수록 우선)
+        self._priority = [0] * len(self.keys)
+        for rank, (_, _, _, idx) in enumerate(sorted(ranked)):
+            self._priority[idx] = rank
+        
+        self._cached_resolve = lru_cache(maxsize=cache_size)(self._resolve_uncached)
+    
+    def _find_containing(self, text: str) -> List[int]:
+        """text를 포함하는 키 인덱스 목록"""
+        if not text:
+            return list(range(len(self.keys)))
+        found = set()
+        pos = self._joined.find(text)
+        while pos != -1:
+            found.add(bisect_right(self._offsets, pos) - 1)
+            pos = self._joined.find(text, pos + 1)
+        return list(found)
+    
+    def _resolve_uncached(self, model_name: str) -> str:
+        model_clean = model_name.split('(')[0].strip()  # 괄호 제거
+        
+        # 모델명이 키에 포함되는 경우
+        matches = set(self._find_containing(model_clean))
+        # 키(괄호 제거)가 모델명에 포함되는 경우
+        for key_clean, indices in self._clean_buckets.items():
+            if key_clean in model_name:
+                matches.update(indices)
+        
+        if not matches:
+            return model_name
+        return self.keys[min(matches, key=self._priority.__getitem__)]
+    
+    def resolve(self, model_name: str) -> str:
+        """모델명에 가장 적합한 인코더 키 (매칭 없으면 입력 그대로)"""
+        return self._cached_resolve(model_name)
+    
+    def stats(self) -> Dict:
+        """캐시 적중률 통계"""
+        info = self._cached_resolve.cache_info()
+        total = info.hits + info.misses
+        return {
+            'keys': len(self.keys),
+            'cache_size': info.currsize,
+            'cache_max': info.maxsize,
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': round(info.hits / total * 100, 1) if total else 0.0,
+        }
+    
+    def clear_cache(self):
+        self._cached_resolve.cache_clear()
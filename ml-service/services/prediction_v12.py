@@ -7,14 +7,16 @@
 - 신뢰도 표시 + 분해 설명
 """
 
-import pandas as pd
 import numpy as np
-import joblib
 import os
-import re
-from typing import Dict, Optional, Tuple
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from services.feature_pipeline import IMPORTED_OPTION_PREMIUM, normalize_fuel
+from services.model_registry import ModelBundle, ModelRegistry, get_model_registry
+
 # 모델 경로
 MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'models')
 
@@ -31,6 +33,14 @@ class PredictionResult:
     warnings: list
 
 
+@dataclass
+class BatchPredictionItem:
+    """배치 예측 개별 결과 (실패 시 error에 사유)"""
+    index: int
+    result: Optional[PredictionResult] = None
+    error: Optional[str] = None
+
+
 class PredictionServiceV12:
     """가격 예측 서비스 V12 - FuelType 포함"""
     
@@ -40,12 +50,8 @@ class PredictionServiceV12:
     IMPORTED_BRANDS = ['벤츠', 'BMW', '아우디', '폭스바겐', '볼보', '렉서스', '토요타', 
                        '혼다', '닛산', '포르쉐', '재규어', '랜드로버', '미니', '지프', '테슬라']
     
-    # 옵션 프리미엄 (외제차)
-    IMPORTED_OPT_PREMIUM = {
-        'has_ventilated_seat': 120, 'has_sunroof': 100, 'has_led_lamp': 100,
-        'has_leather_seat': 80, 'has_navigation': 80, 'has_heated_seat': 60,
-        'has_smart_key': 50, 'has_rear_camera': 50,
-    }
+    # 옵션 프리미엄 (외제차) - 학습 Base_Price와 같은 값
+    IMPORTED_OPT_PREMIUM = IMPORTED_OPTION_PREMIUM
     
     # 옵션 프리미엄 (국산차) - 시장 기반
     DOMESTIC_OPT_PREMIUM = {
@@ -59,58 +65,24 @@ class PredictionServiceV12:
         'has_rear_camera': 20,      # 후방카메라: +20만원
     }
     
-    def __init__(self):
-        self.domestic_model = None
-        self.domestic_encoders = None
-        self.domestic_features = None
-        self.imported_model = None
-        self.imported_encoders = None
-        self.imported_features = None
+    # 후보 모델 워밍업용 고정 입력 (세그먼트별 대표 차량: 브랜드, 모델, 연식, 주행거리)
+    WARMUP_VEHICLES = {
+        'domestic': [('현대', '그랜저', 2022, 30000), ('기아', 'K5', 2020, 60000),
+                     ('현대', '아반떼', 2018, 90000), ('기아', '쏘렌토', 2021, 40000),
+                     ('제네시스', 'G80', 2023, 10000), ('현대', '포터', 2016, 160000)],
+        'imported': [('벤츠', 'E-클래스', 2021, 40000), ('BMW', '5시리즈', 2019, 70000),
+                     ('아우디', 'A6', 2020, 50000), ('렉서스', 'ES', 2022, 20000),
+                     ('볼보', 'XC60', 2018, 90000), ('테슬라', '모델 3', 2023, 10000)],
+    }
+    
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        self.registry = registry or get_model_registry()
+        self.registry.set_warmer(self.warm_up)
         self._load_models()
     
     def _load_models(self):
-        """모델 로드 (V12/V14 우선, 없으면 V11/V13)"""
-        try:
-            # 국산차 V12 (FuelType 포함) - features 파일도 확인
-            domestic_v12_path = os.path.join(MODEL_DIR, 'domestic_v12.pkl')
-            domestic_v12_features_path = os.path.join(MODEL_DIR, 'domestic_v12_features.pkl')
-            domestic_v11_path = os.path.join(MODEL_DIR, 'domestic_v11.pkl')
-
-            if os.path.exists(domestic_v12_path) and os.path.exists(domestic_v12_features_path):
-                self.domestic_model = joblib.load(domestic_v12_path)
-                self.domestic_encoders = joblib.load(os.path.join(MODEL_DIR, 'domestic_v12_encoders.pkl'))
-                self.domestic_features = joblib.load(domestic_v12_features_path)
-                self.domestic_version = 'V12'
-                print("[OK] Domestic V12 model loaded (with FuelType)")
-            elif os.path.exists(domestic_v11_path):
-                # V12 features가 없으면 V11으로 폴백
-                self.domestic_model = joblib.load(domestic_v11_path)
-                self.domestic_encoders = joblib.load(os.path.join(MODEL_DIR, 'domestic_v11_encoders.pkl'))
-                self.domestic_features = joblib.load(os.path.join(MODEL_DIR, 'domestic_v11_features.pkl'))
-                self.domestic_version = 'V11'
-                print("[OK] Domestic V11 model loaded (V12 features missing)")
-
-            # 외제차 V14 (FuelType 포함) - features 파일도 확인
-            imported_v14_path = os.path.join(MODEL_DIR, 'imported_v14.pkl')
-            imported_v14_features_path = os.path.join(MODEL_DIR, 'imported_v14_features.pkl')
-            imported_v13_path = os.path.join(MODEL_DIR, 'imported_v13.pkl')
-
-            if os.path.exists(imported_v14_path) and os.path.exists(imported_v14_features_path):
-                self.imported_model = joblib.load(imported_v14_path)
-                self.imported_encoders = joblib.load(os.path.join(MODEL_DIR, 'imported_v14_encoders.pkl'))
-                self.imported_features = joblib.load(imported_v14_features_path)
-                self.imported_version = 'V14'
-                print("[OK] Imported V14 model loaded (with FuelType)")
-            elif os.path.exists(imported_v13_path):
-                # V14 features가 없으면 V13으로 폴백
-                self.imported_model = joblib.load(imported_v13_path)
-                self.imported_encoders = joblib.load(os.path.join(MODEL_DIR, 'imported_v13_encoders.pkl'))
-                self.imported_features = joblib.load(os.path.join(MODEL_DIR, 'imported_v13_features.pkl'))
-                self.imported_version = 'V13'
-                print("[OK] Imported V13 model loaded (V14 features missing)")
-
-        except Exception as e:
-            print(f"[WARN] Model load failed: {e}")
+        """모델 로드 (공용 레지스트리 - 기본은 가장 높은 버전, 교체는 registry.stage)"""
+        self.registry.load_all()
     
     def _get_model_type(self, brand: str) -> str:
         for b in self.DOMESTIC_BRANDS:
@@ -118,318 +90,29 @@ class PredictionServiceV12:
                 return 'domestic'
         return 'imported'
     
-    def _find_best_model_match(self, model_name: str, model_enc: Dict) -> str:
-        """모델 이름 퍼지 매칭 - 최신 세대 코드 우선"""
-        # 부분 일치 찾기 (모델 이름이 포함된 것)
-        matches = []
-        model_clean = model_name.split('(')[0].strip()  # 괄호 제거
-        
-        for key in model_enc.keys():
-            key_clean = key.split('(')[0].strip()
-            if model_clean in key or key_clean in model_name or model_name in key:
-                matches.append((key, model_enc[key]))
-        
-        if not matches:
-            return model_name
-        
-        # 하이브리드/전기 제외한 일반 모델 필터링
-        regular_matches = [(k, v) for k, v in matches 
-                          if '하이브리드' not in k and 'HEV' not in k and '전기' not in k and 'EV' not in k]
-        
-        target_matches = regular_matches if regular_matches else matches
-        
-        # 1순위: 괄호 세대 코드가 있는 모델 (예: (GN7), (W213), (G30))
-        generation_matches = [(k, v) for k, v in target_matches if '(' in k and ')' in k]
-        if generation_matches:
-            # 세대 코드 모델 중 가장 높은 값 선택
-            best_match = max(generation_matches, key=lambda x: x[1])
-            return best_match[0]
-        
-        # 2순위: "더 뉴" 또는 "뉴"가 포함된 최신 모델
-        new_matches = [(k, v) for k, v in target_matches if '더 뉴' in k or '뉴' in k]
-        if new_matches:
-            best_match = max(new_matches, key=lambda x: x[1])
-            return best_match[0]
-        
-        # 3순위: 합리적인 가격 범위의 모델 (100~8000만원)
-        reasonable_matches = [(k, v) for k, v in target_matches if 100 <= v <= 8000]
-        if reasonable_matches:
-            best_match = max(reasonable_matches, key=lambda x: x[1])
-            return best_match[0]
-        
-        # 폴백: 전체에서 가장 높은 값
-        best_match = max(target_matches, key=lambda x: x[1])
-        return best_match[0]
+    def _bundle(self, model_type: str) -> ModelBundle:
+        """세그먼트 라이브 번들 (요청 하나는 처음 받은 번들로 끝까지 처리 → 교체 중에도 일관)"""
+        bundle = self.registry.get(model_type)
+        if bundle is None:
+            if model_type == 'domestic':
+                raise ValueError("국산차 모델이 로드되지 않았습니다")
+            raise ValueError("외제차 모델이 로드되지 않았습니다")
+        return bundle
     
-    def _get_mileage_group(self, mileage: int) -> str:
-        if mileage < 30000: return 'A'
-        elif mileage < 60000: return 'B'
-        elif mileage < 100000: return 'C'
-        elif mileage < 150000: return 'D'
-        return 'E'
+    def model_versions(self) -> Dict[str, Optional[str]]:
+        """세그먼트별 라이브 모델 버전"""
+        return {segment: (bundle.version if bundle else None)
+                for segment, bundle in self.registry.load_all().items()}
     
-    def _normalize_fuel(self, fuel: str) -> str:
-        """연료 타입 정규화"""
-        fuel = str(fuel).lower()
-        if '하이브리드' in fuel or '전기' in fuel or 'hybrid' in fuel:
-            return '하이브리드'
-        elif 'lpg' in fuel:
-            return 'LPG'
-        elif '디젤' in fuel or 'diesel' in fuel:
-            return '디젤'
-        return '가솔린'
+    def get_resolver_stats(self) -> Dict:
+        """모델명 리졸버 캐시 적중률"""
+        return {segment: bundle.resolver.stats()
+                for segment, bundle in self.registry.load_all().items() if bundle is not None}
     
-    def _create_domestic_features_v12(self, model_name: str, year: int, mileage: int,
-                                       fuel: str, options: Dict, accident_free: bool, 
-                                       grade: str) -> pd.DataFrame:
-        """국산차 V12 피처 생성 (FuelType 포함)"""
-        age = 2025 - year
-        mg = self._get_mileage_group(mileage)
-        
-        # 모델명 퍼지 매칭
-        model_enc = self.domestic_encoders.get('model_enc', {})
-        best_model = self._find_best_model_match(model_name, model_enc)
-        
-        my = f"{best_model}_{year}"
-        mymg = f"{my}_{mg}"
-        fuel_norm = self._normalize_fuel(fuel)
-        
-        enc = self.domestic_encoders
-        default_val = 2500
-        
-        model_enc_val = model_enc.get(best_model, default_val)
-        my_enc_val = enc.get('model_year_enc', {}).get(my, model_enc_val)
-        mymg_enc_val = enc.get('model_year_mg_enc', {}).get(mymg, my_enc_val)
-        brand_enc_val = enc.get('brand_enc', {}).get('현대', default_val)
-        fuel_enc_val = enc.get('fuel_enc', {}).get(fuel_norm, default_val)
-        
-        # 옵션
-        opt_cols = ['has_sunroof','has_leather_seat','has_led_lamp','has_smart_key',
-                    'has_navigation','has_heated_seat','has_ventilated_seat','has_rear_camera']
-        opt_values = {c: int(bool(options.get(c, False))) for c in opt_cols}
-        opt_count = sum(opt_values.values())
-        opt_premium = (opt_values.get('has_sunroof',0)*3 + opt_values.get('has_leather_seat',0)*2 +
-                       opt_values.get('has_ventilated_seat',0)*3 + opt_values.get('has_led_lamp',0)*2)
-        
-        grade_map = {'normal': 0, 'good': 1, 'excellent': 2}
-        grade_enc = grade_map.get(grade, 0)
-        
-        f = {
-            'Model_enc': model_enc_val,
-            'Model_Year_enc': my_enc_val,
-            'Model_Year_MG_enc': mymg_enc_val,
-            'Brand_enc': brand_enc_val,
-            'Fuel_enc': fuel_enc_val,
-            'is_diesel': 1 if fuel_norm == '디젤' else 0,
-            'is_hybrid': 1 if fuel_norm == '하이브리드' else 0,
-            'is_lpg': 1 if fuel_norm == 'LPG' else 0,
-            'Age': age,
-            'Age_log': np.log1p(age),
-            'Age_sq': age ** 2,
-            'Mileage': mileage,  # 대문자 M (모델이 기대하는 이름)
-            'Mile_log': np.log1p(mileage),
-            'Km_per_Year': mileage / (age + 1),
-            'is_accident_free': 1 if accident_free else 0,
-            'inspection_grade_enc': grade_enc,
-            'Opt_Count': opt_count,
-            'Opt_Premium': opt_premium,
-            **opt_values
-        }
-        
-        return pd.DataFrame([f])[self.domestic_features]
-
-    def _create_domestic_features_v11(self, model_name: str, year: int, mileage: int,
-                                       options: Dict, accident_free: bool,
-                                       grade: str) -> pd.DataFrame:
-        """국산차 V11 피처 생성 (FuelType 미포함 - 폴백용)"""
-        age = 2025 - year
-        mg = self._get_mileage_group(mileage)
-        
-        # 모델명 퍼지 매칭
-        model_enc = self.domestic_encoders.get('model_enc', {})
-        best_model = self._find_best_model_match(model_name, model_enc)
-        
-        my = f"{best_model}_{year}"
-        mymg = f"{my}_{mg}"
-
-        enc = self.domestic_encoders
-        default_val = 2500
-
-        model_enc_val = model_enc.get(best_model, default_val)
-        my_enc_val = enc.get('model_year_enc', {}).get(my, model_enc_val)
-        mymg_enc_val = enc.get('model_year_mg_enc', {}).get(mymg, my_enc_val)
-        brand_enc_val = enc.get('brand_enc', {}).get('현대', default_val)
-
-        opt_keys = ['has_sunroof', 'has_leather_seat', 'has_navigation',
-                    'has_smart_key', 'has_rear_camera', 'has_heated_seat']
-        opt_values = {k: 1 if options.get(k, False) else 0 for k in opt_keys}
-        opt_count = sum(opt_values.values())
-        opt_premium = sum(int(bool(options.get(k, False))) * v
-                        for k, v in self.DOMESTIC_OPT_PREMIUM.items() if k in options)
-
-        grade_map = {'normal': 0, 'good': 1, 'excellent': 2}
-        grade_enc = grade_map.get(grade, 0)
-
-        f = {
-            'Model_enc': model_enc_val,
-            'Model_Year_enc': my_enc_val,
-            'Model_Year_MG_enc': mymg_enc_val,
-            'Brand_enc': brand_enc_val,
-            'Age': age,
-            'Age_log': np.log1p(age),
-            'Age_sq': age ** 2,
-            'mileage': mileage,  # V11 모델은 소문자 mileage 사용
-            'Mile_log': np.log1p(mileage),
-            'Km_per_Year': mileage / (age + 1),
-            'is_accident_free': 1 if accident_free else 0,
-            'inspection_grade_enc': grade_enc,
-            'Opt_Count': opt_count,
-            'Opt_Premium': opt_premium,
-            **opt_values
-        }
-
-        # V11 피처만 선택 (모델이 기대하는 피처 순서대로)
-        return pd.DataFrame([f])[self.domestic_features]
-
-    def _extract_class(self, model_name: str, brand: str) -> tuple:
-        """외제차 클래스 추출"""
-        model = str(model_name)
-        mfr = str(brand).lower()
-        
-        CLASS_RANK = {
-            'A': 1, 'B': 1, 'C': 2, 'E': 3, 'S': 4, 'G': 5,
-            'GLA': 2, 'GLB': 2, 'GLC': 3, 'GLE': 3, 'GLS': 4,
-            '1시리즈': 1, '3시리즈': 2, '5시리즈': 3, '7시리즈': 4,
-            'X1': 2, 'X3': 3, 'X5': 4, 'X7': 5,
-            'A3': 1, 'A4': 2, 'A6': 3, 'A8': 4,
-            'Q3': 2, 'Q5': 3, 'Q7': 4,
-        }
-        
-        if '벤츠' in mfr:
-            match = re.search(r'([A-Z])-?클래스|([A-Z])-?Class', model, re.I)
-            if match:
-                cls = (match.group(1) or match.group(2)).upper()
-                return cls, CLASS_RANK.get(cls, 3)
-            match = re.search(r'(GL[ABCES])', model, re.I)
-            if match:
-                return match.group(1).upper(), CLASS_RANK.get(match.group(1).upper(), 3)
-        
-        if 'bmw' in mfr:
-            match = re.search(r'(\d)시리즈', model)
-            if match:
-                cls = f"{match.group(1)}시리즈"
-                return cls, CLASS_RANK.get(cls, 3)
-            match = re.search(r'\b([Xi]\d)\b', model)
-            if match:
-                return match.group(1).upper(), CLASS_RANK.get(match.group(1).upper(), 3)
-        
-        if '아우디' in mfr:
-            match = re.search(r'\b(A\d|Q\d)', model, re.I)
-            if match:
-                return match.group(1).upper(), CLASS_RANK.get(match.group(1).upper(), 3)
-        
-        clean = re.sub(r'\([^)]*\)', '', model).strip()
-        first = clean.split()[0] if clean else model
-        return first if len(first) > 1 else 'Unknown', 3
+    def _normalize_fuel(self, fuel: str) -> str:
+        """연료 타입 정규화 (학습과 같은 규칙)"""
+        return normalize_fuel(fuel)
     
-    def _create_imported_features_v14(self, model_name: str, brand: str, year: int, 
-                                       mileage: int, fuel: str, options: Dict,
-                                       accident_free: bool, grade: str) -> pd.DataFrame:
-        """외제차 V14 피처 생성 (FuelType 포함)"""
-        age = 2025 - year
-        mg = self._get_mileage_group(mileage)
-        
-        # 모델명 퍼지 매칭
-        model_enc = self.imported_encoders.get('model_enc', {})
-        best_model = self._find_best_model_match(model_name, model_enc)
-        
-        my = f"{best_model}_{year}"
-        mymg = f"{my}_{mg}"
-        cls, cls_rank = self._extract_class(model_name, brand)
-        cls_year = f"{cls}_{year}"
-        fuel_norm = self._normalize_fuel(fuel)
-        
-        enc = self.imported_encoders
-        global_mean = enc.get('global_mean', 5000)
-        
-        BRAND_TIER = {
-            '벤츠': 4, 'BMW': 4, '아우디': 4, '포르쉐': 5, '렉서스': 4,
-            '볼보': 3, '폭스바겐': 2, '미니': 2, '테슬라': 4,
-        }
-        
-        grade_map = {'normal': 0, 'good': 1, 'excellent': 2}
-        
-        f = {
-            'Model_enc': model_enc.get(best_model, global_mean),
-            'Model_Year_enc': enc.get('model_year_enc', {}).get(my, global_mean),
-            'Model_Year_MG_enc': enc.get('model_year_mg_enc', {}).get(mymg, global_mean),
-            'Brand_enc': enc.get('brand_enc', {}).get(brand, global_mean),
-            'Class_enc': enc.get('class_enc', {}).get(cls, global_mean),
-            'Class_Year_enc': enc.get('class_year_enc', {}).get(cls_year, global_mean),
-            'Fuel_enc': enc.get('fuel_enc', {}).get(fuel_norm, global_mean),
-            'is_diesel': 1 if fuel_norm == '디젤' else 0,
-            'is_hybrid': 1 if fuel_norm == '하이브리드' else 0,
-            'Brand_Tier': BRAND_TIER.get(brand, 3),
-            'Class_Rank': cls_rank,
-            'Age': age,
-            'Age_log': np.log1p(age),
-            'Mileage': mileage,  # 대문자 M (모델이 기대하는 이름)
-            'Mile_log': np.log1p(mileage),
-            'Km_per_Year': mileage / (age + 1),
-            'is_accident_free': 1 if accident_free else 0,
-            'inspection_grade_enc': grade_map.get(grade, 0),
-        }
-        
-        return pd.DataFrame([f])[self.imported_features]
-
-    def _create_imported_features_v13(self, model_name: str, brand: str, year: int,
-                                       mileage: int, options: Dict,
-                                       accident_free: bool, grade: str) -> pd.DataFrame:
-        """외제차 V13 피처 생성 (FuelType 미포함 - 폴백용)"""
-        age = 2025 - year
-        mg = self._get_mileage_group(mileage)
-        
-        # 모델명 퍼지 매칭
-        model_enc = self.imported_encoders.get('model_enc', {})
-        best_model = self._find_best_model_match(model_name, model_enc)
-        
-        my = f"{best_model}_{year}"
-        mymg = f"{my}_{mg}"
-        cls, cls_rank = self._extract_class(model_name, brand)
-        cls_year = f"{cls}_{year}"
-
-        enc = self.imported_encoders
-        global_mean = enc.get('global_mean', 5000)
-
-        BRAND_TIER = {
-            '벤츠': 4, 'BMW': 4, '아우디': 4, '포르쉐': 5, '렉서스': 4,
-            '볼보': 3, '폭스바겐': 2, '미니': 2, '테슬라': 4,
-        }
-
-        grade_map = {'normal': 0, 'good': 1, 'excellent': 2}
-
-        f = {
-            'Model_enc': model_enc.get(best_model, global_mean),
-            'Brand_enc': enc.get('brand_enc', {}).get(brand, global_mean),
-            'Model_Year_enc': enc.get('model_year_enc', {}).get(my, global_mean),
-            'Model_Year_MG_enc': enc.get('model_year_mg_enc', {}).get(mymg, global_mean),
-            'Class_enc': enc.get('class_enc', {}).get(cls, global_mean),
-            'Class_Year_enc': enc.get('class_year_enc', {}).get(cls_year, global_mean),
-            'Class_Rank': cls_rank,
-            'Brand_Tier': BRAND_TIER.get(brand, 2),
-            'Age': age,
-            'Age_log': np.log1p(age),
-            'Age_sq': age ** 2,
-            'mileage': mileage,  # V13 모델은 소문자 mileage 사용
-            'Mile_log': np.log1p(mileage),
-            'Km_per_Year': mileage / (age + 1),
-            'is_accident_free': 1 if accident_free else 0,
-            'inspection_grade_enc': grade_map.get(grade, 0),
-        }
-
-        # V13 피처만 선택 (모델이 기대하는 피처 순서대로)
-        return pd.DataFrame([f])[self.imported_features]
-
     # 시장 현실 기반 연료별 가격 조정 (실제 중고차 시장 데이터 기반)
     # 동일 모델/연식/주행거리 조건에서의 연료별 가격 차이
     FUEL_ADJUSTMENT = {
@@ -439,37 +122,24 @@ class PredictionServiceV12:
         'LPG': 0.94,         # -6% (실제 데이터 기반: -5.6%)
     }
     
-    def predict(self, brand: str, model_name: str, year: int, mileage: int,
-                options: Optional[Dict] = None, accident_free: bool = True,
-                grade: str = 'normal', fuel: str = '가솔린') -> PredictionResult:
-        """통합 예측"""
-        options = options or {}
+    def _feature_record(self, brand: str, model_name: str, year: int, mileage: int,
+                        options: Dict, accident_free: bool, grade: str) -> Dict:
+        """
+        피처 파이프라인 입력 (표준 키)
+        
+        연료 피처가 있는 모델(V12/V14)도 가솔린 기준으로 예측하고 연료 차이는 _build_result에서 조정한다.
+        """
+        return {'brand': brand, 'model': model_name, 'year': year, 'mileage': mileage, 'fuel': '가솔린',
+                'options': options, 'is_accident_free': accident_free, 'inspection_grade': grade}
+    
+    def _build_result(self, model_type: str, base_price: float, model_name: str, year: int,
+                      mileage: int, options: Dict, accident_free: bool,
+                      fuel_norm: str) -> PredictionResult:
+        """모델 출력(만원) → 연료/옵션 조정, 신뢰도, 가격 범위 계산"""
         warnings = []
         
-        model_type = self._get_model_type(brand)
-        fuel_norm = self._normalize_fuel(fuel)
-        fuel_adj = self.FUEL_ADJUSTMENT.get(fuel_norm, 1.0)
-        
         if model_type == 'domestic':
-            if self.domestic_model is None:
-                raise ValueError("국산차 모델이 로드되지 않았습니다")
-            
-            if hasattr(self, 'domestic_version') and self.domestic_version == 'V12':
-                # V12: 가솔린 기준으로 예측 후 수동 연료 조정 적용
-                features = self._create_domestic_features_v12(
-                    model_name, year, mileage, '가솔린', options, accident_free, grade)
-                pred_log = self.domestic_model.predict(features)[0]
-                # 모델 출력: log(만원) -> 만원 변환
-                base_price = np.expm1(pred_log)
-                base_price = base_price * fuel_adj  # 시장 현실 기반 연료 조정
-            else:
-                # Fallback V11
-                features = self._create_domestic_features_v11(
-                    model_name, year, mileage, options, accident_free, grade)
-                pred_log = self.domestic_model.predict(features)[0]
-                # 모델 출력: log(만원) -> 만원 변환
-                base_price = np.expm1(pred_log)
-                base_price = base_price * fuel_adj
+            base_price = base_price * self.FUEL_ADJUSTMENT.get(fuel_norm, 1.0)  # 시장 현실 기반 연료 조정
             
             # 국산차 옵션 프리미엄 명시적 추가
             opt_total = sum(int(bool(options.get(k, False))) * v 
@@ -479,27 +149,9 @@ class PredictionServiceV12:
             mape = 9.7  # V12 MAPE
             
         else:  # imported
-            if self.imported_model is None:
-                raise ValueError("외제차 모델이 로드되지 않았습니다")
-            
             # 외제차 연료 조정 (디젤이 더 비싸야 함)
             imported_fuel_adj = {'가솔린': 1.0, '디젤': 1.05, '하이브리드': 1.10}.get(fuel_norm, 1.0)
             
-            if hasattr(self, 'imported_version') and self.imported_version == 'V14':
-                # V14: 가솔린 기준 예측 후 수동 조정
-                features = self._create_imported_features_v14(
-                    model_name, brand, year, mileage, '가솔린', options, accident_free, grade)
-                pred_log = self.imported_model.predict(features)[0]
-                # 모델 출력: log(만원) -> 만원 변환
-                base_price = np.expm1(pred_log)
-            else:
-                # Fallback V13
-                features = self._create_imported_features_v13(
-                    model_name, brand, year, mileage, options, accident_free, grade)
-                pred_log = self.imported_model.predict(features)[0]
-                # 모델 출력: log(만원) -> 만원 변환
-                base_price = np.expm1(pred_log)
-            
             # 연료 조정 + 옵션 프리미엄
             base_price = base_price * imported_fuel_adj
             opt_total = sum(int(bool(options.get(k, False))) * v 
@@ -545,6 +197,122 @@ class PredictionServiceV12:
             warnings=warnings
         )
     
+    def _predict_with(self, bundle: ModelBundle, brand: str, model_name: str, year: int, mileage: int,
+                      options: Dict, accident_free: bool, grade: str, fuel: str) -> PredictionResult:
+        X = bundle.pipeline.transform_records(
+            [self._feature_record(brand, model_name, year, mileage, options, accident_free, grade)])
+        pred_log = bundle.model.predict(X)[0]
+        # 모델 출력: log(만원) -> 만원 변환
+        base_price = np.expm1(pred_log)
+        
+        return self._build_result(bundle.segment, base_price, model_name, year, mileage,
+                                  options, accident_free, self._normalize_fuel(fuel))
+    
+    def predict(self, brand: str, model_name: str, year: int, mileage: int,
+                options: Optional[Dict] = None, accident_free: bool = True,
+                grade: str = 'normal', fuel: str = '가솔린') -> PredictionResult:
+        """통합 예측 (섀도 후보가 있으면 같은 입력으로 후보 예측을 비동기 기록)"""
+        options = options or {}
+        
+        bundle = self._bundle(self._get_model_type(brand))
+        args = (brand, model_name, year, mileage, options, accident_free, grade, fuel)
+        result = self._predict_with(bundle, *args)
+        
+        self.registry.submit_shadow(
+            bundle.segment, bundle, result.predicted_price,
+            lambda candidate: self._predict_with(candidate, *args).predicted_price,
+            {'brand': brand, 'model_name': model_name, 'year': year, 'mileage': mileage,
+             'fuel': fuel, 'accident_free': accident_free, 'grade': grade, 'options': options})
+        return result
+    
+    def predict_batch(self, vehicles: List[Dict]) -> List[BatchPredictionItem]:
+        """
+        배치 예측 (국산/외제 세그먼트별로 피처 행렬을 한 번에 만들어 모델 1회 호출)
+        
+        피처 행렬은 파이프라인이 만든다 (소량은 행 단위, 대량은 벡터화).
+        
+        Args:
+            vehicles: predict() 인자와 같은 키를 가진 dict 목록
+                      (brand, model_name 또는 model, year, mileage, options,
+                       accident_free, grade, fuel)
+        
+        Returns:
+            입력 순서대로 BatchPredictionItem 목록 (개별 실패는 error에 기록)
+        """
+        items: List[Optional[BatchPredictionItem]] = [None] * len(vehicles)
+        segments: Dict[str, list] = {'domestic': [], 'imported': []}
+        bundles: Dict[str, ModelBundle] = {}  # 배치 전체가 같은 번들 사용
+        
+        for idx, vehicle in enumerate(vehicles):
+            try:
+                brand = vehicle['brand']
+                params = {
+                    'model_name': vehicle.get('model_name', vehicle.get('model')),
+                    'year': int(vehicle['year']),
+                    'mileage': int(vehicle['mileage']),
+                    'options': vehicle.get('options') or {},
+                    'accident_free': vehicle.get('accident_free', True),
+                    'grade': vehicle.get('grade', 'normal'),
+                }
+                if params['model_name'] is None:
+                    raise ValueError("model_name이 없습니다")
+                model_type = self._get_model_type(brand)
+                if model_type not in bundles:
+                    bundles[model_type] = self._bundle(model_type)
+                record = self._feature_record(brand, **params)
+                fuel_norm = self._normalize_fuel(vehicle.get('fuel', '가솔린'))
+                segments[model_type].append((idx, record, params, fuel_norm))
+            except Exception as e:
+                items[idx] = BatchPredictionItem(index=idx, error=str(e) or type(e).__name__)
+        
+        for model_type, entries in segments.items():
+            if not entries:
+                continue
+            bundle = bundles[model_type]
+            try:
+                X = bundle.pipeline.transform_records([record for _, record, _, _ in entries])
+                # 모델 출력: log(만원) -> 만원 변환
+                base_prices = np.expm1(bundle.model.predict(X))
+            except Exception as e:
+                for idx, _, _, _ in entries:
+                    items[idx] = BatchPredictionItem(index=idx, error=str(e) or type(e).__name__)
+                continue
+            
+            for (idx, _, params, fuel_norm), base_price in zip(entries, base_prices):
+                try:
+                    result = self._build_result(
+                        model_type, base_price, params['model_name'], params['year'],
+                        params['mileage'], params['options'], params['accident_free'], fuel_norm)
+                    items[idx] = BatchPredictionItem(index=idx, result=result)
+                except Exception as e:
+                    items[idx] = BatchPredictionItem(index=idx, error=str(e) or type(e).__name__)
+        
+        return items
+    
+    def warm_up(self, bundle: ModelBundle) -> Dict:
+        """
+        후보 번들 워밍업 (레지스트리 롤아웃에서 교체 전 호출)
+        
+        고정 입력을 배치/단건 경로로 예측해 부스터·인코더 페이지·리졸버 캐시를 데우고,
+        예측값이 유한한 양수이며 두 경로가 일치하는지, 파이프라인의 행 단위/벡터화 피처가
+        같은지 확인한다 (이상 시 예외 → 교체 취소).
+        """
+        start = time.perf_counter()
+        rows = [self._feature_record(brand, model_name, year, mileage, {}, True, 'normal')
+                for brand, model_name, year, mileage in self.WARMUP_VEHICLES[bundle.segment]]
+        X = bundle.pipeline.transform_records(rows)
+        vectorized = bundle.pipeline.transform(bundle.pipeline.records_frame(rows)).to_numpy(dtype=np.float64)
+        if not np.allclose(X, vectorized, rtol=1e-9, equal_nan=True):
+            raise ValueError("워밍업 피처 불일치 (행 단위 / 벡터화)")
+        batch = np.expm1(bundle.model.predict(X))
+        single = np.array([np.expm1(bundle.model.predict(X[i:i + 1])[0]) for i in range(len(X))])
+        if not np.all(np.isfinite(batch)) or np.any(batch <= 0):
+            raise ValueError(f"워밍업 예측값 이상: {batch.tolist()}")
+        if not np.allclose(batch, single, rtol=1e-4):
+            raise ValueError("워밍업 단건/배치 예측 불일치")
+        return {'rows': len(rows), 'ms': round((time.perf_counter() - start) * 1000, 1),
+                'prices': [round(float(p)) for p in batch]}
+    
     def _generate_breakdown(self, model_name: str, year: int, mileage: int, fuel: str,
                             options: Dict, accident_free: bool, 
                             predicted_price: float, model_type: str) -> Dict:
@@ -557,13 +325,16 @@ class PredictionServiceV12:
         }
 
 
-# 싱글톤
+# 싱글톤 (run_server, 추천 서비스 등 프로세스 전체가 공유)
 _prediction_service = None
+_prediction_service_lock = threading.Lock()
 
 def get_prediction_service() -> PredictionServiceV12:
     global _prediction_service
     if _prediction_service is None:
-        _prediction_service = PredictionServiceV12()
+        with _prediction_service_lock:
+            if _prediction_service is None:
+                _prediction_service = PredictionServiceV12()
     return _prediction_service
 
 
@@ -16,10 +16,18 @@ from collections import Counter
 import sys
 import os
 import re
+import threading
+import time
 
 # 상위 경로 추가 (prediction_v12 사용 위함)
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from services.feature_pipeline import normalize_fuel
+from services.model_registry import get_model_registry
+from services.valuation_index import ValuationIndex, compute_value_scores
+from services.vehicle_serializer import column_list, prepare_details
+from services.vehicle_store import VehicleStore, get_vehicle_store
+
 
 def extract_model_core(model_name: str) -> str:
     """
@@ -88,12 +96,22 @@ class RecommendationService:
     # 엔카 데스크톱 상세페이지 URL 템플릿 (모바일은 502 에러 발생)
     ENCAR_DETAIL_URL = "https://www.encar.com/dc/dc_cardetailview.do?carid={car_id}"
     
-    def __init__(self):
-        self.data_path = Path(__file__).parent.parent.parent / "data"
-        self.db_path = Path(__file__).parent.parent.parent / "data" / "user_data.db"
+    # 추천 응답에 포함할 상세정보 필드
+    CAR_DETAIL_FIELDS = ['is_accident_free', 'inspection_grade', 'has_sunroof', 'has_navigation',
+                         'has_leather_seat', 'has_smart_key', 'has_rear_camera',
+                         'has_heated_seat', 'has_ventilated_seat']
+    
+    # 가치 평가 인덱스 변경 감지 주기 (초)
+    VALUATION_CHECK_INTERVAL = 60
+    
+    def __init__(self, build_valuation_index: bool = True, store: Optional[VehicleStore] = None):
+        self._store = store or get_vehicle_store()
+        self.data_path = self._store.data_dir  # 매물 CSV와 같은 폴더 (기본: data/)
+        self.db_path = self.data_path / "user_data.db"
         
         self._domestic_df = None
         self._imported_df = None
+        self._all_df = None
         self._prediction_service = None
         self._car_details = {}  # car_id별 상세 옵션 정보
         
@@ -101,6 +119,18 @@ class RecommendationService:
         self._load_data()
         self._load_car_details()  # 옵션 상세 정보 로드
         self._analyze_popular()
+        
+        # 가치 평가 인덱스 (전체 매물 예측가 사전 계산)
+        self._valuation_index = ValuationIndex(
+            cache_path=self.data_path / "valuation_index.npz",
+            source_paths=[self._store.file_path('domestic'), self._store.file_path('imported')],
+            model_dir=get_model_registry().model_dir,
+            model_tag=get_model_registry().live_tag,
+        )
+        self._valuation_build_lock = threading.Lock()
+        self._valuation_checked_at = time.time()
+        if build_valuation_index and self._valuation_index.is_stale():
+            self._start_valuation_build()
     
     def _init_db(self):
         """SQLite DB 초기화 (영구 저장)"""
@@ -167,86 +197,57 @@ class RecommendationService:
             )
         ''')
         
+        # 사용자별 이력 조회 / 이력 스탬프용 인덱스
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_search_history_user ON search_history(user_id, id)')
+        
         conn.commit()
         conn.close()
         print(f"✓ DB 초기화 완료: {self.db_path}")
     
     def _load_data(self):
-        """엔카 데이터 로드 (가격 이상치 필터링 적용)"""
-        try:
-            domestic_path = self.data_path / "encar_raw_domestic.csv"
-            if domestic_path.exists():
-                self._domestic_df = pd.read_csv(domestic_path)
-                self._domestic_df['YearOnly'] = (self._domestic_df['Year'] // 100).astype(int)
-                self._domestic_df['Type'] = 'domestic'
-                # 가격 이상치 필터링 (가격 미정/상담 차량 제외)
-                original_count = len(self._domestic_df)
-                self._domestic_df = self._domestic_df[
-                    (self._domestic_df['Price'] >= self.PRICE_MIN) &
-                    (self._domestic_df['Price'] <= self.PRICE_MAX)
-                ]
-                print(f"✓ 국산차 데이터: {len(self._domestic_df):,}건 (필터링: {original_count - len(self._domestic_df):,}건 제외)")
-        except Exception as e:
-            print(f"⚠️ 국산차 로드 실패: {e}")
-
-        try:
-            imported_path = self.data_path / "encar_imported_data.csv"
-            if imported_path.exists():
-                self._imported_df = pd.read_csv(imported_path)
-                self._imported_df['YearOnly'] = (self._imported_df['Year'] // 100).astype(int)
-                self._imported_df['Type'] = 'imported'
-                # 가격 이상치 필터링 (가격 미정/상담 차량 제외)
-                original_count = len(self._imported_df)
-                self._imported_df = self._imported_df[
-                    (self._imported_df['Price'] >= self.PRICE_MIN) &
-                    (self._imported_df['Price'] <= self.PRICE_MAX)
-                ]
-                print(f"✓ 외제차 데이터: {len(self._imported_df):,}건 (필터링: {original_count - len(self._imported_df):,}건 제외)")
-        except Exception as e:
-            print(f"⚠️ 외제차 로드 실패: {e}")
+        """엔카 데이터 (공유 차량 스토어, 가격 이상치 필터링 적용)"""
+        frames = {}
+        for category, label in (('domestic', '국산차'), ('imported', '외제차')):
+            df = self._store.get(category)
+            if df is None:
+                frames[category] = None
+                continue
+            # 가격 이상치 필터링 (가격 미정/상담 차량 제외)
+            filtered = df[(df['price'] >= self.PRICE_MIN) & (df['price'] <= self.PRICE_MAX)]
+            frames[category] = filtered
+            print(f"✓ {label} 데이터: {len(filtered):,}건 (필터링: {len(df) - len(filtered):,}건 제외)")
+        
+        self._domestic_df = frames['domestic']
+        self._imported_df = frames['imported']
+        
+        # 국산+외제 통합 테이블 (요청마다 concat하지 않도록 한 번만 생성)
+        dfs = [d for d in (self._domestic_df, self._imported_df) if d is not None]
+        if dfs:
+            combined = pd.concat(dfs, ignore_index=True)
+            self._all_df = combined.astype({c: 'category' for c in ('brand', 'model', 'fuel', 'category')
+                                            if c in combined.columns})
+        else:
+            self._all_df = None
     
     def _load_car_details(self):
-        """차량 상세 옵션 정보 로드 (car_id별 조회용)"""
+        """차량 상세 옵션 정보 로드 (car_id별 조회용, 컬럼 단위 변환)"""
         try:
-            # 국산차 상세 정보
-            domestic_details_path = self.data_path / "complete_domestic_details.csv"
-            if domestic_details_path.exists():
-                df = pd.read_csv(domestic_details_path)
-                for _, row in df.iterrows():
-                    car_id = str(row.get('car_id', ''))
-                    if car_id:
-                        self._car_details[car_id] = {
-                            'is_accident_free': bool(row.get('is_accident_free', 0)),
-                            'inspection_grade': str(row.get('inspection_grade', '')),
-                            'has_sunroof': bool(row.get('has_sunroof', 0)),
-                            'has_navigation': bool(row.get('has_navigation', 0)),
-                            'has_leather_seat': bool(row.get('has_leather_seat', 0)),
-                            'has_smart_key': bool(row.get('has_smart_key', 0)),
-                            'has_rear_camera': bool(row.get('has_rear_camera', 0)),
-                            'has_heated_seat': bool(row.get('has_heated_seat', 0)),
-                            'has_ventilated_seat': bool(row.get('has_ventilated_seat', 0)),
-                        }
-                print(f"✓ 국산차 상세정보: {len(self._car_details):,}건")
-            
-            # 외제차 상세 정보
-            imported_details_path = self.data_path / "complete_imported_details.csv"
-            if imported_details_path.exists():
-                df = pd.read_csv(imported_details_path)
-                for _, row in df.iterrows():
-                    car_id = str(row.get('car_id', ''))
+            # 국산차 → 외제차 순서 (같은 car_id는 먼저 로드된 정보 유지)
+            for name, label in (('domestic_details', '국산차 상세정보'),
+                                ('imported_details', '전체 차량 상세정보')):
+                details = prepare_details(self._store.get(name))
+                if details is None:
+                    continue
+                frame = pd.DataFrame(
+                    {col: details[col].to_numpy() if col in details.columns else False
+                     for col in self.CAR_DETAIL_FIELDS},
+                    index=details.index.astype(str)
+                )
+                frame['inspection_grade'] = frame['inspection_grade'].astype(str)
+                for car_id, record in zip(frame.index, frame.to_dict('records')):
                     if car_id and car_id not in self._car_details:
-                        self._car_details[car_id] = {
-                            'is_accident_free': bool(row.get('is_accident_free', 0)),
-                            'inspection_grade': str(row.get('inspection_grade', '')),
-                            'has_sunroof': bool(row.get('has_sunroof', 0)),
-                            'has_navigation': bool(row.get('has_navigation', 0)),
-                            'has_leather_seat': bool(row.get('has_leather_seat', 0)),
-                            'has_smart_key': bool(row.get('has_smart_key', 0)),
-                            'has_rear_camera': bool(row.get('has_rear_camera', 0)),
-                            'has_heated_seat': bool(row.get('has_heated_seat', 0)),
-                            'has_ventilated_seat': bool(row.get('has_ventilated_seat', 0)),
-                        }
-                print(f"✓ 전체 차량 상세정보: {len(self._car_details):,}건")
+                        self._car_details[car_id] = record
+                print(f"✓ {label}: {len(self._car_details):,}건")
         except Exception as e:
             print(f"⚠️ 상세정보 로드 실패: {e}")
     
@@ -261,9 +262,9 @@ class RecommendationService:
         
         if self._domestic_df is not None:
             # 국산차: 등록 수 기반 인기 모델
-            model_stats = self._domestic_df.groupby(['Manufacturer', 'Model']).agg({
-                'Price': ['mean', 'median', 'count'],
-                'YearOnly': 'max'
+            model_stats = self._domestic_df.groupby(['brand', 'model'], observed=True).agg({
+                'price': ['mean', 'median', 'count'],
+                'reg_year': 'max'
             }).reset_index()
             model_stats.columns = ['brand', 'model', 'avg_price', 'median_price', 'listings', 'latest_year']
             
@@ -286,9 +287,9 @@ class RecommendationService:
         
         if self._imported_df is not None:
             # 외제차
-            model_stats = self._imported_df.groupby(['Manufacturer', 'Model']).agg({
-                'Price': ['mean', 'median', 'count'],
-                'YearOnly': 'max'
+            model_stats = self._imported_df.groupby(['brand', 'model'], observed=True).agg({
+                'price': ['mean', 'median', 'count'],
+                'reg_year': 'max'
             }).reset_index()
             model_stats.columns = ['brand', 'model', 'avg_price', 'median_price', 'listings', 'latest_year']
             
@@ -453,8 +454,136 @@ class RecommendationService:
                     result.append({**self._popular_imported[i], 'type': 'imported'})
             return result[:limit * 2]
     
+    # ========== 가치 평가 인덱스 ==========
+    
+    def _combined_df(self, category: str = 'all') -> Optional[pd.DataFrame]:
+        """카테고리별 매물 테이블 (all이면 국산+외제)"""
+        if category == 'domestic' and self._domestic_df is not None:
+            return self._domestic_df
+        if category == 'imported' and self._imported_df is not None:
+            return self._imported_df
+        return self._all_df
+    
+    def _get_prediction_service(self):
+        """예측 서비스 (lazy load - 프로세스 공용 인스턴스 공유)"""
+        if self._prediction_service is None:
+            try:
+                from services.prediction_v12 import get_prediction_service
+                self._prediction_service = get_prediction_service()
+            except Exception as e:
+                print(f"⚠️ 예측 서비스 로드 실패: {e}")
+        return self._prediction_service
+    
+    def rebuild_valuation_index(self, reload_data: bool = False) -> Dict:
+        """가치 평가 인덱스 (증분) 재빌드 - 동기 실행"""
+        with self._valuation_build_lock:
+            if reload_data:
+                self._store.reload('domestic')
+                self._store.reload('imported')
+                self._load_data()
+            df = self._combined_df()
+            if df is None or len(df) == 0:
+                return {}
+            return self._valuation_index.build(df, self._get_prediction_service())
+    
+    def _start_valuation_build(self, reload_data: bool = False):
+        """백그라운드 인덱스 빌드 (이미 빌드 중이면 무시)"""
+        if self._valuation_build_lock.locked():
+            return
+        
+        def _run():
+            try:
+                self.rebuild_valuation_index(reload_data=reload_data)
+            except Exception as e:
+                print(f"⚠️ 가치 평가 인덱스 빌드 실패: {e}")
+        
+        threading.Thread(target=_run, name='valuation-index', daemon=True).start()
+    
+    def _check_valuation_index(self):
+        """CSV/모델 변경 감지 (VALUATION_CHECK_INTERVAL 주기) → 증분 재빌드"""
+        now = time.time()
+        if now - self._valuation_checked_at < self.VALUATION_CHECK_INTERVAL:
+            return
+        self._valuation_checked_at = now
+        if self._valuation_index.ready and self._valuation_index.is_stale():
+            self._start_valuation_build(reload_data=self._valuation_index.sources_changed())
+    
+    def data_version(self) -> str:
+        """
+        추천 결과에 영향을 주는 데이터/모델 버전 스탬프 (응답 캐시 키용)
+        
+        매물 CSV 지문 + 가치 평가 인덱스 버전. 캐시 적중 시에는 _valuate가 호출되지 않으므로
+        여기서도 인덱스 변경 감지를 수행한다.
+        """
+        self._check_valuation_index()
+        return (f"{self._store.version('domestic')}.{self._store.version('imported')}."
+                f"{self._valuation_index.version}")
+    
+    def get_history_stamp(self, user_id: str) -> str:
+        """
+        사용자 검색 이력 스탬프 (건수 + 마지막 id) - 선호 브랜드가 바뀌었는지 판단용
+        
+        요청 경로에서는 dispatcher 'io' 풀에서 호출한다 (이벤트 루프에서 직접 호출 금지).
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            count, last_id = conn.execute(
+                'SELECT COUNT(*), COALESCE(MAX(id), 0) FROM search_history WHERE user_id = ?',
+                (user_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return f"{count}-{last_id}"
+    
+    def _valuate(self, df: pd.DataFrame, sample_size: int) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+        """
+        후보 매물의 예측가/괴리율/가치점수
+        
+        인덱스가 준비되어 있으면 전체 후보를 인덱스에서 조회하고,
+        빌드 전이면 기존처럼 샘플만 실시간 배치 예측한다.
+        """
+        self._check_valuation_index()
+        
+        values = self._valuation_index.lookup(df['car_id'].astype(str)) if len(df) else None
+        if values is None:
+            if len(df) > sample_size:
+                df = df.sample(sample_size, random_state=42)
+            predicted = np.array(self._batch_predict_prices([
+                {'brand': b, 'model_name': m, 'year': y, 'mileage': mi, 'fuel': normalize_fuel(f)}
+                for b, m, y, mi, f in zip(df['brand'], df['model'], df['reg_year'],
+                                          df['mileage'], df['fuel'])
+            ], df['price'].tolist()), dtype=np.float64)
+            gap_pct, value_score = compute_value_scores(
+                predicted, df['price'].to_numpy(), df['mileage'].to_numpy(), df['reg_year'].to_numpy())
+            return df, {'predicted_price': predicted, 'price_gap_pct': gap_pct, 'value_score': value_score}
+        
+        # 인덱스에 없는 매물(예측 실패 등)은 실제가를 예측가로 사용
+        missing = np.isnan(values['predicted_price'])
+        if missing.any():
+            predicted = values['predicted_price'].astype(np.float64)
+            predicted[missing] = df['price'].to_numpy()[missing]
+            gap_pct, value_score = compute_value_scores(
+                predicted, df['price'].to_numpy(), df['mileage'].to_numpy(), df['reg_year'].to_numpy())
+            values = {'predicted_price': predicted, 'price_gap_pct': gap_pct, 'value_score': value_score}
+        return df, values
+    
     # ========== 차량 추천 ==========
     
+    def _batch_predict_prices(self, vehicles: List[Dict], fallbacks: List[int]) -> List[float]:
+        """예측 가격 일괄 계산 (예측 실패 차량은 실제가로 대체)"""
+        prediction_service = self._get_prediction_service()
+        if not prediction_service or not vehicles:
+            return list(fallbacks)
+        try:
+            items = prediction_service.predict_batch(vehicles)
+        except Exception as e:
+            print(f"⚠️ 배치 예측 실패: {e}")
+            return list(fallbacks)
+        return [
+            item.result.predicted_price if item.result is not None else fallback
+            for item, fallback in zip(items, fallbacks)
+        ]
+    
     def get_recommended_vehicles(self, user_id: str = None, 
                                   budget_min: int = None, budget_max: int = None,
                                   category: str = 'all', limit: int = 10) -> List[Dict]:
@@ -465,6 +594,8 @@ class RecommendationService:
         1. 사용자 검색 이력 기반 선호 브랜드/모델
         2. 예산 범위 내 차량
         3. 가성비 좋은 차량 (실제가 < 예측가)
+        
+        가치 평가 인덱스가 준비되어 있으면 조건에 맞는 전체 매물을 순위화한다.
         """
         recommendations = []
         
@@ -476,137 +607,83 @@ class RecommendationService:
             preferred_brands = [b for b, _ in brand_counter.most_common(3)]
         
         # 데이터 선택
-        if category == 'domestic' and self._domestic_df is not None:
-            df = self._domestic_df.copy()
-        elif category == 'imported' and self._imported_df is not None:
-            df = self._imported_df.copy()
-        else:
-            # 합치기
-            dfs = []
-            if self._domestic_df is not None:
-                dfs.append(self._domestic_df)
-            if self._imported_df is not None:
-                dfs.append(self._imported_df)
-            df = pd.concat(dfs, ignore_index=True) if dfs else None
+        df = self._combined_df(category)
         
         if df is None or len(df) == 0:
             return []
         
         # 필터링 (이상치 제거 - 학습 데이터와 통일)
-        df = df[(df['Price'] >= self.PRICE_MIN) & (df['Price'] <= self.PRICE_MAX)]
-        df = df[~df['Price'].isin(self.SPECIAL_PRICES)]  # 특수 가격 제거 (9999 등)
-        df = df[df['YearOnly'] >= 2018]  # 최근 7년 이내
+        mask = (df['price'] >= self.PRICE_MIN) & (df['price'] <= self.PRICE_MAX)
+        mask &= ~df['price'].isin(self.SPECIAL_PRICES)  # 특수 가격 제거 (9999 등)
+        mask &= df['reg_year'] >= 2018  # 최근 7년 이내
         
         # car_id가 있는 차량만 선택 (상세페이지 연결 가능)
-        df = df[df['Id'].notna() & (df['Id'] != '')]
+        mask &= df['car_id'].notna() & (df['car_id'] != '')
+        mask &= df['mileage'].notna()
         
         if budget_min:
-            df = df[df['Price'] >= budget_min]
+            mask &= df['price'] >= budget_min
         if budget_max:
-            df = df[df['Price'] <= budget_max]
+            mask &= df['price'] <= budget_max
         
+        df = df[mask]
         if len(df) == 0:
             return []
         
-        # 예측 서비스 초기화 (lazy load)
-        if self._prediction_service is None:
-            try:
-                from services.prediction_v12 import PredictionServiceV12
-                self._prediction_service = PredictionServiceV12()
-            except Exception as e:
-                print(f"⚠️ 예측 서비스 로드 실패: {e}")
-        
-        # 샘플링 및 추천 점수 계산
-        sample_size = min(100, len(df))
-        sample = df.sample(sample_size, random_state=42)
-        
-        for _, row in sample.iterrows():
-            try:
-                car_id = row.get('Id', '')  # 엔카 차량 ID
-                brand = row.get('Manufacturer', '')
-                model = row.get('Model', '')
-                year = int(row.get('YearOnly', 2020))
-                mileage = int(row.get('Mileage', 50000))
-                actual_price = int(row.get('Price', 0))
-                fuel = str(row.get('FuelType', '가솔린'))
-                
-                # 연료 정규화
-                fuel_norm = '가솔린'
-                if '하이브리드' in fuel.lower(): fuel_norm = '하이브리드'
-                elif '디젤' in fuel.lower(): fuel_norm = '디젤'
-                elif 'lpg' in fuel.lower(): fuel_norm = 'LPG'
-                
-                # 예측 가격
-                predicted_price = actual_price  # 기본값
-                if self._prediction_service:
-                    try:
-                        result = self._prediction_service.predict(
-                            brand, model, year, mileage, fuel=fuel_norm
-                        )
-                        predicted_price = result.predicted_price
-                    except:
-                        pass
-                
-                # 추천 점수 계산
-                score = 0
-                
-                # 1. 가성비 (실제가 < 예측가면 +점수)
-                price_diff = predicted_price - actual_price
-                if price_diff > 0:
-                    score += min(price_diff / 100, 10)  # 최대 10점
-                
-                # 2. 선호 브랜드 가산점
-                if brand in preferred_brands:
-                    score += 5
-                
-                # 3. 주행거리 적을수록 가산점
-                if mileage < 30000:
-                    score += 3
-                elif mileage < 50000:
-                    score += 2
-                elif mileage < 80000:
-                    score += 1
-                
-                # 4. 최신 연식 가산점
-                if year >= 2023:
-                    score += 3
-                elif year >= 2021:
-                    score += 2
-                elif year >= 2019:
-                    score += 1
-                
-                # 엔카 상세페이지 URL 생성
-                detail_url = None
-                if car_id:
-                    detail_url = self.ENCAR_DETAIL_URL.format(car_id=car_id)
-
-                # 옵션 정보 조회
-                options = self.get_car_options(car_id) if car_id else None
-
-                recommendations.append({
-                    'brand': str(brand),
-                    'model': str(model),
-                    'year': int(year),
-                    'mileage': int(mileage),
-                    'fuel': str(fuel_norm),
-                    'actual_price': int(actual_price),
-                    'predicted_price': int(predicted_price),
-                    'price_diff': int(price_diff),
-                    'is_good_deal': bool(price_diff > 100),  # 명시적 bool 변환
-                    'score': float(round(score, 1)),
-                    'type': str(row.get('Type', 'domestic')),
-                    'car_id': str(car_id) if car_id else None,
-                    'detail_url': detail_url,
-                    'options': options
-                })
-                
-            except Exception as e:
-                continue
-        
-        # 점수순 정렬
-        recommendations.sort(key=lambda x: x['score'], reverse=True)
+        df, values = self._valuate(df, sample_size=100)
+        
+        # 추천 점수 계산 (벡터 연산)
+        actual = df['price'].to_numpy(dtype=np.float64)
+        mileage = df['mileage'].to_numpy(dtype=np.float64)
+        year = df['reg_year'].to_numpy()
+        predicted = values['predicted_price']
+        price_diff = predicted - actual
+        
+        # 1. 가성비 (실제가 < 예측가면 +점수, 최대 10점)
+        score = np.minimum(np.maximum(price_diff, 0) / 100, 10)
+        # 2. 선호 브랜드 가산점
+        score += np.where(df['brand'].isin(preferred_brands).to_numpy(), 5, 0)
+        # 3. 주행거리 적을수록 가산점
+        score += np.select([mileage < 30000, mileage < 50000, mileage < 80000], [3, 2, 1], 0)
+        # 4. 최신 연식 가산점
+        score += np.select([year >= 2023, year >= 2021, year >= 2019], [3, 2, 1], 0)
+        
+        # 점수순 정렬 (상위 limit개만 직렬화)
+        top = np.argsort(-score, kind='stable')[:limit]
+        
+        top_df = df.iloc[top]
+        car_ids = column_list(top_df, 'car_id', '')  # 엔카 차량 ID
+        brands = column_list(top_df, 'brand', '', str)
+        models = column_list(top_df, 'model', '', str)
+        fuels = column_list(top_df, 'fuel', '가솔린', normalize_fuel)
+        types = column_list(top_df, 'category', 'domestic', str)
+        
+        for k, i in enumerate(top):
+            car_id = car_ids[k]
+            
+            # 엔카 상세페이지 URL 생성
+            detail_url = None
+            if car_id:
+                detail_url = self.ENCAR_DETAIL_URL.format(car_id=car_id)
+            
+            recommendations.append({
+                'brand': brands[k],
+                'model': models[k],
+                'year': int(year[i]),
+                'mileage': int(mileage[i]),
+                'fuel': fuels[k],
+                'actual_price': int(actual[i]),
+                'predicted_price': int(predicted[i]),
+                'price_diff': int(price_diff[i]),
+                'is_good_deal': bool(price_diff[i] > 100),  # 명시적 bool 변환
+                'score': float(round(score[i], 1)),
+                'type': types[k],
+                'car_id': str(car_id) if car_id else None,
+                'detail_url': detail_url,
+                'options': self.get_car_options(car_id) if car_id else None  # 옵션 정보 조회
+            })
         
-        return recommendations[:limit]
+        return recommendations
     
     def get_good_deals(self, category: str = 'all', limit: int = 10) -> List[Dict]:
         """
@@ -627,115 +704,67 @@ class RecommendationService:
         3. 연식 점수: 최신일수록 좋음 (최대 30점)
         """
         # 데이터 필터링
-        dfs = []
-        if self._domestic_df is not None:
-            dfs.append(self._domestic_df)
-        if self._imported_df is not None:
-            dfs.append(self._imported_df)
+        df = self._combined_df()
         
-        if not dfs:
+        if df is None or len(df) == 0:
             return []
         
-        df = pd.concat(dfs, ignore_index=True)
-        
         # 모델 필터링 (브랜드 + 정확한 모델 계열 매칭)
-        brand_mask = df['Manufacturer'].str.contains(brand, case=False, na=False)
+        brand_mask = df['brand'].str.contains(brand, case=False, na=False)
         # 정확한 모델 매칭 (E-클래스 ↔ E-클래스만, GLE-클래스 제외)
-        model_mask = df['Model'].apply(lambda x: is_model_match(model, str(x)))
+        model_mask = df['model'].apply(lambda x: is_model_match(model, str(x)))
         df = df[brand_mask & model_mask]
         
         # 이상치 제거 + car_id 필수 (상세페이지 연결 가능한 차량만)
-        df = df[(df['Price'] >= self.PRICE_MIN) & (df['Price'] <= self.PRICE_MAX)]
-        df = df[~df['Price'].isin(self.SPECIAL_PRICES)]
-        df = df[df['YearOnly'] >= 2018]
-        df = df[df['Id'].notna() & (df['Id'] != '')]
+        df = df[(df['price'] >= self.PRICE_MIN) & (df['price'] <= self.PRICE_MAX)]
+        df = df[~df['price'].isin(self.SPECIAL_PRICES)]
+        df = df[df['reg_year'] >= 2018]
+        df = df[df['car_id'].notna() & (df['car_id'] != '') & (df['car_id'].astype(str) != 'nan')]
+        df = df[df['mileage'].notna()]
         
         if len(df) == 0:
             return []
         
-        # 예측 서비스 초기화
-        if self._prediction_service is None:
-            try:
-                from services.prediction_v12 import PredictionServiceV12
-                self._prediction_service = PredictionServiceV12()
-            except:
-                pass
+        df, values = self._valuate(df, sample_size=50)
+        
+        year = df['reg_year'].to_numpy()
+        actual = df['price'].to_numpy(dtype=np.float64)
+        mileage = df['mileage'].to_numpy(dtype=np.float64)
+        predicted = values['predicted_price']
+        
+        # 정렬: 연식(최신순) → 가격(저렴순) → 주행거리(적은순)
+        top = np.lexsort((mileage, actual, -year))[:limit]
         
         deals = []
-        sample_size = min(50, len(df))
-        sample = df.sample(sample_size, random_state=42) if len(df) > sample_size else df
+        top_df = df.iloc[top]
+        car_ids = column_list(top_df, 'car_id', '', lambda v: str(v).strip())
+        models = column_list(top_df, 'model', model, str)
+        fuels = column_list(top_df, 'fuel', '가솔린', normalize_fuel)
         
-        for _, row in sample.iterrows():
-            try:
-                # car_id 처리: NaN, 빈 문자열, None 모두 None으로 통일
-                raw_car_id = row.get('Id', '')
-                car_id = str(raw_car_id).strip() if raw_car_id and str(raw_car_id).strip() and str(raw_car_id) != 'nan' else None
-                year = int(row.get('YearOnly', 2020))
-                mileage = int(row.get('Mileage', 50000))
-                actual_price = int(row.get('Price', 0))
-                fuel = str(row.get('FuelType', '가솔린'))
-                
-                # 연료 정규화
-                fuel_norm = '가솔린'
-                if '하이브리드' in fuel.lower(): fuel_norm = '하이브리드'
-                elif '디젤' in fuel.lower(): fuel_norm = '디젤'
-                elif 'lpg' in fuel.lower(): fuel_norm = 'LPG'
-                
-                # 예측 가격 계산 (실제 데이터의 모델명 사용)
-                actual_model_name = str(row.get('Model', model))
-                predicted_price = actual_price
-                if self._prediction_service:
-                    try:
-                        result = self._prediction_service.predict(
-                            brand, actual_model_name, year, mileage, fuel=fuel_norm
-                        )
-                        predicted_price = result.predicted_price
-                    except:
-                        pass
-                
-                # 가치 점수 계산 (모든 값을 Python 기본 타입으로 변환)
-                # 1. 가격 괴리율 (40점 만점)
-                price_gap_pct = float((predicted_price - actual_price) / max(predicted_price, 1) * 100)
-                price_score = float(min(max(price_gap_pct * 4, 0), 40))
-                
-                # 2. 주행거리 점수 (30점 만점)
-                mileage_score = float(max(30 - (mileage / 3500), 0))
-                
-                # 3. 연식 점수 (30점 만점)
-                year_score = float(min(max((year - 2018) * 5, 0), 30))
-                
-                total_score = float(price_score + mileage_score + year_score)
-                
-                # 엔카 URL 생성 (차량 ID 기반 상세 페이지)
-                detail_url = None
-                if car_id:
-                    detail_url = self.ENCAR_DETAIL_URL.format(car_id=car_id)
-                
-                # 옵션 정보 조회
-                options = self.get_car_options(car_id) if car_id else None
-                
-                deals.append({
-                    'brand': str(brand),
-                    'model': str(row.get('Model', model)),
-                    'year': int(year),
-                    'mileage': int(mileage),
-                    'fuel': str(fuel_norm),
-                    'actual_price': int(actual_price),
-                    'predicted_price': int(predicted_price),
-                    'price_diff': int(predicted_price - actual_price),
-                    'value_score': round(total_score, 1),
-                    'is_good_deal': price_gap_pct > 5,
-                    'car_id': str(car_id) if car_id else None,
-                    'detail_url': str(detail_url) if detail_url else None,
-                    # 옵션 정보 (수집된 데이터 기반)
-                    'options': options
-                })
-            except:
-                continue
+        for k, i in enumerate(top):
+            car_id = car_ids[k]
+            
+            # 엔카 URL 생성 (차량 ID 기반 상세 페이지)
+            detail_url = self.ENCAR_DETAIL_URL.format(car_id=car_id)
+            
+            deals.append({
+                'brand': str(brand),
+                'model': models[k],
+                'year': int(year[i]),
+                'mileage': int(mileage[i]),
+                'fuel': fuels[k],
+                'actual_price': int(actual[i]),
+                'predicted_price': int(predicted[i]),
+                'price_diff': int(predicted[i] - actual[i]),
+                'value_score': round(float(values['value_score'][i]), 1),
+                'is_good_deal': bool(values['price_gap_pct'][i] > 5),
+                'car_id': car_id,
+                'detail_url': str(detail_url),
+                # 옵션 정보 (수집된 데이터 기반)
+                'options': self.get_car_options(car_id)
+            })
         
-        # 정렬: 연식(최신순) → 가격(저렴순) → 주행거리(적은순)
-        deals.sort(key=lambda x: (-x['year'], x['actual_price'], x['mileage']))
-        return deals[:limit]
+        return deals
     
     # ========== 개별 매물 분석 ==========
     
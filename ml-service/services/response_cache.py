@@ -0,0 +1,247 @@
+"""
+응답 캐시 (읽기 위주 추천/유사 차량 API)
+======================================
+- 캐시 키 = 네임스페이스 + 데이터/모델 버전 스탬프 + 정규화된 쿼리 파라미터
+  → 데이터셋·모델이 바뀌면 버전이 바뀌어 자동 무효화 (TTL로 추측하지 않음)
+- 1차: 프로세스 내 LRU (바이트 총량 제한)
+- 2차(선택): Redis 호환 서버 (RESPONSE_CACHE_REDIS_URL 설정 + redis 패키지 설치 시)
+- 같은 키의 동시 미스는 한 번만 계산 (single-flight) - 나머지는 결과를 기다림
+- 응답을 JSON 바이트로 저장 → 적중 시 재직렬화 없이 그대로 반환
+- Redis 호출(동기 클라이언트)은 dispatcher 'io' 풀에서 실행 → 이벤트 루프를 막지 않음
+
+사용:
+    body = await get_response_cache().get_or_compute('popular', version, {'category': c, 'limit': n}, compute)
+    return Response(content=body, media_type="application/json")
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from services.dispatch import DispatchOverloaded, get_dispatcher
+
+# Redis 백엔드 (선택적)
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# 메모리 캐시 용량 (환경변수로 조정)
+MEMORY_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MEMORY_MB", "64")) * 1024 * 1024
+MEMORY_MAX_ENTRIES = 4096
+
+# Redis 키 만료 - 버전 스탬프로 무효화되므로 이전 버전 키 정리용
+REDIS_TTL_SECONDS = 24 * 3600
+REDIS_PREFIX = "car_sentix:resp:"
+
+
+class LRUCache:
+    """항목 수 + 바이트 총량 제한 LRU (선택적 TTL)"""
+
+    def __init__(self, max_entries: int = MEMORY_MAX_ENTRIES, max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: 최대 항목 수
+            max_bytes: 바이트 총량 한도 (bytes 값만 집계, None이면 항목 수만 제한)
+            ttl_seconds: 항목 유효 시간 (None이면 만료 없음)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key → (value, size, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self.ttl is not None and time.time() - item[2] >= self.ttl:
+                self._remove(key)
+                item = None
+            if item is None:
+                self.stats['misses'] += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats['hits'] += 1
+            return item[0]
+
+    def set(self, key: str, value: Any):
+        size = len(value) if isinstance(value, (bytes, bytearray)) else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (value, size, time.time())
+            self._bytes += size
+            while len(self._data) > self.max_entries or \
+                    (self.max_bytes is not None and self._bytes > self.max_bytes):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.stats['evictions'] += 1
+
+    def _remove(self, key: str):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'entries': len(self._data), 'bytes': self._bytes,
+                    'max_entries': self.max_entries, 'max_bytes': self.max_bytes}
+
+
+class RedisBackend:
+    """Redis 호환 서버 2차 캐시 (연결 실패 시 조용히 비활성)"""
+
+    def __init__(self, url: str, ttl_seconds: int = REDIS_TTL_SECONDS):
+        self.ttl = ttl_seconds
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.stats = {'hits': 0, 'misses': 0, 'errors': 0}
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = self._client.get(REDIS_PREFIX + key)
+        except Exception:
+            self.stats['errors'] += 1
+            return None
+        self.stats['hits' if value is not None else 'misses'] += 1
+        return value
+
+    def set(self, key: str, value: bytes):
+        try:
+            self._client.set(REDIS_PREFIX + key, value, ex=self.ttl)
+        except Exception:
+            self.stats['errors'] += 1
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
+
+
+def make_key(namespace: str, version: str, params: Dict[str, Any]) -> str:
+    """
+    정규화된 파라미터 키 (None 제거, 키 정렬)
+
+    값 자체는 바꾸지 않는다 - 같은 키는 반드시 같은 계산 결과여야 하므로.
+    """
+    normalized = {k: v for k, v in params.items() if v is not None}
+    raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+    return f"{namespace}:{version}:{digest}"
+
+
+def render_json(content: Any) -> bytes:
+    """FastAPI JSONResponse와 같은 규칙으로 직렬화"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class ResponseCache:
+    """메모리 LRU + (선택) Redis 2단 응답 캐시"""
+
+    def __init__(self, memory: Optional[LRUCache] = None, remote: Optional[RedisBackend] = None):
+        self.memory = memory or LRUCache(max_bytes=MEMORY_MAX_BYTES)
+        self.remote = remote
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, namespace: str, field: str):
+        ns = self.stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0})
+        ns[field] += 1
+
+    async def get_or_compute(self, namespace: str, version: str, params: Dict[str, Any],
+                             compute: Callable[[], Awaitable[Any]]) -> bytes:
+        """
+        캐시된 JSON 바이트 반환, 없으면 compute() 결과를 직렬화해 저장
+
+        같은 키로 계산 중인 요청이 있으면 그 결과를 함께 기다린다.
+        계산은 별도 태스크로 실행되어 첫 요청이 끊겨도 기다리는 요청에는 결과가 전달된다.
+        compute()가 실패하면 캐시하지 않고 기다리던 요청에도 같은 예외를 전달한다.
+        """
+        key = make_key(namespace, version, params)
+
+        body = self.memory.get(key)
+        if body is not None:
+            self._count(namespace, 'hits')
+            return body
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fill(namespace, key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self._count(namespace, 'coalesced')
+        return await asyncio.shield(task)
+
+    async def _remote(self, method: Callable, *args):
+        """Redis 호출을 io 풀에서 실행 (풀 포화 시 2차 캐시 건너뜀)"""
+        try:
+            return await get_dispatcher().run('io', method, *args)
+        except DispatchOverloaded:
+            self.remote.stats['errors'] += 1
+            return None
+
+    async def _fill(self, namespace: str, key: str, compute: Callable[[], Awaitable[Any]]) -> bytes:
+        body = await self._remote(self.remote.get, key) if self.remote is not None else None
+        if body is not None:
+            self._count(namespace, 'hits')
+        else:
+            self._count(namespace, 'misses')
+            try:
+                body = render_json(await compute())
+            except Exception:
+                self._count(namespace, 'errors')
+                raise
+            if self.remote is not None:
+                await self._remote(self.remote.set, key, body)
+        self.memory.set(key, body)
+        return body
+
+    def _done(self, key: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # 기다리는 요청이 모두 끊긴 경우 "never retrieved" 경고 방지
+
+    def clear(self):
+        self.memory.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            'namespaces': {ns: dict(counts) for ns, counts in self.stats.items()},
+            'memory': self.memory.get_stats(),
+            'remote': self.remote.get_stats() if self.remote is not None else None,
+            'inflight': len(self._inflight),
+        }
+
+
+# 싱글톤
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                remote = None
+                url = os.getenv("RESPONSE_CACHE_REDIS_URL")
+                if url and REDIS_AVAILABLE:
+                    remote = RedisBackend(url)
+                    print(f"✓ 응답 캐시 Redis 백엔드: {url}")
+                elif url:
+                    print("⚠️ RESPONSE_CACHE_REDIS_URL 설정됨 - redis 패키지가 없어 메모리 캐시만 사용")
+                _response_cache = ResponseCache(remote=remote)
+    return _response_cache
@@ -2,11 +2,112 @@
 비슷한 차량 가격 분포 서비스
 - 전처리된 데이터 사용
 - 이상치 필터링 (학습 데이터와 동일: 가격 100~50000만원)
+- (브랜드, 모델명, 연식) 버킷별 주행거리 정렬 가격 배열을 로드 시 1회 집계
+- 브랜드 / 연식 파티션 데이터셋이 있으면 전체를 올리지 않고 조회에 필요한 파티션만 읽어 큐브를 만듦
 """
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from services.vehicle_serializer import column_list
+from services.vehicle_store import ROW_ID, PartitionedDataset, VehicleStore, get_vehicle_store
+
+
+class SimilarPriceCube:
+    """
+    (브랜드, 모델명, 연식) 버킷별 가격 큐브
+    
+    - 연식 파싱(YYYY)은 로드 시 1회
+    - 버킷 내부는 주행거리 오름차순 정렬 → 주행거리 구간은 searchsorted
+    - 부분 문자열 매칭은 고유 브랜드/모델명에 대해서만 수행하고 메모이제이션
+    """
+    
+    MATCH_CACHE_SIZE = 1024
+    
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        years = pd.to_numeric(df['year'].astype(str).str[:4], errors='coerce').to_numpy()
+        valid = np.flatnonzero(~np.isnan(years))
+        
+        brand_codes, brands = pd.factorize(df['brand'])
+        model_codes, models = pd.factorize(df['model'])
+        self._brands = pd.Series(np.asarray(brands, dtype=object))
+        self._models = pd.Series(np.asarray(models, dtype=object))
+        
+        b = brand_codes[valid]
+        m = model_codes[valid]
+        y = years[valid].astype(np.int32)
+        mileage = df['mileage'].to_numpy(dtype=np.float64)[valid]
+        
+        # (모델, 브랜드, 연식, 주행거리) 순 정렬 → 연속 구간이 하나의 버킷
+        order = np.lexsort((mileage, y, b, m))
+        self._positions = valid[order]
+        self._mileage = mileage[order]
+        self._prices = df['price'].to_numpy()[self._positions]
+        m, b, y = m[order], b[order], y[order]
+        
+        boundaries = np.flatnonzero((np.diff(m) != 0) | (np.diff(b) != 0) | (np.diff(y) != 0)) + 1
+        starts = np.concatenate(([0], boundaries)) if len(order) else np.empty(0, dtype=np.int64)
+        ends = np.concatenate((boundaries, [len(order)])) if len(order) else np.empty(0, dtype=np.int64)
+        
+        self._buckets: Dict[Tuple[int, int, int], Tuple[int, int]] = {}
+        self._brands_by_model: Dict[int, set] = {}
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            key = (int(m[start]), int(b[start]), int(y[start]))
+            self._buckets[key] = (start, end)
+            self._brands_by_model.setdefault(key[0], set()).add(key[1])
+        
+        self._match_cache: Dict[Tuple[str, str], set] = {}
+        self._lock = threading.Lock()
+    
+    def _match(self, column: str, query: str) -> set:
+        """부분 문자열(대소문자 무시, 정규식)이 포함된 고유값 코드"""
+        key = (column, query)
+        codes = self._match_cache.get(key)
+        if codes is None:
+            values = self._brands if column == 'brand' else self._models
+            codes = set(np.flatnonzero(values.str.contains(query, case=False, na=False).to_numpy()).tolist())
+            with self._lock:
+                if len(self._match_cache) >= self.MATCH_CACHE_SIZE:
+                    self._match_cache.clear()
+                self._match_cache[key] = codes
+        return codes
+    
+    def query(self, model_keyword: str, year_min: int, year_max: int, brand: Optional[str] = None,
+              mileage_min: Optional[float] = None, mileage_max: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        조건에 맞는 (행 위치, 가격) - 원본 데이터 순서
+        
+        brand가 None이면 브랜드 조건 없음, mileage 범위가 None이면 주행거리 조건 없음
+        """
+        brand_codes = self._match('brand', brand) if brand is not None else None
+        slices = []
+        for model_code in self._match('model', model_keyword):
+            for brand_code in self._brands_by_model.get(model_code, ()):
+                if brand_codes is not None and brand_code not in brand_codes:
+                    continue
+                for yr in range(year_min, year_max + 1):
+                    bucket = self._buckets.get((model_code, brand_code, yr))
+                    if bucket is None:
+                        continue
+                    start, end = bucket
+                    if mileage_min is not None:
+                        mileages = self._mileage[start:end]
+                        start, end = (start + int(np.searchsorted(mileages, mileage_min, side='left')),
+                                      start + int(np.searchsorted(mileages, mileage_max, side='right')))
+                    if end > start:
+                        slices.append(slice(start, end))
+        
+        if not slices:
+            return np.empty(0, dtype=np.int64), self._prices[:0]
+        positions = np.concatenate([self._positions[sl] for sl in slices])
+        prices = np.concatenate([self._prices[sl] for sl in slices])
+        order = np.argsort(positions, kind='stable')
+        return positions[order], prices[order]
+
 
 class SimilarVehicleService:
     """비슷한 차량 가격 분포 분석"""
@@ -18,22 +119,54 @@ class SimilarVehicleService:
     # 특수 가격 이상치 (가격 미정 표시 등)
     SPECIAL_PRICES = {9999, 8888, 7777, 6666, 5555, 1111, 10000}
     
-    def __init__(self):
-        self.data_path = Path(__file__).parent.parent.parent / "data"
+    # 파티션 모드: 파티션별 (DataFrame, 가격 큐브) 캐시 상한 (행 수)
+    PARTITION_CACHE_ROWS = 1_000_000
+    
+    # 비슷한 차량 샘플에 쓰는 컬럼
+    SAMPLE_COLUMNS = ('brand', 'model', 'year', 'mileage', 'price')
+    
+    def __init__(self, store: Optional[VehicleStore] = None):
+        self._store = store or get_vehicle_store()
+        self.data_path = self._store.data_dir
         self._combined_df = None
+        self._cube = None
+        self._data_version = 'none'
+        self._part_cubes: 'OrderedDict[tuple, Optional[Tuple[pd.DataFrame, SimilarPriceCube, np.ndarray]]]' = OrderedDict()
+        self._part_rows = 0
+        self._part_version = None
+        self._part_lock = threading.Lock()
+        
+        # 파티션 데이터셋이 있으면 전체 로드 없이 조회 시 필요한 파티션만 읽음
+        self._partitions: Optional[PartitionedDataset] = self._store.partitioned('combined')
+        if self._partitions is not None:
+            print("✓ 전처리 데이터: 브랜드/연식 파티션 사용 (조회 시 필요한 파티션만 로드)")
+            return
         self._load_data()
+        if self._combined_df is not None and len(self._combined_df) > 0:
+            self._cube = SimilarPriceCube(self._combined_df)
+    
+    @property
+    def data_version(self) -> str:
+        """로드한 데이터셋 지문 (응답 캐시 키용 - 파티션은 캐시 적중 시에도 교체 여부 확인)"""
+        if self._partitions is not None:
+            return self._partitions.refresh()
+        return self._data_version
+    
+    def _filter_prices(self, df: pd.DataFrame) -> pd.DataFrame:
+        """가격 이상치 필터링"""
+        df = df[(df['price'] >= self.PRICE_MIN) & (df['price'] <= self.PRICE_MAX)]
+        return df[~df['price'].isin(self.SPECIAL_PRICES)]  # 특수 가격 제거 (9999 등)
     
     def _load_data(self):
-        """전처리된 통합 데이터 로드"""
+        """전처리된 통합 데이터 (공유 차량 스토어)"""
         try:
             # 전처리된 통합 데이터 사용
-            combined_path = self.data_path / "processed_encar_combined.csv"
-            if combined_path.exists():
-                df = pd.read_csv(combined_path)
+            df = self._store.get('combined')
+            if df is not None:
                 # 이상치 필터링
-                df = df[(df['price'] >= self.PRICE_MIN) & (df['price'] <= self.PRICE_MAX)]
-                df = df[~df['price'].isin(self.SPECIAL_PRICES)]  # 특수 가격 제거 (9999 등)
+                df = self._filter_prices(df)
                 self._combined_df = df
+                self._data_version = self._store.version('combined')
                 print(f"✓ 전처리 데이터 로드: {len(df):,}건 (이상치 제거됨)")
             else:
                 print(f"⚠️ 전처리 데이터 없음, 원본 데이터 사용")
@@ -43,64 +176,110 @@ class SimilarVehicleService:
             self._load_raw_data()
     
     def _load_raw_data(self):
-        """원본 데이터 로드 (fallback)"""
+        """원본 데이터 (fallback)"""
         try:
-            domestic_path = self.data_path / "encar_raw_domestic.csv"
-            if domestic_path.exists():
-                df = pd.read_csv(domestic_path)
-                df = df[(df['Price'] >= self.PRICE_MIN) & (df['Price'] <= self.PRICE_MAX)]
-                df = df[~df['Price'].isin(self.SPECIAL_PRICES)]  # 특수 가격 제거
-                # 컬럼명 통일
-                df = df.rename(columns={'Manufacturer': 'brand', 'Model': 'model_name', 
-                                        'Year': 'year', 'Mileage': 'mileage', 'Price': 'price'})
+            df = self._store.get('domestic')
+            if df is not None:
+                df = self._filter_prices(df)
                 self._combined_df = df
+                self._data_version = self._store.version('domestic')
                 print(f"✓ 원본 데이터 로드: {len(df):,}건")
         except Exception as e:
             print(f"⚠️ 원본 데이터 로드 실패: {e}")
     
+    def _partition_cube(self, key: Tuple[str, int]) -> Optional[Tuple[pd.DataFrame, SimilarPriceCube, np.ndarray]]:
+        """파티션 하나의 (DataFrame, 가격 큐브, 원본 행 번호) - 행 수 상한 LRU 캐시"""
+        with self._part_lock:
+            if self._part_version != self._partitions.version:  # 데이터셋이 다시 만들어짐
+                self._part_cubes.clear()
+                self._part_rows = 0
+                self._part_version = self._partitions.version
+            if key in self._part_cubes:
+                self._part_cubes.move_to_end(key)
+                return self._part_cubes[key]
+        
+        df = self._partitions.read([key])
+        if df is not None:
+            df = self._filter_prices(df)
+        entry = (df, SimilarPriceCube(df), df[ROW_ID].to_numpy()) if df is not None and len(df) > 0 else None
+        with self._part_lock:
+            if key not in self._part_cubes:
+                self._part_cubes[key] = entry
+                self._part_rows += len(entry[0]) if entry else 0
+                while self._part_rows > self.PARTITION_CACHE_ROWS and len(self._part_cubes) > 1:
+                    _, old = self._part_cubes.popitem(last=False)
+                    self._part_rows -= len(old[0]) if old else 0
+        return entry
+    
+    def _lookup(self, model_keyword: str, year_min: int, year_max: int, brand: Optional[str] = None,
+                mileage_min: Optional[float] = None, mileage_max: Optional[float] = None
+                ) -> Tuple[np.ndarray, Optional[pd.DataFrame]]:
+        """
+        조건에 맞는 (가격 배열, 앞쪽 5건 DataFrame) - 원본 데이터 순서
+        
+        파티션 모드는 brand / 연식 범위에 해당하는 파티션 큐브만 조회해 원본 행 순서(ROW_ID)로 합치므로
+        결과는 전체 로드 모드와 같다.
+        """
+        if self._partitions is None:
+            positions, prices = self._cube.query(model_keyword, year_min, year_max, brand=brand,
+                                                 mileage_min=mileage_min, mileage_max=mileage_max)
+            return prices, self._combined_df.iloc[positions[:5]]
+        
+        parts = []
+        for key in self._partitions.keys(brand, year_min, year_max):
+            entry = self._partition_cube(key)
+            if entry is None:
+                continue
+            df, cube, df_row_ids = entry
+            positions, prices = cube.query(model_keyword, year_min, year_max, brand=brand,
+                                           mileage_min=mileage_min, mileage_max=mileage_max)
+            if len(positions):
+                parts.append((df, positions, prices, df_row_ids[positions]))
+        if not parts:
+            return np.empty(0), None
+        
+        row_ids = np.concatenate([row_ids for *_, row_ids in parts])
+        order = np.argsort(row_ids, kind='stable')
+        prices = np.concatenate([prices for _, _, prices, _ in parts])[order]
+        owners = np.repeat(np.arange(len(parts)), [len(positions) for _, positions, _, _ in parts])[order[:5]]
+        local = np.concatenate([positions for _, positions, _, _ in parts])[order[:5]]
+        rows = [(parts[o][0], p) for o, p in zip(owners.tolist(), local.tolist())]
+        columns = [col for col in self.SAMPLE_COLUMNS if col in parts[0][0].columns]
+        head = pd.DataFrame({col: [df[col].iat[p] for df, p in rows] for col in columns})
+        return prices, head
+    
     def get_similar_distribution(self, brand: str, model: str, year: int, 
                                   mileage: int, predicted_price: float) -> Dict:
         """
         비슷한 차량 가격 분포 조회 (전처리된 데이터 기준)
         """
-        df = self._combined_df
-        
-        if df is None or len(df) == 0:
+        if self._partitions is None and (self._combined_df is None or len(self._combined_df) == 0
+                                         or self._cube is None):
             return self._empty_result()
         
         # 모델명 첫 단어 추출 (예: "그랜저 (GN7)" → "그랜저")
         model_keyword = model.split()[0] if model else ""
         
-        # 비슷한 차량 필터링 (전처리된 데이터 컬럼명 사용)
+        # 비슷한 차량 필터링 (가격 큐브 버킷 병합)
         year_range = 2
         mileage_range = 30000
         
         try:
-            # year 컬럼이 문자열일 수 있음
-            df_year = df['year'].astype(str).str[:4].astype(int)
+            prices_raw, head = self._lookup(
+                model_keyword, year - year_range, year + year_range, brand=brand,
+                mileage_min=mileage - mileage_range, mileage_max=mileage + mileage_range)
             
-            similar = df[
-                (df['brand'].str.contains(brand, case=False, na=False)) &
-                (df['model_name'].str.contains(model_keyword, case=False, na=False)) &
-                (df_year.between(year - year_range, year + year_range)) &
-                (df['mileage'].between(mileage - mileage_range, mileage + mileage_range))
-            ].copy()
-            
-            if len(similar) < 5:
+            if len(prices_raw) < 5:
                 # 조건 완화: 모델명만으로 검색
-                similar = df[
-                    (df['model_name'].str.contains(model_keyword, case=False, na=False)) &
-                    (df_year.between(year - 3, year + 3))
-                ].copy()
+                prices_raw, head = self._lookup(model_keyword, year - 3, year + 3)
         except Exception as e:
             print(f"⚠️ 필터링 오류: {e}")
             return self._empty_result()
         
-        if len(similar) == 0:
+        if len(prices_raw) == 0:
             return self._empty_result()
         
         # 가격 배열에서 이상치 제거 (IQR 방법)
-        prices_raw = similar['price'].values
         q1, q3 = np.percentile(prices_raw, [25, 75])
         iqr = q3 - q1
         lower_bound = max(q1 - 1.5 * iqr, self.PRICE_MIN)
@@ -171,15 +350,16 @@ class SimilarVehicleService:
             position_color = "red"
         
         # 비슷한 차량 샘플 (5개) - 전처리 데이터 컬럼명 사용
-        sample_vehicles = []
-        for _, row in similar.head(5).iterrows():
-            sample_vehicles.append({
-                "brand": row.get('brand', brand),
-                "model": row.get('model_name', model),
-                "year": str(row.get('year', year))[:4],
-                "mileage": int(row.get('mileage', mileage)),
-                "price": int(row.get('price', 0))
-            })
+        sample_vehicles = [
+            {"brand": b, "model": m, "year": str(y)[:4], "mileage": int(mi), "price": int(p)}
+            for b, m, y, mi, p in zip(
+                column_list(head, 'brand', brand),
+                column_list(head, 'model', model),
+                column_list(head, 'year', year),
+                column_list(head, 'mileage', mileage),
+                column_list(head, 'price', 0),
+            )
+        ]
         
         return {
             "similar_count": len(prices),  # 이상치 제거 후 개수
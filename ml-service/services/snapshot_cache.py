@@ -0,0 +1,209 @@
+"""
+외부 데이터 스냅샷 캐시 (TTL + Stale-While-Revalidate)
+=====================================================
+- 소스별 TTL (거시경제 지표는 하루 단위로만 바뀌므로 요청마다 외부 API를 호출하지 않음)
+- 만료된 값은 그대로 응답하고 백그라운드에서 갱신 (stale-while-revalidate)
+- 키별 갱신은 한 번에 하나만 실행 (single-flight)
+- 마지막 정상 스냅샷을 JSON 파일로 저장 → 재시작 직후에도 외부 API 폭주 없이 즉시 응답
+- 백그라운드 갱신 스레드가 만료 임박 항목을 미리 갱신
+
+fetch 함수는 (value, ok)를 반환한다. ok=False(기본값으로 대체된 결과)는
+기존 정상 값을 덮어쓰지 않고 RETRY_SECONDS 후 다시 시도한다.
+정상 값이 하나도 없으면 기본값 결과를 메모리에만 보관한다.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# 조회 실패/기본값 결과 재시도 간격
+RETRY_SECONDS = 300
+
+# 캐시가 비어 있을 때 첫 조회를 기다리는 최대 시간 (초과 시 기본값 응답)
+COLD_WAIT_SECONDS = 3.0
+
+# 백그라운드 갱신 주기 / 만료 임박 기준 (TTL 대비 비율)
+REFRESH_INTERVAL = 60
+REFRESH_AHEAD_RATIO = 0.9
+
+# 최근 조회되지 않은 항목은 미리 갱신하지 않음
+REFRESH_IDLE_SECONDS = 24 * 3600
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fetched_at: float
+    good: bool = True       # 실제 조회 값 여부 (기본값 대체 결과는 False, 저장하지 않음)
+    retry_at: float = 0.0   # 조회 실패 후 재시도 시각 (0이면 TTL 기준)
+    last_access: float = 0.0
+
+
+class SnapshotCache:
+    """소스별 TTL 스냅샷 캐시"""
+
+    def __init__(self, ttls: Dict[str, int], persist_path: Optional[Path] = None):
+        """
+        Args:
+            ttls: 소스 이름 → TTL(초)
+            persist_path: 스냅샷 저장 파일 (None이면 메모리만 사용)
+        """
+        self.ttls = dict(ttls)
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._fetchers: Dict[Tuple[str, str], Callable] = {}
+        self._inflight: Dict[Tuple[str, str], threading.Event] = {}
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_failures': 0}
+        self._load()
+
+    # ========== 조회 ==========
+
+    def get(self, source: str, key: str, fetch: Callable[[], Tuple[Any, bool]], default: Any = None) -> Tuple[Any, str]:
+        """
+        스냅샷 조회
+
+        Returns:
+            (value, state) - state: 'fresh' / 'stale' / 'cold' / 'fallback'
+        """
+        cache_key = (source, key)
+        now = time.time()
+        with self._lock:
+            self._fetchers[cache_key] = fetch
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                entry.last_access = now
+        self._ensure_refresher()
+
+        if entry is not None:
+            if not self._needs_refresh(source, entry, now):
+                self.stats['hits'] += 1
+                return entry.value, 'fresh'
+            # 만료 → 기존 값 응답 + 백그라운드 갱신
+            self.stats['stale_hits'] += 1
+            self._refresh_async(cache_key)
+            return entry.value, 'stale'
+
+        # 캐시 없음 → 첫 조회를 잠시 기다리고, 늦으면 기본값
+        self.stats['misses'] += 1
+        done = self._refresh_async(cache_key)
+        done.wait(COLD_WAIT_SECONDS)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+        if entry is not None:
+            entry.last_access = now
+            return entry.value, 'cold'
+        return default, 'fallback'
+
+    def _needs_refresh(self, source: str, entry: _Entry, now: float, ratio: float = 1.0) -> bool:
+        if entry.retry_at:
+            return now >= entry.retry_at
+        return now - entry.fetched_at >= self.ttls.get(source, 3600) * ratio
+
+    # ========== 갱신 ==========
+
+    def _refresh_async(self, cache_key: Tuple[str, str]) -> threading.Event:
+        """백그라운드 갱신 시작 (이미 진행 중이면 해당 이벤트 반환)"""
+        with self._lock:
+            done = self._inflight.get(cache_key)
+            if done is not None:
+                return done
+            done = threading.Event()
+            self._inflight[cache_key] = done
+        threading.Thread(target=self._refresh, args=(cache_key, done),
+                         name=f"snapshot-{cache_key[0]}", daemon=True).start()
+        return done
+
+    def _refresh(self, cache_key: Tuple[str, str], done: threading.Event):
+        try:
+            fetch = self._fetchers[cache_key]
+            value, ok = fetch()
+            now = time.time()
+            with self._lock:
+                entry = self._entries.get(cache_key)
+                last_access = entry.last_access if entry else now
+                if ok:
+                    self._entries[cache_key] = _Entry(value, now, True, 0.0, last_access)
+                elif entry is None or not entry.good:
+                    # 정상 값이 없을 때만 기본값 결과 보관
+                    self._entries[cache_key] = _Entry(value, now, False, now + RETRY_SECONDS, last_access)
+                else:
+                    # 마지막 정상 값 유지
+                    entry.retry_at = now + RETRY_SECONDS
+            self.stats['refreshes'] += 1
+            if not ok:
+                self.stats['refresh_failures'] += 1
+            self._save()
+        except Exception as e:
+            self.stats['refresh_failures'] += 1
+            print(f"⚠️ 스냅샷 갱신 실패 {cache_key}: {e}")
+            with self._lock:
+                entry = self._entries.get(cache_key)
+                if entry is not None:
+                    entry.retry_at = time.time() + RETRY_SECONDS
+        finally:
+            with self._lock:
+                self._inflight.pop(cache_key, None)
+            done.set()
+
+    def _ensure_refresher(self):
+        if self._refresher is not None:
+            return
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="snapshot-refresher", daemon=True)
+                self._refresher.start()
+
+    def _refresh_loop(self):
+        """만료 임박 + 최근 조회된 항목을 미리 갱신"""
+        while True:
+            time.sleep(REFRESH_INTERVAL)
+            now = time.time()
+            with self._lock:
+                due = [key for key, entry in self._entries.items()
+                       if key in self._fetchers
+                       and now - entry.last_access < REFRESH_IDLE_SECONDS
+                       and self._needs_refresh(key[0], entry, now, REFRESH_AHEAD_RATIO)]
+            for key in due:
+                self._refresh_async(key)
+
+    # ========== 영속화 ==========
+
+    def _load(self):
+        if self.persist_path is None or not self.persist_path.exists():
+            return
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for item in data.get('entries', []):
+                self._entries[(item['source'], item['key'])] = _Entry(item['value'], item['fetched_at'])
+            print(f"✓ 스냅샷 캐시 로드: {len(self._entries)}건 ({self.persist_path.name})")
+        except Exception as e:
+            print(f"⚠️ 스냅샷 캐시 로드 실패: {e}")
+
+    def _save(self):
+        """정상 값만 저장 (원자적 교체)"""
+        if self.persist_path is None:
+            return
+        with self._lock:
+            entries = [{'source': source, 'key': key, 'value': entry.value, 'fetched_at': entry.fetched_at}
+                       for (source, key), entry in self._entries.items() if entry.good]
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_name(self.persist_path.name + f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'entries': entries}, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            print(f"⚠️ 스냅샷 캐시 저장 실패: {e}")
+
+    def get_stats(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            ages = {f"{source}:{key}": round(now - entry.fetched_at, 1)
+                    for (source, key), entry in self._entries.items()}
+        return {**self.stats, 'entries': len(ages), 'inflight': len(self._inflight), 'age_seconds': ages}
@@ -0,0 +1,143 @@
+"""
+SQLite 연결 계층
+================
+- 읽기: 스레드별 연결 재사용 (요청마다 connect/close 하지 않음)
+- 쓰기: 전용 writer 스레드 1개가 단일 연결로 순서대로 처리
+  → 동시 요청에서도 "database is locked" 없이 직렬화
+- WAL 저널 모드: 쓰기 중에도 읽기 연결이 막히지 않음
+- PRAGMA 튜닝 (synchronous=NORMAL, cache_size, temp_store, busy_timeout)
+- sqlite3 내장 prepared statement 캐시 (cached_statements) 사용 → 같은 SQL 재파싱 없음
+
+사용:
+    pool = SQLitePool(db_path)
+    with pool.reader() as conn:
+        rows = conn.execute('SELECT ...').fetchall()
+    last_id = pool.write(lambda conn: conn.execute('INSERT ...', params).lastrowid)
+"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+# 연결별 PRAGMA
+PRAGMAS = {
+    'synchronous': 'NORMAL',   # WAL에서는 NORMAL로도 커밋 내구성 유지 (체크포인트 시 fsync)
+    'cache_size': -16000,      # 16MB 페이지 캐시 (음수 = KB 단위)
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+BUSY_TIMEOUT_MS = 5000
+
+# 연결당 prepared statement 캐시 크기
+CACHED_STATEMENTS = 256
+
+# 쓰기 대기열 한도 (초과 시 호출 스레드가 대기)
+WRITE_QUEUE_SIZE = 1024
+
+
+class SQLitePool:
+    """스레드별 읽기 연결 + 단일 writer 스레드"""
+
+    def __init__(self, db_path: str, pragmas: Optional[Dict] = None):
+        self.db_path = db_path
+        self.pragmas = dict(PRAGMAS, **(pragmas or {}))
+        self._local = threading.local()
+        self._connections = []
+        self._conn_lock = threading.Lock()
+
+        # WAL은 DB 파일에 영구 저장되므로 한 번만 설정
+        conn = self._connect()
+        self.journal_mode = conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        conn.close()
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._writer_conn: Optional[sqlite3.Connection] = None
+        self._writer = threading.Thread(target=self._writer_loop, name="sqlite-writer", daemon=True)
+        self._writer.start()
+        self.stats = {'writes': 0, 'write_errors': 0, 'write_wait_ms': 0.0, 'write_ms': 0.0}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name}={value}')
+        return conn
+
+    # ========== 읽기 ==========
+
+    def connection(self) -> sqlite3.Connection:
+        """현재 스레드 전용 연결 (최초 1회 생성 후 재사용)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._conn_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """읽기 연결 - 끝나면 열린 읽기 트랜잭션 정리 (연결은 닫지 않음)"""
+        conn = self.connection()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+    # ========== 쓰기 ==========
+
+    def write(self, fn: Callable[[sqlite3.Connection], object], wait: bool = True):
+        """
+        writer 스레드에서 fn(conn)을 하나의 트랜잭션으로 실행
+
+        성공 시 commit, 예외 시 rollback 후 호출자에게 예외 전달.
+        wait=False면 Future를 즉시 반환.
+        """
+        future: Future = Future()
+        if threading.current_thread() is self._writer:
+            # writer 스레드 내부 재진입 - 바로 실행
+            self._run(fn, future, time.perf_counter())
+        else:
+            self._queue.put((fn, future, time.perf_counter()))
+        return future.result() if wait else future
+
+    def _writer_loop(self):
+        self._writer_conn = self._connect()
+        while True:
+            fn, future, enqueued = self._queue.get()
+            self._run(fn, future, enqueued)
+
+    def _run(self, fn, future: Future, enqueued: float):
+        if not future.set_running_or_notify_cancel():
+            return
+        conn = self._writer_conn
+        started = time.perf_counter()
+        try:
+            with conn:  # commit / rollback
+                result = fn(conn)
+            future.set_result(result)
+            self.stats['writes'] += 1
+        except BaseException as e:
+            self.stats['write_errors'] += 1
+            future.set_exception(e)
+        finally:
+            self.stats['write_wait_ms'] += (started - enqueued) * 1000
+            self.stats['write_ms'] += (time.perf_counter() - started) * 1000
+
+    def get_stats(self) -> Dict:
+        writes = max(self.stats['writes'] + self.stats['write_errors'], 1)
+        return {
+            'journal_mode': self.journal_mode,
+            'reader_connections': len(self._connections),
+            'write_queue': self._queue.qsize(),
+            'writes': self.stats['writes'],
+            'write_errors': self.stats['write_errors'],
+            'avg_write_wait_ms': round(self.stats['write_wait_ms'] / writes, 3),
+            'avg_write_ms': round(self.stats['write_ms'] / writes, 3),
+        }
@@ -0,0 +1,233 @@
+"""
+타깃 인코딩 통계 (증분 갱신 + Out-of-Fold)
+========================================
+인코더 키별 (표본 수, 타깃 합)을 누적해 두고 필요할 때 평균 인코더를 만든다.
+- update(keys, target): 새 수집 배치만 더하면 됨 (전체 재계산 없음)
+  ids를 주면 워터마크(마지막으로 반영한 매물 Id)보다 큰 행만 반영 → 같은 CSV를 다시 넣어도 중복 없음
+- encoders(): 서빙용 인코더 사전 (fit_target_encoders와 같은 형식: {인코더 이름: {키: 값}, 'global_mean'})
+  → model_artifacts.export_artifact로 컴팩트 아티팩트에 그대로 저장
+- out_of_fold(keys, target): 학습 행의 인코딩을 자기 폴드를 뺀 통계로 계산 (타깃 누수 방지)
+  조회 폴백은 서빙과 같음 (모델_연식_주행구간 → 모델_연식 → 모델 → 전역 평균)
+- save(path) / load(path): 통계를 컴팩트 인코더 테이블 형식(<path>.bin + <path>.json)으로 저장
+
+사용 (학습):
+    stats = TargetEncoderStats(smoothing=SMOOTHING)
+    oof = stats.out_of_fold(encoder_keys(train_df), train_df['Price'])   # 학습 피처용
+    stats.update(encoder_keys(train_df), train_df['Price'], ids=train_df['Id'])
+    X_train = pipeline_from(stats.encoders()).transform(train_df, encodings=oof)
+
+사용 (야간 갱신):
+    stats = TargetEncoderStats.load(model_dir / 'domestic_v12_te_stats')
+    stats.update(encoder_keys(df), df['Price'], ids=df['Id'])     # 새 매물 행만 반영
+    stats.save(model_dir / 'domestic_v12_te_stats')
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.feature_pipeline import TARGET_ENCODINGS
+from services.model_artifacts import load_encoders, write_encoder_tables
+
+TE_STATS_VERSION = 1
+
+# 폴드 분할 기본값
+DEFAULT_N_SPLITS = 5
+DEFAULT_SEED = 42
+
+
+def stats_paths(path) -> Dict[str, Path]:
+    """통계 파일 경로 (bin / meta)"""
+    path = Path(path)
+    return {'bin': path.with_name(path.name + '.bin'), 'meta': path.with_name(path.name + '.json')}
+
+
+class TargetEncoderStats:
+    """인코더 이름별 키 → (count, sum) 누적 통계"""
+
+    def __init__(self, smoothing: Optional[Mapping[str, int]] = None, names: Optional[Iterable[str]] = None):
+        """
+        Args:
+            smoothing: 인코더 이름 → 최소 표본 수 (전역 평균 쪽으로 수축, 없으면 단순 평균)
+            names: 관리할 인코더 이름 (기본: 키가 주어지는 TARGET_ENCODINGS 전부)
+        """
+        self.smoothing = dict(smoothing or {})
+        self.names = set(names) if names is not None else None
+        self.count = 0
+        self.total = 0.0
+        self.watermark: Optional[int] = None  # 반영한 행의 최대 Id
+        self._stats: Dict[str, pd.DataFrame] = {}  # 인코더 이름 → DataFrame(index=키, columns=[count, sum])
+
+    def _specs(self, keys: Mapping[str, np.ndarray]):
+        for feature, enc_name, key, fallback in TARGET_ENCODINGS:
+            if key in keys and (self.names is None or enc_name in self.names):
+                yield feature, enc_name, key, fallback
+
+    @property
+    def global_mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    # ---------- 증분 갱신 ----------
+
+    def update(self, keys: Mapping[str, np.ndarray], target, ids=None) -> int:
+        """
+        배치 통계 누적
+
+        Args:
+            keys: encoder_keys() 결과
+            target: 타깃 값 (만원)
+            ids: 행 Id (선택) - 워터마크 이하 행은 이미 반영된 것으로 보고 건너뜀
+
+        Returns:
+            반영한 행 수
+        """
+        y = np.asarray(target, dtype=np.float64)
+        mask = None
+        if ids is not None:
+            ids = np.asarray(ids, dtype=np.int64)
+            if self.watermark is not None:
+                mask = ids > self.watermark
+                if not mask.any():
+                    return 0
+                y = y[mask]
+            if len(ids):
+                self.watermark = int(ids.max()) if self.watermark is None else max(self.watermark, int(ids.max()))
+        if not len(y):
+            return 0
+
+        for _, enc_name, key, _ in self._specs(keys):
+            k = np.asarray(keys[key], dtype=object)
+            batch = pd.Series(y).groupby(k[mask] if mask is not None else k).agg(['count', 'sum'])
+            batch['count'] = batch['count'].astype(np.float64)
+            prev = self._stats.get(enc_name)
+            self._stats[enc_name] = batch if prev is None else prev.add(batch, fill_value=0.0).sort_index()
+        self.count += len(y)
+        self.total += float(y.sum())
+        return len(y)
+
+    # ---------- 인코더 ----------
+
+    def encoders(self) -> Dict:
+        """서빙용 인코더 사전 (fit_target_encoders와 같은 형식)"""
+        global_mean = self.global_mean
+        encoders: Dict = {}
+        for _, enc_name, _, _ in TARGET_ENCODINGS:
+            stats = self._stats.get(enc_name)
+            if stats is None:
+                continue
+            min_n = self.smoothing.get(enc_name, 0)
+            values = (stats['sum'] + global_mean * min_n) / (stats['count'] + min_n)
+            encoders[enc_name] = values.to_dict()
+        encoders['global_mean'] = global_mean
+        return encoders
+
+    def out_of_fold(self, keys: Mapping[str, np.ndarray], target, n_splits: int = DEFAULT_N_SPLITS,
+                    seed: int = DEFAULT_SEED) -> Dict[str, np.ndarray]:
+        """
+        K-fold Out-of-Fold 인코딩 (학습 피처용)
+
+        각 행은 (누적 통계 + 이 배치) 중 자기 폴드를 뺀 통계로 인코딩된다.
+        배치 행은 아직 update()하지 않은 상태여야 한다 (반영 후 호출하면 자기 타깃이 섞임).
+
+        Returns:
+            피처 이름(Model_enc 등) → 행별 인코딩 배열 (FeaturePipeline.transform(encodings=...)에 전달)
+        """
+        y = np.asarray(target, dtype=np.float64)
+        n = len(y)
+        folds = np.random.default_rng(seed).permutation(n) % n_splits
+        fold_count = np.bincount(folds, minlength=n_splits).astype(np.float64)
+        fold_sum = np.bincount(folds, weights=y, minlength=n_splits)
+        # 폴드별 전역 평균 (자기 폴드 제외)
+        out_count = self.count + n - fold_count
+        global_mean = np.divide(self.total + y.sum() - fold_sum, out_count,
+                                out=np.zeros(n_splits), where=out_count > 0)
+
+        encodings: Dict[str, np.ndarray] = {}
+        for feature, enc_name, key, fallback in self._specs(keys):
+            codes, uniques = pd.factorize(np.asarray(keys[key], dtype=object), use_na_sentinel=False)
+            cell = codes * n_splits + folds
+            size = len(uniques) * n_splits
+            sums = np.bincount(cell, weights=y, minlength=size).reshape(-1, n_splits)
+            counts = np.bincount(cell, minlength=size).reshape(-1, n_splits).astype(np.float64)
+
+            prev = self._stats.get(enc_name)
+            if prev is not None:
+                hist = prev.reindex(uniques, fill_value=0.0)
+                hist_sum = hist['sum'].to_numpy()[:, None]
+                hist_count = hist['count'].to_numpy()[:, None]
+            else:
+                hist_sum = hist_count = 0.0
+            oof_sum = hist_sum + sums.sum(axis=1, keepdims=True) - sums
+            oof_count = hist_count + counts.sum(axis=1, keepdims=True) - counts
+
+            min_n = self.smoothing.get(enc_name, 0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                table = (oof_sum + global_mean[None, :] * min_n) / (oof_count + min_n)
+            table[oof_count <= 0] = np.nan
+
+            values = table[codes, folds]
+            missing = np.isnan(values)
+            if missing.any():
+                base = encodings[fallback] if fallback in encodings else global_mean[folds]
+                values[missing] = base[missing]
+            encodings[feature] = values
+        return encodings
+
+    # ---------- 저장 / 로드 ----------
+
+    def save(self, path) -> Dict[str, Path]:
+        """<path>.bin (키별 count / sum 테이블) + <path>.json (메타) - 메타를 마지막에 씀"""
+        paths = stats_paths(path)
+        tables = {}
+        for enc_name, stats in self._stats.items():
+            tables[f"{enc_name}:count"] = stats['count'].to_dict()
+            tables[f"{enc_name}:sum"] = stats['sum'].to_dict()
+        layout, _, size = write_encoder_tables(paths['bin'], tables)
+        meta = {
+            'te_stats_version': TE_STATS_VERSION,
+            'encoder_order': list(tables),
+            'tables': layout,
+            'scalars': {},
+            'size': size,
+            'count': self.count,
+            'total': self.total,
+            'watermark': self.watermark,
+            'smoothing': self.smoothing,
+            'names': sorted(self.names) if self.names is not None else None,
+        }
+        tmp = paths['meta'].with_name(f"{paths['meta'].name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding='utf-8')
+        os.replace(tmp, paths['meta'])
+        return paths
+
+    @classmethod
+    def load(cls, path) -> "TargetEncoderStats":
+        """save()로 저장한 통계 읽기 (없거나 버전이 다르면 FileNotFoundError / ValueError)"""
+        paths = stats_paths(path)
+        meta = json.loads(paths['meta'].read_text(encoding='utf-8'))
+        if meta.get('te_stats_version') != TE_STATS_VERSION:
+            raise ValueError(f"지원하지 않는 통계 버전: {meta.get('te_stats_version')}")
+        if os.path.getsize(paths['bin']) != meta['size']:
+            raise ValueError(f"통계 파일 크기 불일치: {paths['bin']}")
+
+        stats = cls(smoothing=meta['smoothing'], names=meta['names'])
+        stats.count = meta['count']
+        stats.total = meta['total']
+        stats.watermark = meta['watermark']
+        tables = load_encoders(paths['bin'], meta)
+        for name in meta['encoder_order']:
+            enc_name, part = name.rsplit(':', 1)
+            if part != 'count':
+                continue
+            counts, sums = tables[name], tables[f"{enc_name}:sum"]
+            stats._stats[enc_name] = pd.DataFrame({
+                'count': np.array(counts.arrays()['values']),
+                'sum': np.array(sums.arrays()['values']),
+            }, index=pd.Index(list(counts), dtype=object))
+        return stats
@@ -11,8 +11,9 @@ from pathlib import Path
 from typing import Dict
 
 # 1. 같은 폴더의 data_collectors 사용
+get_snapshot_cache = None
 try:
-    from .data_collectors import collect_real_data_only
+    from .data_collectors import collect_real_data_only, get_snapshot_cache
 except ImportError:
     # 2. Fallback: src 폴더에서
     src_path = Path(__file__).parent.parent.parent / 'src'
@@ -115,6 +116,12 @@ class TimingService:
             print(f"⚠️ 타이밍 분석 중 오류: {e}")
             return self._fallback_timing_analysis(car_model, brand)
     
+    def get_cache_stats(self) -> Dict:
+        """외부 데이터 스냅샷 캐시 통계 (적중/만료 응답/갱신 횟수, 항목별 경과 시간)"""
+        if not get_snapshot_cache:
+            return {}
+        return get_snapshot_cache().get_stats()
+    
     def _get_label(self, score: float, decision: str) -> str:
         """타이밍 점수에 따른 라벨 반환"""
         if score >= 70:
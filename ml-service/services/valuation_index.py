@@ -0,0 +1,284 @@
+"""
+매물 가치 평가 인덱스 (Valuation Index)
+======================================
+- 전체 매물에 대해 예측 모델을 한 번만 실행해 car_id별
+  predicted_price / price_gap_pct / value_score 를 저장
+- 컬럼 단위 numpy 배열(.npz)로 영속화 → 재시작 시 즉시 로드
+- CSV / 모델 파일 변경 시 증분 재계산
+  (예측 입력이 같은 행은 기존 예측값 재사용, 모델 파일·라이브 모델·피처 규칙이 바뀌면 전체 재예측)
+
+오프라인 빌드:
+    cd ml-service && python -m services.valuation_index
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.feature_pipeline import FEATURE_PIPELINE_VERSION, normalize_fuel
+
+INDEX_VERSION = 2
+
+# 예측 결과에 영향을 주는 입력 컬럼 (행 키 해시 대상)
+KEY_COLUMNS = ['brand', 'model', 'reg_year', 'mileage', 'fuel']
+
+# 모델 지문에 포함할 파일 확장자
+MODEL_EXTENSIONS = ('.pkl', '.json', '.ubj')
+
+# 배치 예측 청크 크기
+PREDICT_CHUNK = 5000
+
+
+def _file_fingerprint(paths: Iterable[Path]) -> Dict[str, List[int]]:
+    """파일별 (mtime_ns, size) 지문"""
+    fp = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            fp[str(path)] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            continue
+    return fp
+
+
+def compute_row_keys(df: pd.DataFrame) -> np.ndarray:
+    """예측 입력 컬럼 기반 행 키 (uint64 해시)"""
+    cols = [c for c in KEY_COLUMNS if c in df.columns]
+    if not cols or len(df) == 0:
+        return np.zeros(len(df), dtype=np.uint64)
+    return pd.util.hash_pandas_object(df[cols], index=False).to_numpy(dtype=np.uint64)
+
+
+def compute_value_scores(predicted: np.ndarray, actual: np.ndarray,
+                         mileage: np.ndarray, year: np.ndarray):
+    """
+    가격 괴리율 / 가치 점수 (벡터 연산)
+
+    가치 점수 = 가격 괴리율 점수(최대 40) + 주행거리 점수(최대 30) + 연식 점수(최대 30)
+    """
+    predicted = np.asarray(predicted, dtype=np.float64)
+    actual = np.asarray(actual, dtype=np.float64)
+    gap_pct = (predicted - actual) / np.maximum(predicted, 1) * 100
+    price_score = np.clip(gap_pct * 4, 0, 40)
+    mileage_score = np.maximum(30 - np.asarray(mileage, dtype=np.float64) / 3500, 0)
+    year_score = np.clip((np.asarray(year, dtype=np.float64) - 2018) * 5, 0, 30)
+    return gap_pct.astype(np.float32), (price_score + mileage_score + year_score).astype(np.float32)
+
+
+class ValuationIndex:
+    """car_id별 예측가/괴리율/가치점수 컬럼 테이블"""
+
+    def __init__(self, cache_path: Path, source_paths: List[Path], model_dir: Path,
+                 model_tag: Optional[Callable[[], str]] = None):
+        """
+        Args:
+            model_tag: 라이브 모델 식별자 (재시작 없는 모델 교체 감지용, 파일 지문에 함께 포함)
+        """
+        self.cache_path = Path(cache_path)
+        self.source_paths = [Path(p) for p in source_paths]
+        self.model_dir = Path(model_dir)
+        self.model_tag = model_tag
+
+        self._lock = threading.Lock()
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+        self._car_index: Optional[pd.Index] = None
+        self._meta: Dict = {}
+        self._version = 'none'
+        self.stats = {'rows': 0, 'reused': 0, 'predicted': 0, 'build_seconds': 0.0, 'built_at': None}
+
+        self._load_cached()
+
+    # ========== 지문 ==========
+
+    def _model_fingerprint(self) -> Dict[str, List[int]]:
+        if not self.model_dir.exists():
+            return {}
+        files = sorted(p for p in self.model_dir.iterdir()
+                       if p.is_file() and p.suffix in MODEL_EXTENSIONS)
+        fingerprint = _file_fingerprint(files)
+        fingerprint['features'] = FEATURE_PIPELINE_VERSION
+        if self.model_tag is not None:
+            fingerprint['live'] = self.model_tag()
+        return fingerprint
+
+    def current_fingerprint(self) -> Dict:
+        return {
+            'version': INDEX_VERSION,
+            'sources': _file_fingerprint(self.source_paths),
+            'models': self._model_fingerprint(),
+        }
+
+    def is_stale(self) -> bool:
+        """CSV 또는 모델 파일이 마지막 빌드 이후 변경되었는지"""
+        return not self.ready or self.current_fingerprint() != self._meta.get('fingerprint')
+
+    def sources_changed(self) -> bool:
+        return _file_fingerprint(self.source_paths) != self._meta.get('fingerprint', {}).get('sources')
+
+    @property
+    def ready(self) -> bool:
+        return self._columns is not None
+
+    @property
+    def version(self) -> str:
+        """설치된 인덱스 버전 (입력 지문 + 빌드 시각 해시, 빌드 전이면 'none') - 응답 캐시 키용"""
+        return self._version
+
+    # ========== 영속화 ==========
+
+    def _load_cached(self):
+        if not self.cache_path.exists():
+            return
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('fingerprint', {}).get('version') != INDEX_VERSION:
+                    return
+                columns = {k: data[k] for k in data.files if k != 'meta'}
+            self._install(columns, meta)
+            print(f"✓ 가치 평가 인덱스 로드: {len(columns['car_id']):,}건")
+        except Exception as e:
+            print(f"⚠️ 가치 평가 인덱스 로드 실패: {e}")
+
+    def _save(self, columns: Dict[str, np.ndarray], meta: Dict):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, meta=np.array(json.dumps(meta)), **columns)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"⚠️ 가치 평가 인덱스 저장 실패: {e}")
+
+    def _install(self, columns: Dict[str, np.ndarray], meta: Dict):
+        car_index = pd.Index(columns['car_id'])
+        if not car_index.is_unique:
+            # 중복 제거 이전에 저장된 캐시 - get_indexer는 유일한 인덱스에서만 동작
+            keep = ~car_index.duplicated(keep='last')
+            columns = {name: values[keep] for name, values in columns.items()}
+            car_index = car_index[keep]
+        version = hashlib.sha1(json.dumps(meta, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        with self._lock:
+            self._columns = columns
+            self._car_index = car_index
+            self._meta = meta
+            self._version = version
+            self.stats['rows'] = len(columns['car_id'])
+
+    # ========== 빌드 ==========
+
+    def build(self, df: pd.DataFrame, prediction_service) -> Dict:
+        """
+        전체 매물 가치 평가 (증분)
+
+        Args:
+            df: car_id, brand, model, reg_year, mileage, fuel, price 컬럼을 가진 매물 테이블
+            prediction_service: predict_batch()를 제공하는 예측 서비스
+        """
+        start = time.time()
+        fingerprint = self.current_fingerprint()
+
+        df = df[df['car_id'].notna()]
+        # 재수집 등으로 같은 car_id가 중복되면 마지막 행만 사용 (lookup 인덱스는 유일해야 함)
+        df = df[~df['car_id'].astype(str).duplicated(keep='last')]
+        car_ids = df['car_id'].astype(str).to_numpy(dtype=str)
+        keys = compute_row_keys(df)
+        predicted = np.full(len(df), np.nan, dtype=np.float32)
+
+        # 모델이 같으면 이전 빌드의 예측값을 행 키로 재사용
+        reused = 0
+        old = self._columns
+        if old is not None and self._meta.get('fingerprint', {}).get('models') == fingerprint['models'] \
+                and len(old['row_key']) > 0:
+            order = np.argsort(old['row_key'], kind='stable')
+            sorted_keys = old['row_key'][order]
+            pos = np.searchsorted(sorted_keys, keys)
+            pos_clipped = np.minimum(pos, len(sorted_keys) - 1)
+            hit = sorted_keys[pos_clipped] == keys
+            predicted[hit] = old['predicted_price'][order[pos_clipped[hit]]]
+            reused = int(np.count_nonzero(~np.isnan(predicted)))
+
+        # 나머지 행만 배치 예측 (이전에 예측 실패한 행도 재시도)
+        todo = np.flatnonzero(np.isnan(predicted))
+        if len(todo) > 0 and prediction_service is not None:
+            sub = df.iloc[todo]
+            vehicles = [
+                {'brand': b, 'model_name': m, 'year': y, 'mileage': mi, 'fuel': normalize_fuel(f)}
+                for b, m, y, mi, f in zip(sub['brand'], sub['model'], sub['reg_year'],
+                                          sub['mileage'], sub['fuel'])
+            ]
+            for chunk_start in range(0, len(vehicles), PREDICT_CHUNK):
+                chunk = vehicles[chunk_start:chunk_start + PREDICT_CHUNK]
+                items = prediction_service.predict_batch(chunk)
+                for offset, item in enumerate(items):
+                    if item.result is not None:
+                        predicted[todo[chunk_start + offset]] = item.result.predicted_price
+
+        gap_pct, value_score = compute_value_scores(
+            predicted, df['price'].to_numpy(), df['mileage'].to_numpy(), df['reg_year'].to_numpy())
+
+        columns = {
+            'car_id': car_ids,
+            'row_key': keys,
+            'predicted_price': predicted,
+            'price_gap_pct': gap_pct,
+            'value_score': value_score,
+        }
+        meta = {'fingerprint': fingerprint, 'built_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+        self._install(columns, meta)
+        self._save(columns, meta)
+
+        elapsed = time.time() - start
+        self.stats.update({
+            'reused': reused,
+            'predicted': int(len(todo)),
+            'build_seconds': round(elapsed, 2),
+            'built_at': meta['built_at'],
+        })
+        print(f"✓ 가치 평가 인덱스 빌드: {len(car_ids):,}건 "
+              f"(재사용 {reused:,}건, 신규 예측 {len(todo):,}건, {elapsed:.1f}초)")
+        return dict(self.stats)
+
+    # ========== 조회 ==========
+
+    def lookup(self, car_ids) -> Optional[Dict[str, np.ndarray]]:
+        """
+        car_id 목록에 정렬된 예측가/괴리율/가치점수 배열 반환
+
+        인덱스에 없는 car_id는 NaN. 인덱스가 준비되지 않았으면 None.
+        """
+        with self._lock:
+            columns, car_index = self._columns, self._car_index
+        if columns is None:
+            return None
+        positions = car_index.get_indexer(pd.Index(car_ids).astype(str))
+        found = positions >= 0
+        result = {}
+        for name in ('predicted_price', 'price_gap_pct', 'value_score'):
+            values = np.full(len(positions), np.nan, dtype=np.float32)
+            values[found] = columns[name][positions[found]]
+            result[name] = values
+        return result
+
+    def get(self, car_id: str) -> Optional[Dict]:
+        """단일 car_id 가치 평가 조회"""
+        values = self.lookup([str(car_id)])
+        if values is None or np.isnan(values['predicted_price'][0]):
+            return None
+        return {name: float(arr[0]) for name, arr in values.items()}
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from services.recommendation_service import RecommendationService
+
+    service = RecommendationService(build_valuation_index=False)
+    stats = service.rebuild_valuation_index()
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
@@ -0,0 +1,97 @@
+"""
+매물 필터링 인덱스
+================
+- 브랜드/모델 포스팅 리스트 (고유값 → 행 위치 배열)
+- 가격 정렬 위치 배열 (범위 검색은 searchsorted)
+- 필터 결과는 원본 행 순서의 위치 배열로 반환 → 페이지 구간만 iloc으로 조회
+
+DataFrame은 참조만 보관하며 복사하지 않는다.
+"""
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# 부분 문자열 매칭 결과 메모 (컬럼별 최대 개수)
+MATCH_CACHE_SIZE = 1024
+
+
+class VehicleIndex:
+    """단일 매물 테이블에 대한 포스팅 리스트 / 가격 정렬 인덱스"""
+
+    def __init__(self, df: pd.DataFrame, text_columns=('brand', 'model'), price_column: str = 'price'):
+        self.df = df
+        self.size = len(df)
+        self._lock = threading.Lock()
+
+        # 텍스트 컬럼: 고유값 목록 + 고유값별 행 위치 (오름차순)
+        self._values: Dict[str, pd.Series] = {}
+        self._postings: Dict[str, list] = {}
+        self._match_cache: Dict[str, Dict[str, np.ndarray]] = {}
+        for col in text_columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col], sort=False)
+            order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            # factorize 결과에서 결측(-1)은 정렬 시 맨 앞에 모임
+            start = int(np.count_nonzero(codes < 0))
+            self._postings[col] = np.split(order[start:], np.cumsum(counts)[:-1]) if len(uniques) else []
+            self._values[col] = pd.Series(np.asarray(uniques, dtype=object))
+            self._match_cache[col] = {}
+
+        # 가격: 정렬 위치 + 정렬된 가격 (NaN은 맨 뒤)
+        self._price_order = None
+        if price_column in df.columns:
+            price = df[price_column].to_numpy(dtype=np.float64)
+            self._price = price
+            self._price_order = np.argsort(price, kind='stable')
+            self._sorted_price = price[self._price_order]
+
+    def _text_positions(self, col: str, query: str) -> Optional[np.ndarray]:
+        """부분 문자열(대소문자 무시)이 포함된 행 위치 - 컬럼이 없으면 None"""
+        if col not in self._values:
+            return None
+        cache = self._match_cache[col]
+        positions = cache.get(query)
+        if positions is None:
+            matched = np.flatnonzero(self._values[col].str.contains(query, case=False, na=False).to_numpy())
+            if len(matched) == 0:
+                positions = np.empty(0, dtype=np.int64)
+            elif len(matched) == 1:
+                positions = self._postings[col][matched[0]]
+            else:
+                positions = np.sort(np.concatenate([self._postings[col][i] for i in matched]))
+            with self._lock:
+                if len(cache) >= MATCH_CACHE_SIZE:
+                    cache.clear()
+                cache[query] = positions
+        return positions
+
+    def filter(self, brand: str = None, model: str = None,
+               price_min: float = None, price_max: float = None) -> np.ndarray:
+        """조건에 맞는 행 위치 (원본 순서, 오름차순)"""
+        candidates = None
+        for col, query in (('brand', brand), ('model', model)):
+            if not query:
+                continue
+            positions = self._text_positions(col, query)
+            if positions is None:
+                continue
+            candidates = positions if candidates is None else \
+                np.intersect1d(candidates, positions, assume_unique=True)
+
+        if self._price_order is None or (price_min is None and price_max is None):
+            return np.arange(self.size) if candidates is None else candidates
+
+        lo = -np.inf if price_min is None else price_min
+        hi = np.inf if price_max is None else price_max
+        if candidates is None:
+            # 가격 범위만: 정렬 배열에서 구간 추출 후 원본 순서로 정렬
+            left = np.searchsorted(self._sorted_price, lo, side='left')
+            right = np.searchsorted(self._sorted_price, hi, side='right')
+            return np.sort(self._price_order[left:right])
+
+        price = self._price[candidates]
+        return candidates[(price >= lo) & (price <= hi)]
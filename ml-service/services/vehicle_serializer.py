@@ -0,0 +1,138 @@
+"""
+매물 목록 직렬화 (벡터 연산)
+==========================
+- iterrows() + 행별 safe_get/int()/str() 대신 컬럼 단위로 결측값 처리 후 한 번에 dict 목록 생성
+- 상세정보(옵션, 사고이력)는 car_id 인덱스로 미리 정리한 테이블을 reindex로 조인
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# 응답 옵션 키 → 상세정보 컬럼
+OPTION_COLUMNS = {
+    "sunroof": 'has_sunroof',
+    "navigation": 'has_navigation',
+    "leather_seat": 'has_leather_seat',
+    "smart_key": 'has_smart_key',
+    "rear_camera": 'has_rear_camera',
+    "heated_seat": 'has_heated_seat',
+    "ventilated_seat": 'has_ventilated_seat',
+    "led_lamp": 'has_led_lamp',
+    "parking_sensor": 'has_parking_sensor',
+    "auto_ac": 'has_auto_ac',
+}
+
+# 상세정보에서 bool로 변환할 컬럼
+DETAIL_FLAG_COLUMNS = ['is_accident_free'] + list(OPTION_COLUMNS.values())
+
+
+def prepare_details(details: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    상세정보 테이블을 car_id 인덱스로 정리 (중복 car_id는 첫 행 사용)
+
+    플래그 컬럼은 결측 → False 로 bool 변환, inspection_grade 결측 → 'normal'
+    """
+    if details is None or len(details) == 0 or 'car_id' not in details.columns:
+        return None
+    df = details.drop_duplicates('car_id', keep='first').set_index('car_id')
+    converted = {col: df[col].fillna(0).astype(bool)
+                 for col in DETAIL_FLAG_COLUMNS if col in df.columns}
+    if 'inspection_grade' in df.columns:
+        converted['inspection_grade'] = df['inspection_grade'].astype(object).fillna('normal')
+    return df.assign(**converted)
+
+
+def join_details(car_ids, details: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """car_id 순서대로 상세정보 행 정렬 (없는 car_id는 NaN 행)"""
+    if details is None:
+        return None
+    return details.reindex(pd.Index(car_ids))
+
+
+def column_list(df: pd.DataFrame, col: str, default, cast=None) -> list:
+    """컬럼 값을 결측 → default 치환 후 Python 기본 타입 목록으로 변환"""
+    if col not in df.columns:
+        return [default] * len(df)
+    series = df[col]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    values = series.where(series.notna(), default).tolist()
+    if cast is not None:
+        values = [cast(v) for v in values]
+    return values
+
+
+def options_records(details: pd.DataFrame, options_map: Dict[str, str] = OPTION_COLUMNS) -> List[Dict]:
+    """조인된 상세정보 → 옵션 dict 목록 (컬럼 단위 bool 변환)"""
+    columns = {key: (details[col].fillna(False).astype(bool).tolist() if col in details.columns
+                     else [False] * len(details))
+               for key, col in options_map.items()}
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())] if keys else [{}] * len(details)
+
+
+def _to_int(value, default: int = 0) -> int:
+    return int(float(value)) if value else default
+
+
+def serialize_admin_vehicles(df: pd.DataFrame, category: str,
+                             details: Optional[pd.DataFrame] = None) -> List[Dict]:
+    """
+    관리자 매물 목록 직렬화 (AdminService 응답 형식)
+
+    Args:
+        df: 페이지 구간 DataFrame (car_id, brand, model, year, mileage, fuel, price, region)
+        category: 'domestic' / 'imported'
+        details: prepare_details()로 정리된 상세정보 테이블
+    """
+    n = len(df)
+    if n == 0:
+        return []
+
+    # car_id (결측이면 행 값 해시로 대체)
+    if 'car_id' in df.columns:
+        raw_ids = df['car_id']
+        car_ids = raw_ids.astype(object).where(raw_ids.notna(), None).tolist()
+        for i in np.flatnonzero(raw_ids.isna().to_numpy()):
+            car_ids[i] = hash(str(df.iloc[i].values)) % 100000
+    else:
+        car_ids = [hash(str(row)) % 100000 for row in df.itertuples(index=False)]
+
+    brands = column_list(df, 'brand', '')
+    models = column_list(df, 'model', '')
+    years = column_list(df, 'year', 2020, lambda v: _to_int(v, 2020))
+    mileages = column_list(df, 'mileage', 0, lambda v: int(v))
+    fuels = column_list(df, 'fuel', '')
+    prices = column_list(df, 'price', 0, _to_int)
+    regions = column_list(df, 'region', '')
+
+    # 상세정보 병합 (car_id로 조인)
+    joined = join_details(car_ids, details)
+    if joined is not None:
+        found = joined.index.isin(details.index) if len(joined) else np.zeros(0, dtype=bool)
+        options = options_records(joined)
+        accident_free = column_list(joined, 'is_accident_free', False, bool)
+        grades = column_list(joined, 'inspection_grade', 'normal')
+    else:
+        found = np.zeros(n, dtype=bool)
+        options = accident_free = grades = [None] * n
+
+    vehicles = []
+    for i in range(n):
+        has_detail = bool(found[i])
+        vehicles.append({
+            "id": car_ids[i],
+            "category": category,
+            "brand": brands[i],
+            "model": models[i],
+            "year": years[i],
+            "mileage": mileages[i],
+            "fuel": fuels[i],
+            "price": prices[i],
+            "region": regions[i],
+            "is_accident_free": accident_free[i] if has_detail else None,
+            "inspection_grade": grades[i] if has_detail else 'normal',
+            "options": options[i] if has_detail else {}
+        })
+    return vehicles
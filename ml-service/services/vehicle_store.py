@@ -0,0 +1,364 @@
+"""
+공유 차량 데이터 스토어 (Columnar In-Memory)
+==========================================
+- 엔카 원본/전처리/상세정보 CSV를 프로세스당 한 번만 로드
+- COLUMN_MAPPING 기반 컬럼명 표준화 (car_id, brand, model, year, mileage, fuel, price, region ...)
+- brand/model/fuel/region 등은 category, 수치형은 int32/float32로 압축
+- AdminService / RecommendationService / SimilarVehicleService가 같은 DataFrame을 공유
+- 전처리 통합 데이터는 브랜드 / 연식 파티션 Parquet로도 저장되어(PartitionedDataset),
+  SimilarVehicleService는 필요한 파티션만 읽는다
+
+주의: get()이 반환하는 DataFrame은 여러 서비스가 공유하는 읽기 전용 뷰다.
+      필터링/assign 등 새 객체를 만드는 연산만 사용하고 원본을 직접 수정하지 않는다.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# 컬럼 매핑 (다양한 CSV 형식 지원) - 표준 컬럼명: 후보 컬럼명 목록 (앞쪽 우선)
+COLUMN_MAPPING = {
+    'car_id': ['car_id', 'Id', 'id'],
+    'brand': ['brand', '브랜드', 'Brand', 'manufacturer', 'Manufacturer'],
+    'model': ['model_name', 'model', '모델', 'Model', 'model_full'],
+    'badge': ['badge', 'Badge'],
+    'year_raw': ['year_raw', 'Year'],  # 등록 연월 (YYYYMM)
+    'year': ['year', '연식', 'FormYear', 'model_year'],
+    'mileage': ['mileage', '주행거리', 'Mileage', 'km'],
+    'fuel': ['fuel', '연료', 'Fuel', 'fuel_type', 'FuelType'],
+    'price': ['price', '가격', 'Price', 'sale_price'],
+    'region': ['region', '지역', 'Region', 'location', 'OfficeCityState'],
+    'car_type': ['car_type', '차종', 'category', 'CarType'],
+}
+
+# category dtype으로 저장할 컬럼
+CATEGORY_COLUMNS = ['brand', 'model', 'badge', 'fuel', 'region', 'car_type',
+                    'category', 'inspection_grade']
+
+# 데이터셋 이름 → CSV 파일
+DATASETS = {
+    'domestic': 'encar_raw_domestic.csv',
+    'imported': 'encar_imported_data.csv',
+    'combined': 'processed_encar_combined.csv',
+    'domestic_details': 'complete_domestic_details.csv',
+    'imported_details': 'complete_imported_details.csv',
+}
+
+# 파티션 데이터셋 이름 → 디렉터리 (Hive 형식: brand=<브랜드>/year=<연식>/part-*.parquet)
+# scripts/preprocessing/preprocess_encar_combined.py가 CSV와 함께 생성
+PARTITIONED_DATASETS = {
+    'combined': 'processed_encar_combined',
+}
+PARTITION_MANIFEST = '_manifest.json'  # '_'로 시작하는 파일은 Parquet 데이터셋 탐색에서 제외됨
+ROW_ID = 'row_id'  # 원본 행 순서 (파티션을 합친 뒤 같은 순서로 복원)
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """CSV 컬럼명을 표준 형식으로 변환"""
+    rename_map = {}
+    for std_name, variants in COLUMN_MAPPING.items():
+        if std_name in df.columns:
+            continue
+        for variant in variants:
+            if variant in df.columns and variant not in rename_map:
+                rename_map[variant] = std_name
+                break
+    if rename_map:
+        df = df.rename(columns=rename_map)
+    return df
+
+
+def _compact_numeric(series: pd.Series) -> pd.Series:
+    """수치형 컬럼 압축 (정수값이면 int32/int8, 아니면 float32)"""
+    if series.dtype == bool:
+        return series
+    values = series.to_numpy()
+    if np.issubdtype(values.dtype, np.integer):
+        lo, hi = values.min(initial=0), values.max(initial=0)
+        if lo >= 0 and hi <= 1:
+            return series.astype(np.int8)
+        if np.iinfo(np.int32).min <= lo and hi <= np.iinfo(np.int32).max:
+            return series.astype(np.int32)
+        return series
+    if np.issubdtype(values.dtype, np.floating):
+        return series.astype(np.float32)
+    return series
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """category / int32 / float32 변환"""
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if col == 'car_id':
+            continue  # 엔카 ID는 원래 dtype 유지 (int64)
+        if col in CATEGORY_COLUMNS:
+            converted[col] = series.astype('category')
+        elif pd.api.types.is_numeric_dtype(series):
+            converted[col] = _compact_numeric(series)
+    return df.assign(**converted) if converted else df
+
+
+def _partitioning():
+    return pads.partitioning(pa.schema([('brand', pa.string()), ('year', pa.int32())]), flavor='hive')
+
+
+def write_partitioned(frames: Iterable[pd.DataFrame], root: Path, schema, meta: Optional[Dict] = None) -> Dict:
+    """
+    DataFrame 청크를 브랜드 / 연식 파티션 Parquet 데이터셋으로 스트리밍 저장
+
+    청크는 하나씩 RecordBatch로 바뀌어 바로 파티션 파일에 쓰이므로 메모리는 청크 크기만큼만 쓴다.
+    임시 디렉터리에 쓴 뒤 교체하므로, 읽는 쪽은 이전 데이터셋이나 완성된 새 데이터셋만 본다.
+
+    Args:
+        frames: schema 컬럼(brand, year 포함)을 가진 DataFrame 청크
+        root: 데이터셋 디렉터리
+        schema: pyarrow 스키마
+        meta: 매니페스트에 함께 기록할 값
+
+    Returns:
+        매니페스트 (행 수, 파티션 수, 파일 수 ...)
+    """
+    root = Path(root)
+    tmp = root.with_name(f".{root.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    written = {'rows': 0}
+
+    def batches():
+        for df in frames:
+            written['rows'] += len(df)
+            yield pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False)
+
+    pads.write_dataset(batches(), tmp, schema=schema, format='parquet', partitioning=_partitioning(),
+                       basename_template='part-{i}.parquet', existing_data_behavior='overwrite_or_ignore')
+
+    files = list(tmp.glob('*/*/*.parquet'))
+    manifest = {
+        **(meta or {}),
+        'rows': written['rows'],
+        'partitions': len({f.parent for f in files}),
+        'files': len(files),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    tmp.mkdir(parents=True, exist_ok=True)
+    (tmp / PARTITION_MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding='utf-8')
+
+    old = root.with_name(f".{root.name}.{os.getpid()}.old")
+    if root.exists():
+        os.replace(root, old)
+    os.replace(tmp, root)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+class PartitionedDataset:
+    """
+    브랜드 / 연식 파티션 Parquet 데이터셋 (필요한 파티션만 읽기)
+
+    - 파티션 목록은 디렉터리 구조로만 구성 (데이터는 읽지 않음)
+    - read()는 요청한 파티션만 읽음 (캐시는 호출하는 서비스가 용도에 맞게 관리)
+    - 반환 DataFrame은 원본 행 순서(ROW_ID) + VehicleStore와 같은 컬럼 표준화 / dtype 압축
+    - 데이터셋이 다시 만들어지면(매니페스트 변경) 파티션 목록을 다시 읽음
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._brand_matches: Dict[str, frozenset] = {}
+        self._lock = threading.Lock()
+        self._scan()
+
+    def _scan(self):
+        dataset = pads.dataset(self.root, format='parquet', partitioning=_partitioning())
+        fragments: Dict[Tuple[str, int], list] = {}
+        for fragment in dataset.get_fragments():
+            keys = pads.get_partition_keys(fragment.partition_expression)
+            fragments.setdefault((keys['brand'], int(keys['year'])), []).append(fragment)
+
+        version = self._fingerprint() or 'none'
+        with self._lock:
+            self._schema = dataset.schema
+            self._fragments = fragments
+            self._brand_matches = {}
+            self.brands = sorted({brand for brand, _ in fragments})
+            self.version = version  # 데이터셋 지문 (응답 캐시 키용)
+
+    def _fingerprint(self) -> Optional[str]:
+        """매니페스트 파일 지문 (교체 중이라 없으면 None)"""
+        try:
+            st = (self.root / PARTITION_MANIFEST).stat()
+        except OSError:
+            return None
+        return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    def refresh(self) -> str:
+        """매니페스트가 바뀌었으면 다시 스캔 (stat 1회) 후 현재 지문 반환"""
+        fingerprint = self._fingerprint()
+        if fingerprint is not None and fingerprint != self.version:
+            self._scan()  # 데이터셋이 다시 만들어짐
+        return self.version
+
+    def keys(self, brand: Optional[str] = None, year_min: Optional[int] = None,
+             year_max: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        조건에 맞는 파티션 (brand: 부분 문자열, 대소문자 무시 - SimilarPriceCube 브랜드 매칭과 같은 규칙)
+        """
+        self.refresh()
+        brands = None
+        if brand is not None:
+            brands = self._brand_matches.get(brand)
+            if brands is None:
+                names = pd.Series(self.brands, dtype=object)
+                brands = frozenset(names[names.str.contains(brand, case=False, na=False)])
+                with self._lock:
+                    if len(self._brand_matches) >= 1024:
+                        self._brand_matches.clear()
+                    self._brand_matches[brand] = brands
+        return sorted(key for key in self._fragments
+                      if (brands is None or key[0] in brands)
+                      and (year_min is None or key[1] >= year_min)
+                      and (year_max is None or key[1] <= year_max))
+
+    def _table(self, key: Tuple[str, int]) -> 'pa.Table':
+        fragments, schema = self._fragments[key], self._schema
+        return pa.concat_tables([fragment.to_table(schema=schema) for fragment in fragments])
+
+    def read(self, keys: Iterable[Tuple[str, int]]) -> Optional[pd.DataFrame]:
+        """파티션들을 합친 DataFrame (파티션이 없으면 None)"""
+        keys = [key for key in keys if key in self._fragments]
+        if not keys:
+            return None
+        try:
+            tables = [self._table(key) for key in keys]
+        except (FileNotFoundError, KeyError):
+            self._scan()  # 데이터셋이 다시 만들어짐
+            keys = [key for key in keys if key in self._fragments]
+            if not keys:
+                return None
+            tables = [self._table(key) for key in keys]
+
+        df = pa.concat_tables(tables).to_pandas()
+        if ROW_ID in df.columns:
+            df = df.sort_values(ROW_ID, kind='stable').reset_index(drop=True)
+        return optimize_dtypes(normalize_columns(df))
+
+    def get_stats(self) -> Dict:
+        return {'partitions': len(self._fragments), 'brands': len(self.brands), 'version': self.version}
+
+
+class VehicleStore:
+    """데이터셋별 DataFrame을 지연 로드 후 공유"""
+
+    def __init__(self, data_dir: Optional[Path] = None):
+        self.data_dir = Path(data_dir) if data_dir else Path(__file__).parent.parent.parent / "data"
+        self._frames: Dict[str, Optional[pd.DataFrame]] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._partitioned: Dict[str, Optional[PartitionedDataset]] = {}
+        self._lock = threading.Lock()
+
+    def _read(self, name: str) -> Optional[pd.DataFrame]:
+        path = self.data_dir / DATASETS[name]
+        if not path.exists():
+            return None
+        start = time.time()
+        st = path.stat()
+        df = pd.read_csv(path, encoding='utf-8-sig', low_memory=False)
+        df = normalize_columns(df)
+
+        # 원본 엔카 데이터: 등록 연도(YYYYMM → YYYY), 국산/수입 구분
+        if 'year_raw' in df.columns:
+            df['reg_year'] = pd.to_numeric(df['year_raw'], errors='coerce') // 100
+        if name in ('domestic', 'imported'):
+            df['category'] = name
+
+        df = optimize_dtypes(df)
+        self._stats[name] = {
+            'rows': len(df),
+            'memory_mb': round(float(df.memory_usage(deep=True).sum()) / 1024 / 1024, 2),
+            'load_seconds': round(time.time() - start, 3),
+            'version': f"{st.st_mtime_ns:x}-{st.st_size:x}",  # 로드 시점 파일 지문
+        }
+        print(f"✓ 차량 스토어 로드: {DATASETS[name]} {len(df):,}건 "
+              f"({self._stats[name]['memory_mb']}MB, {self._stats[name]['load_seconds']}초)")
+        return df
+
+    def get(self, name: str) -> Optional[pd.DataFrame]:
+        """데이터셋 조회 (최초 1회 로드, 파일이 없거나 실패하면 None)"""
+        if name in self._frames:
+            return self._frames[name]
+        with self._lock:
+            if name not in self._frames:
+                try:
+                    self._frames[name] = self._read(name)
+                except Exception as e:
+                    print(f"⚠️ 차량 스토어 로드 실패 ({DATASETS[name]}): {e}")
+                    self._frames[name] = None
+        return self._frames[name]
+
+    def partitioned(self, name: str) -> Optional[PartitionedDataset]:
+        """브랜드 / 연식 파티션 데이터셋 (pyarrow가 없거나 디렉터리가 없으면 None)"""
+        if name in self._partitioned:
+            return self._partitioned[name]
+        with self._lock:
+            if name not in self._partitioned:
+                root = self.data_dir / PARTITIONED_DATASETS[name]
+                dataset = None
+                if PARQUET_AVAILABLE and root.is_dir():
+                    try:
+                        dataset = PartitionedDataset(root)
+                        print(f"✓ 파티션 데이터셋: {root.name} (브랜드 {len(dataset.brands)}개, "
+                              f"파티션 {dataset.get_stats()['partitions']}개)")
+                    except Exception as e:
+                        print(f"⚠️ 파티션 데이터셋 열기 실패 ({root.name}): {e}")
+                self._partitioned[name] = dataset
+        return self._partitioned[name]
+
+    def reload(self, name: Optional[str] = None):
+        """캐시 무효화 (다음 get() / partitioned()에서 다시 로드)"""
+        with self._lock:
+            if name is None:
+                self._frames.clear()
+                self._partitioned.clear()
+            else:
+                self._frames.pop(name, None)
+                self._partitioned.pop(name, None)
+
+    def version(self, name: str) -> str:
+        """로드된 데이터셋의 파일 지문 (미로드/없음이면 'none') - 응답 캐시 키용"""
+        if self._frames.get(name) is None:
+            return 'none'
+        return self._stats.get(name, {}).get('version', 'none')
+
+    def file_path(self, name: str) -> Path:
+        return self.data_dir / DATASETS[name]
+
+    def get_stats(self) -> Dict:
+        """로드된 데이터셋별 행 수 / 메모리 / 로드 시간"""
+        return {name: dict(stats) for name, stats in self._stats.items() if name in self._frames}
+
+
+# 싱글톤
+_vehicle_store = None
+_vehicle_store_lock = threading.Lock()
+
+
+def get_vehicle_store() -> VehicleStore:
+    global _vehicle_store
+    if _vehicle_store is None:
+        with _vehicle_store_lock:
+            if _vehicle_store is None:
+                _vehicle_store = VehicleStore()
+    return _vehicle_store
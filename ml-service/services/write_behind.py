@@ -0,0 +1,159 @@
+"""
+Write-Behind 큐 (텔레메트리성 쓰기 배치 처리)
+============================================
+- 요청 경로에서는 버퍼에 넣기만 하고 즉시 반환 (디스크 fsync 대기 없음)
+- 백그라운드 스레드가 N ms마다 또는 M건이 모이면 한 트랜잭션으로 일괄 저장
+- 버퍼 상한 초과 시 호출 스레드에서 바로 저장 (데이터 유실 없이 backpressure)
+- 저장 실패(database is locked 등) 시 짧게 재시도, 그래도 실패하면 배치를 버퍼 앞에 되돌려
+  다음 flush에서 다시 저장 (REQUEUE_LIMIT회 연속 실패하거나 버퍼 상한을 넘는 분만 폐기, stats에 집계)
+- 종료 시 flush (close / atexit)
+
+분석 이력, AI 로그처럼 응답에 결과 id가 필요 없는 쓰기에만 사용한다.
+"""
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Tuple
+
+# 배치 주기 / 최대 배치 크기 / 버퍼 상한
+FLUSH_INTERVAL_MS = 200
+BATCH_ROWS = 500
+MAX_BUFFER = 10000
+# 저장 실패 시 즉시 재시도 횟수 / 재시도 간격 / 버퍼 재적재 후 연속 실패 허용 횟수
+WRITE_RETRIES = 2
+RETRY_BACKOFF_MS = 50
+REQUEUE_LIMIT = 5
+
+
+class WriteBehindQueue:
+    """(kind, payload) 항목을 모아 apply_batch(items)로 일괄 저장"""
+
+    def __init__(self, apply_batch: Callable[[List[Tuple[str, Dict]]], None],
+                 interval_ms: int = FLUSH_INTERVAL_MS, batch_rows: int = BATCH_ROWS,
+                 max_buffer: int = MAX_BUFFER, name: str = "write-behind"):
+        self._apply_batch = apply_batch
+        self.interval = interval_ms / 1000
+        self.batch_rows = batch_rows
+        self.max_buffer = max_buffer
+        self._buffer: deque = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # 배치 저장 순서 보장
+        self._closed = False
+        self._failures = 0  # 연속 실패한 flush 횟수
+        self.stats = {'enqueued': 0, 'flushed': 0, 'batches': 0, 'sync_writes': 0,
+                      'errors': 0, 'retries': 0, 'requeued': 0, 'dropped': 0,
+                      'max_buffered': 0, 'last_batch_ms': 0.0}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, kind: str, payload: Dict):
+        """항목 추가 - 버퍼가 가득 차면 현재 스레드에서 바로 저장"""
+        item = (kind, payload)
+        with self._cond:
+            if not self._closed and len(self._buffer) < self.max_buffer:
+                self._buffer.append(item)
+                self.stats['enqueued'] += 1
+                self.stats['max_buffered'] = max(self.stats['max_buffered'], len(self._buffer))
+                if len(self._buffer) >= self.batch_rows:
+                    self._cond.notify()
+                return
+        self.stats['sync_writes'] += 1
+        if not self._write([item]):
+            self._drop([item])
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._buffer and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._buffer:
+                    return
+                # 첫 항목 이후 interval 동안 더 모음 (batch_rows에 도달하면 즉시)
+                deadline = time.monotonic() + self.interval
+                while len(self._buffer) < self.batch_rows and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            if not self.flush() and not self._closed:
+                time.sleep(self.interval)  # 실패 직후 바로 재시도하지 않음
+
+    def flush(self) -> bool:
+        """버퍼에 쌓인 항목 모두 저장 (실패한 배치는 버퍼 앞에 되돌리고 False 반환)"""
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    if not self._buffer:
+                        return True
+                    count = min(len(self._buffer), self.batch_rows)
+                    batch = [self._buffer.popleft() for _ in range(count)]
+                if self._write(batch):
+                    self._failures = 0
+                    continue
+                self._failures += 1
+                if self._failures > REQUEUE_LIMIT:
+                    self._failures = 0
+                    self._drop(batch)
+                else:
+                    self._requeue(batch)
+                return False
+
+    def _write(self, batch: List[Tuple[str, Dict]]) -> bool:
+        """배치 저장 - 실패 시 WRITE_RETRIES회까지 재시도 (트랜잭션은 실패 시 rollback)"""
+        start = time.perf_counter()
+        ok = False
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                self._apply_batch(batch)
+                self.stats['flushed'] += len(batch)
+                self.stats['batches'] += 1
+                ok = True
+                break
+            except Exception as e:
+                self.stats['errors'] += 1
+                if attempt < WRITE_RETRIES:
+                    self.stats['retries'] += 1
+                    time.sleep(RETRY_BACKOFF_MS / 1000 * (attempt + 1))
+                else:
+                    print(f"⚠️ write-behind 저장 실패 ({len(batch)}건): {e}")
+        self.stats['last_batch_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return ok
+
+    def _requeue(self, batch: List[Tuple[str, Dict]]):
+        """실패한 배치를 버퍼 앞에 되돌림 (순서 유지, 버퍼 상한 초과분은 폐기)"""
+        with self._cond:
+            room = max(self.max_buffer - len(self._buffer), 0)
+            keep, overflow = batch[:room], batch[room:]
+            self._buffer.extendleft(reversed(keep))
+            self.stats['requeued'] += len(keep)
+        if overflow:
+            self._drop(overflow)
+
+    def _drop(self, items: List[Tuple[str, Dict]]):
+        self.stats['dropped'] += len(items)
+        print(f"❌ write-behind 항목 폐기: {len(items)}건 (누적 {self.stats['dropped']}건)")
+
+    def close(self):
+        """남은 항목 flush 후 백그라운드 스레드 종료"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=10)
+        for _ in range(REQUEUE_LIMIT + 1):
+            if self.flush():
+                return
+        with self._cond:
+            remaining = list(self._buffer)
+            self._buffer.clear()
+        if remaining:
+            self._drop(remaining)
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            buffered = len(self._buffer)
+        return {**self.stats, 'buffered': buffered, 'max_buffer': self.max_buffer,
+                'interval_ms': int(self.interval * 1000), 'batch_rows': self.batch_rows}
@@ -3,6 +3,7 @@ ML 서비스 실행 스크립트
 """
 import sys
 import os
+import asyncio
 import logging
 import time
 from functools import lru_cache
@@ -21,52 +22,13 @@ logger = get_logger('server')
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Literal, Dict, Any
 from urllib.parse import unquote
-from io import BytesIO
-
-# 이미지 압축용 (선택적)
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-    logger.warning("PIL not available - images will be served without compression")
-
-# ========== 간단한 TTL 캐시 ==========
-class SimpleCache:
-    """TTL 기반 간단한 캐시"""
-    def __init__(self, ttl_seconds: int = 60):
-        self._cache: Dict[str, Any] = {}
-        self._timestamps: Dict[str, float] = {}
-        self._ttl = ttl_seconds
-    
-    def get(self, key: str) -> Any:
-        if key in self._cache:
-            if time.time() - self._timestamps[key] < self._ttl:
-                return self._cache[key]
-            else:
-                del self._cache[key]
-                del self._timestamps[key]
-        return None
-    
-    def set(self, key: str, value: Any):
-        self._cache[key] = value
-        self._timestamps[key] = time.time()
-    
-    def clear(self):
-        self._cache.clear()
-        self._timestamps.clear()
-
-# 차량 목록 캐시 (60초 TTL)
-vehicle_cache = SimpleCache(ttl_seconds=60)
-# 대시보드 통계 캐시 (30초 TTL)
-stats_cache = SimpleCache(ttl_seconds=30)
 
 # 서비스 임포트
-from services.prediction_v12 import PredictionServiceV12  # V12 (FuelType 포함)
+from services.prediction_v12 import get_prediction_service  # V12 (FuelType 포함, 공용 모델 레지스트리)
 from services.timing import TimingService
 from services.groq_service import GroqService
 from services.recommendation_service import get_recommendation_service  # 신규: 추천 서비스
@@ -75,6 +37,14 @@ from services.admin_service import AdminService  # 관리자 대시보드
 from services.history_service import get_history_service  # 분석 이력 및 AI 로그
 from services.database_service import get_database_service  # 영구 DB 저장소
 from services.car_image_service import CarImageService  # 차량 이미지
+from services.dispatch import get_dispatcher, DispatchOverloaded  # 동기 작업 실행 풀
+from services.image_cache import get_image_cache, etag_matches, PIL_AVAILABLE  # 이미지 리사이즈 캐시
+from services.image_manifest import get_image_manifest  # 차량 이미지 파일 목록
+from services.response_cache import LRUCache, get_response_cache  # 응답 캐시 (버전 스탬프 + single-flight)
+from services.coalesce import Coalescer  # 동일 예측/타이밍 요청 합치기
+
+if not PIL_AVAILABLE:
+    logger.warning("PIL not available - images will be served without compression")
 
 app = FastAPI(
     title="Car-Sentix API",
@@ -96,7 +66,7 @@ app.add_middleware(
 )
 
 # 서비스 초기화
-prediction_service = PredictionServiceV12()
+prediction_service = get_prediction_service()  # 추천 서비스와 같은 인스턴스/모델 공유
 timing_service = TimingService()
 groq_service = GroqService()
 recommendation_service = get_recommendation_service()  # 신규: DB 기반 추천
@@ -104,9 +74,37 @@ similar_service = get_similar_service()
 admin_service = AdminService()  # 관리자 대시보드
 history_service = get_history_service()  # 분석 이력 및 AI 로그
 db_service = get_database_service()  # 영구 DB 저장소
+dispatcher = get_dispatcher()  # cpu / io / db 워크로드별 스레드 풀
+image_cache = get_image_cache()  # 리사이즈 이미지 메모리 LRU + 디스크 캐시
+image_manifest = get_image_manifest()  # 차량 이미지 이름 → 파일 (시작 시 스캔 + 폴더 변경 폴링)
+response_cache = get_response_cache()  # 추천/유사 차량 응답 캐시
+
+# 같은 인자의 예측/타이밍 요청은 한 번만 실행 (실행 중 합치기 + 짧은 TTL 보관)
+predict_call = Coalescer('predict', prediction_service.predict, workload='cpu')
+timing_call = Coalescer('timing', timing_service.analyze_timing, workload='io')
+
+# 모델 교체 시 보관 중인 예측 결과 폐기 (가치 평가 인덱스는 라이브 모델 지문으로 자동 재빌드)
+model_registry = prediction_service.registry
+model_registry.add_listener(lambda segment, bundle: predict_call.clear())
+
+# 차량 목록 캐시 (60초 TTL, 최대 512개)
+vehicle_cache = LRUCache(max_entries=512, ttl_seconds=60)
+# 대시보드 통계 캐시 (30초 TTL)
+stats_cache = LRUCache(max_entries=64, ttl_seconds=30)
 
 logger.info("All services initialized successfully")
 
+@app.on_event("shutdown")
+def flush_pending_writes():
+    """종료 시 write-behind 버퍼(분석 이력 / AI 로그) 저장"""
+    db_service.close()
+
+@app.exception_handler(DispatchOverloaded)
+async def dispatch_overloaded_handler(request: Request, exc: DispatchOverloaded):
+    """실행 풀 대기열 초과 → 503 (클라이언트 재시도)"""
+    logger.warning(f"Dispatch overloaded: {exc}")
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 # ========== 스키마 ==========
 
 class PredictRequest(BaseModel):
@@ -121,6 +119,10 @@ class PredictRequest(BaseModel):
     has_smart_key: Optional[bool] = None
     has_rear_camera: Optional[bool] = None
 
+class PredictBatchRequest(BaseModel):
+    """배치 예측 요청 (최대 500건)"""
+    items: List[PredictRequest] = Field(..., min_length=1, max_length=500)
+
 class TimingRequest(BaseModel):
     model: str
 
@@ -175,7 +177,7 @@ async def health():
 
 @app.get("/api/health/detailed")
 async def health_detailed():
-    """상세 헬스체크 - 모든 서비스 상태 확인"""
+    """상세 헬스체크 - 모든 서비스 상태 확인 (점검 호출도 dispatcher 풀에서 실행)"""
     import time
     start = time.time()
     
@@ -189,15 +191,24 @@ async def health_detailed():
     
     # 예측 서비스 체크
     try:
-        prediction_service.predict("현대", "그랜저", 2023, 50000)
-        services["prediction"] = {"status": "healthy", "message": "OK"}
+        await dispatcher.run('cpu', prediction_service.predict, "현대", "그랜저", 2023, 50000)
+        services["prediction"] = {
+            "status": "healthy",
+            "message": "OK",
+            "model_resolver": prediction_service.get_resolver_stats(),
+            "models": model_registry.get_stats()
+        }
     except Exception as e:
         services["prediction"] = {"status": "unhealthy", "message": str(e)[:50]}
     
     # 타이밍 서비스 체크
     try:
-        timing_service.analyze_timing("그랜저")
-        services["timing"] = {"status": "healthy", "message": "OK"}
+        await dispatcher.run('io', timing_service.analyze_timing, "그랜저")
+        services["timing"] = {
+            "status": "healthy",
+            "message": "OK",
+            "snapshot_cache": timing_service.get_cache_stats()
+        }
     except Exception as e:
         services["timing"] = {"status": "unhealthy", "message": str(e)[:50]}
     
@@ -209,14 +220,18 @@ async def health_detailed():
     
     # DB 체크
     try:
-        db_service.get_dashboard_stats()
-        services["database"] = {"status": "healthy", "message": "OK"}
+        await dispatcher.run('io', db_service.get_dashboard_stats)
+        services["database"] = {
+            "status": "healthy",
+            "message": "OK",
+            "connections": db_service.get_pool_stats()
+        }
     except Exception as e:
         services["database"] = {"status": "unhealthy", "message": str(e)[:50]}
     
     # 추천 서비스 체크
     try:
-        recommendation_service.get_popular_models("domestic", 1)
+        await dispatcher.run('cpu', recommendation_service.get_popular_models, "domestic", 1)
         services["recommendation"] = {"status": "healthy", "message": "OK"}
     except Exception as e:
         services["recommendation"] = {"status": "unhealthy", "message": str(e)[:50]}
@@ -228,124 +243,68 @@ async def health_detailed():
         "status": "healthy" if all_healthy else "degraded",
         "version": "2.0.0",
         "response_time_ms": round((time.time() - start) * 1000, 2),
-        "services": services
+        "services": services,
+        "dispatch": dispatcher.get_stats(),
+        "coalescing": {"predict": predict_call.get_stats(), "timing": timing_call.get_stats()},
+        "image_cache": image_cache.get_stats(),
+        "image_manifest": image_manifest.get_stats(),
+        "response_cache": response_cache.get_stats()
     }
 
-# ========== 차량 이미지 API ==========
-
-# 이미지 캐시 (압축된 이미지 저장)
-_image_cache: Dict[str, bytes] = {}
+@app.get("/api/health/dispatch")
+async def health_dispatch():
+    """실행 풀 상태 - 풀별 대기열 길이 / 대기 시간 / 실행 시간 (풀 크기 조정용) + 요청 합치기 비율"""
+    return {
+        "pools": dispatcher.get_stats(),
+        "coalescing": {"predict": predict_call.get_stats(), "timing": timing_call.get_stats()},
+    }
 
-def compress_image(file_path: str, max_size: int = 400, quality: int = 85) -> bytes:
-    """이미지를 압축하여 반환 (5MB → ~50KB)"""
-    cache_key = f"{file_path}:{max_size}:{quality}"
-    
-    # 캐시 확인
-    if cache_key in _image_cache:
-        return _image_cache[cache_key]
-    
-    if PIL_AVAILABLE:
-        try:
-            with Image.open(file_path) as img:
-                # RGBA to RGB (PNG → JPEG 변환 시 필요)
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # 크기 조절
-                img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-                
-                # JPEG로 압축
-                buffer = BytesIO()
-                img.save(buffer, format='JPEG', quality=quality, optimize=True)
-                compressed = buffer.getvalue()
-                
-                # 캐시 저장 (최대 100개)
-                if len(_image_cache) < 100:
-                    _image_cache[cache_key] = compressed
-                
-                logger.info(f"Image compressed: {file_path} -> {len(compressed)/1024:.1f}KB")
-                return compressed
-        except Exception as e:
-            logger.error(f"Image compression failed: {e}")
-    
-    # PIL 없거나 실패시 원본 반환
-    with open(file_path, "rb") as f:
-        return f.read()
+# ========== 차량 이미지 API ==========
 
 @app.get("/car-images/{filename:path}")
-async def get_car_image(filename: str, size: int = 400, quality: int = 85):
+async def get_car_image(filename: str, request: Request, size: int = 400, quality: int = 85):
     """
     차량 이미지 제공 (압축 지원) - 국산차 + 외제차
     - size: 최대 크기 (기본 400px)
     - quality: JPEG 품질 (기본 85)
+    - ETag / If-None-Match 지원 (변경 없으면 304)
     """
-    # URL 디코딩 (한글 파일명 지원)
+    # URL 디코딩 (한글 파일명 지원) → 매니페스트 조회 (확장자 유무 무관)
     decoded_filename = unquote(filename)
-    
-    # 확장자 제거 (나중에 여러 확장자 시도)
-    base_name = decoded_filename
-    if decoded_filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-        base_name = os.path.splitext(decoded_filename)[0]
-    
-    # 검색할 폴더와 확장자 조합
-    search_dirs = [CAR_IMAGES_DIR, CAR_IMAGES_IMPORTED_DIR]
-    extensions = ['.png', '.jpg', '.jpeg']
-    
-    file_path = None
-    for search_dir in search_dirs:
-        for ext in extensions:
-            candidate = os.path.join(search_dir, base_name + ext)
-            if os.path.exists(candidate):
-                file_path = candidate
-                break
-        if file_path:
-            break
-
-    if file_path:
-        # 이미지 압축 후 반환
-        image_data = compress_image(file_path, max_size=size, quality=quality)
-        
-        # JPEG로 변환됨
-        media_type = "image/jpeg" if PIL_AVAILABLE else "image/png"
-        
-        return Response(
-            content=image_data,
-            media_type=media_type,
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, OPTIONS",
-                "Access-Control-Allow-Headers": "*",
-                "Cache-Control": "public, max-age=604800",  # 7일 캐시
-                "Content-Length": str(len(image_data)),
-            }
-        )
+    entry = image_manifest.resolve(decoded_filename)
+    if entry is None:
+        logger.warning(f"Image not found: {decoded_filename} (searched in domestic & imported)")
+        raise HTTPException(status_code=404, detail=f"이미지를 찾을 수 없습니다: {decoded_filename}")
+
+    headers = {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Methods": "GET, OPTIONS",
+        "Access-Control-Allow-Headers": "*",
+        "Cache-Control": "public, max-age=604800",  # 7일 캐시
+    }
+    etag = image_cache.etag(entry.path, size, quality)
+    if etag is None:
+        # 매니페스트 갱신 전에 삭제된 파일
+        raise HTTPException(status_code=404, detail=f"이미지를 찾을 수 없습니다: {decoded_filename}")
+    headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # 메모리 캐시 적중 시 바로 응답, 아니면 디스크 조회/압축을 cpu 풀에서 실행
+    image = image_cache.peek(entry.path, size, quality)
+    if image is None:
+        image = await dispatcher.run('cpu', image_cache.get, entry.path, size, quality)
 
-    # 파일이 없으면 404 (로그 추가)
-    logger.warning(f"Image not found: {base_name} (searched in domestic & imported)")
-    raise HTTPException(status_code=404, detail=f"이미지를 찾을 수 없습니다: {base_name}")
+    return Response(content=image.data, media_type=image.media_type, headers=headers)
 
 @app.get("/api/car-images/list")
 async def list_car_images():
     """사용 가능한 차량 이미지 목록 (국산차 + 외제차)"""
-    images = []
-    
-    # 국산차 이미지
-    if os.path.exists(CAR_IMAGES_DIR):
-        for f in os.listdir(CAR_IMAGES_DIR):
-            if f.lower().endswith(('.png', '.jpg', '.jpeg')):
-                images.append({"name": os.path.splitext(f)[0], "category": "domestic"})
-    
-    # 외제차 이미지
-    if os.path.exists(CAR_IMAGES_IMPORTED_DIR):
-        for f in os.listdir(CAR_IMAGES_IMPORTED_DIR):
-            if f.lower().endswith(('.png', '.jpg', '.jpeg')):
-                images.append({"name": os.path.splitext(f)[0], "category": "imported"})
+    images = [
+        {"name": entry.name, "category": category}
+        for entry in image_manifest.entries()
+        for category in entry.categories
+    ]
     
     return {
         "success": True, 
@@ -365,7 +324,7 @@ async def predict(request: PredictRequest):
         'has_smart_key': request.has_smart_key or False,
         'has_rear_camera': request.has_rear_camera or False,
     }
-    result = prediction_service.predict(
+    result = await predict_call(
         brand=request.brand,
         model_name=request.model,
         year=request.year,
@@ -379,9 +338,48 @@ async def predict(request: PredictRequest):
         "confidence": float(result.confidence)
     }
 
+@app.post("/api/predict/batch")
+async def predict_batch(request: PredictBatchRequest):
+    """배치 예측 - 개별 실패는 전체를 중단하지 않고 해당 항목에 error로 반환"""
+    vehicles = [
+        {
+            'brand': item.brand,
+            'model_name': item.model,
+            'year': item.year,
+            'mileage': item.mileage,
+            'fuel': item.fuel,
+            'options': {
+                'has_sunroof': item.has_sunroof or False,
+                'has_navigation': item.has_navigation or False,
+                'has_leather_seat': item.has_leather_seat or False,
+                'has_smart_key': item.has_smart_key or False,
+                'has_rear_camera': item.has_rear_camera or False,
+            },
+        }
+        for item in request.items
+    ]
+    results = []
+    for item in await dispatcher.run('cpu', prediction_service.predict_batch, vehicles):
+        if item.result is None:
+            results.append({"index": item.index, "success": False, "error": item.error})
+            continue
+        result = item.result
+        results.append({
+            "index": item.index,
+            "success": True,
+            "predicted_price": float(result.predicted_price),
+            "price_range": [float(result.price_range[0]), float(result.price_range[1])],
+            "confidence": float(result.confidence)
+        })
+    return {
+        "count": len(results),
+        "success_count": sum(1 for r in results if r["success"]),
+        "results": results
+    }
+
 @app.post("/api/timing")
 async def timing(request: TimingRequest):
-    result = timing_service.analyze_timing(request.model)
+    result = await timing_call(request.model)
     return result
 
 @app.post("/api/smart-analysis")
@@ -404,21 +402,21 @@ async def smart_analysis(request: SmartAnalysisRequest, user_id: str = "guest"):
     accident_free = request.is_accident_free if request.is_accident_free is not None else True
     logger.info(f"smart-analysis: model={request.model}, fuel={request.fuel}, grade={grade}, accident_free={accident_free}")
 
-    # 가격 예측 (옵션 + 연료 + 성능점검 포함)
-    pred = prediction_service.predict(
-        brand=request.brand,
-        model_name=request.model,
-        year=request.year,
-        mileage=request.mileage,
-        options=options,
-        accident_free=accident_free,
-        grade=grade,  # 성능점검 등급 전달
-        fuel=request.fuel
+    # 가격 예측 (옵션 + 연료 + 성능점검 포함) + 타이밍 - 서로 독립이므로 동시 실행
+    pred, timing = await asyncio.gather(
+        predict_call(
+            brand=request.brand,
+            model_name=request.model,
+            year=request.year,
+            mileage=request.mileage,
+            options=options,
+            accident_free=accident_free,
+            grade=grade,  # 성능점검 등급 전달
+            fuel=request.fuel
+        ),
+        timing_call(request.model),
     )
 
-    # 타이밍
-    timing = timing_service.analyze_timing(request.model)
-
     # Groq AI (네고 대본 생성만 사용)
     groq = None
     if groq_service.is_available() and request.sale_price:
@@ -427,7 +425,8 @@ async def smart_analysis(request: SmartAnalysisRequest, user_id: str = "guest"):
 
         groq = {}
         try:
-            groq['negotiation'] = groq_service.generate_negotiation_script(vehicle, prediction, [])
+            groq['negotiation'] = await dispatcher.run(
+                'io', groq_service.generate_negotiation_script, vehicle, prediction, [])
         except: pass
 
     # 분석 이력 저장 (admin dashboard 통계용)
@@ -443,14 +442,14 @@ async def smart_analysis(request: SmartAnalysisRequest, user_id: str = "guest"):
         'predicted_price': float(pred.predicted_price),
     })
 
-    # 영구 DB에 분석 결과 저장 (통계용)
+    # 영구 DB에 분석 결과 저장 (통계용, write-behind)
     signal_value = None
     if groq and isinstance(groq, dict) and groq.get('signal'):
         signal_data = groq.get('signal')
         if isinstance(signal_data, dict):
             signal_value = signal_data.get('signal')
 
-    db_service.save_analysis({
+    db_service.queue_analysis({
         'user_id': user_id,
         'brand': request.brand,
         'model': request.model,
@@ -479,47 +478,77 @@ async def smart_analysis(request: SmartAnalysisRequest, user_id: str = "guest"):
         "groq_analysis": groq
     }
 
+def cached_json(body: bytes) -> Response:
+    """응답 캐시에 저장된 JSON 바이트 그대로 응답"""
+    return Response(content=body, media_type="application/json")
+
 @app.post("/api/similar")
 async def similar(request: SimilarRequest):
-    return similar_service.get_similar_distribution(
-        brand=request.brand,
-        model=request.model,
-        year=request.year,
-        mileage=request.mileage,
-        predicted_price=request.predicted_price
+    params = {
+        "brand": request.brand,
+        "model": request.model,
+        "year": request.year,
+        "mileage": request.mileage,
+        "predicted_price": request.predicted_price,
+    }
+    body = await response_cache.get_or_compute(
+        "similar", similar_service.data_version, params,
+        lambda: dispatcher.run('cpu', similar_service.get_similar_distribution, **params)
     )
+    return cached_json(body)
 
 @app.get("/api/popular")
 async def popular(category: str = "all", limit: int = 5):
     """엔카 데이터 기반 인기 모델"""
-    return {"models": recommendation_service.get_popular_models(category, limit)}
+    async def compute():
+        return {"models": await dispatcher.run('cpu', recommendation_service.get_popular_models, category, limit)}
+    body = await response_cache.get_or_compute(
+        "popular", recommendation_service.data_version(), {"category": category, "limit": limit}, compute)
+    return cached_json(body)
 
 @app.get("/api/trending")
 async def trending(days: int = 7, limit: int = 10):
     """최근 N일간 인기 검색 모델"""
-    return {"trending": recommendation_service.get_trending_models(days, limit)}
+    return {"trending": await dispatcher.run('io', recommendation_service.get_trending_models, days, limit)}
 
 @app.get("/api/recommendations")
 async def recommendations(user_id: str = "guest", category: str = "all",
                           budget_min: int = None, budget_max: int = None, limit: int = 10):
-    """예측 가격 기반 추천 차량"""
-    return {
-        "recommendations": recommendation_service.get_recommended_vehicles(
-            user_id=user_id, category=category,
-            budget_min=budget_min, budget_max=budget_max, limit=limit
-        )
+    """예측 가격 기반 추천 차량 (사용자 검색 이력이 바뀌면 캐시 키도 바뀜)"""
+    params = {
+        "user_id": user_id, "category": category,
+        "budget_min": budget_min, "budget_max": budget_max, "limit": limit,
     }
+    async def compute():
+        return {
+            "recommendations": await dispatcher.run(
+                'cpu', recommendation_service.get_recommended_vehicles, **params
+            )
+        }
+    history = await dispatcher.run('io', recommendation_service.get_history_stamp, user_id) if user_id else ""
+    body = await response_cache.get_or_compute(
+        "recommendations", recommendation_service.data_version(), {**params, "history": history}, compute)
+    return cached_json(body)
 
 @app.get("/api/good-deals")
 async def good_deals(category: str = "all", limit: int = 10):
     """가성비 좋은 차량 (예측가 > 실제가)"""
-    return {"deals": recommendation_service.get_good_deals(category, limit)}
+    async def compute():
+        return {"deals": await dispatcher.run('cpu', recommendation_service.get_good_deals, category, limit)}
+    body = await response_cache.get_or_compute(
+        "good-deals", recommendation_service.data_version(), {"category": category, "limit": limit}, compute)
+    return cached_json(body)
 
 @app.get("/api/model-deals")
 async def model_deals(brand: str, model: str, limit: int = 10):
     """특정 모델의 가성비 좋은 매물"""
-    deals = recommendation_service.get_model_deals(brand, model, limit)
-    return {"brand": brand, "model": model, "deals": deals}
+    async def compute():
+        deals = await dispatcher.run('cpu', recommendation_service.get_model_deals, brand, model, limit)
+        return {"brand": brand, "model": model, "deals": deals}
+    body = await response_cache.get_or_compute(
+        "model-deals", recommendation_service.data_version(),
+        {"brand": brand, "model": model, "limit": limit}, compute)
+    return cached_json(body)
 
 @app.post("/api/analyze-deal")
 async def analyze_deal(request: Request, user_id: str = "guest"):
@@ -547,13 +576,16 @@ async def analyze_deal(request: Request, user_id: str = "guest"):
     # 예측가가 없으면 직접 예측
     if predicted_price == 0:
         try:
-            result = prediction_service.predict(brand, model, year, mileage, fuel=fuel)
+            result = await predict_call(brand, model, year, mileage, fuel=fuel)
             predicted_price = int(result.predicted_price)
+        except DispatchOverloaded:
+            raise
         except:
             predicted_price = actual_price  # 예측 실패 시 실제가 사용
 
     # 규칙 기반 분석 (recommendation_service)
-    analysis = recommendation_service.analyze_deal(
+    analysis = await dispatcher.run(
+        'cpu', recommendation_service.analyze_deal,
         brand=brand,
         model=model,
         year=year,
@@ -564,7 +596,7 @@ async def analyze_deal(request: Request, user_id: str = "guest"):
     )
     
     # 타이밍 분석 (규칙 기반 - timing_service)
-    timing_result = timing_service.analyze_timing(model)
+    timing_result = await timing_call(model)
     
     # 규칙 기반 시그널 생성
     price_gap = actual_price - predicted_price
@@ -592,7 +624,7 @@ async def analyze_deal(request: Request, user_id: str = "guest"):
     
     # 분석 이력 저장 (대시보드 통계용)
     fraud_risk = analysis.get('fraud_risk', {})
-    db_service.save_analysis({
+    db_service.queue_analysis({
         'user_id': user_id,
         'brand': brand,
         'model': model,
@@ -615,7 +647,7 @@ async def analyze_deal(request: Request, user_id: str = "guest"):
     })
     
     # AI 로그 저장 (규칙 기반)
-    db_service.save_ai_log("signal", {
+    db_service.queue_ai_log("signal", {
         "user_id": user_id,
         "car_info": f"{brand} {model} {year}년",
         "request": {
@@ -631,7 +663,7 @@ async def analyze_deal(request: Request, user_id: str = "guest"):
         "ai_model": "Rule-based"
     })
     
-    db_service.save_ai_log("fraud_detection", {
+    db_service.queue_ai_log("fraud_detection", {
         "user_id": user_id,
         "car_info": f"{brand} {model} {year}년",
         "request": {
@@ -826,7 +858,8 @@ async def generate_negotiation(request: NegotiationRequest):
         }
         
         # Groq 서비스 호출
-        result = groq_service.generate_negotiation_script(
+        result = await dispatcher.run(
+            'io', groq_service.generate_negotiation_script,
             vehicle_data=vehicle_data,
             prediction_data=prediction_data,
             issues=request.checkpoints,
@@ -909,9 +942,11 @@ async def generate_negotiation(request: NegotiationRequest):
         )
 
         # DB 영구 저장
-        db_service.save_ai_log("negotiation", log_data)
+        db_service.queue_ai_log("negotiation", log_data)
 
         return response
+    except DispatchOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"네고 대본 생성 실패: {str(e)}")
 
@@ -1106,6 +1141,51 @@ async def admin_login(request: AdminLoginRequest):
         "message": "이메일 또는 비밀번호가 올바르지 않습니다"
     }
 
+# ========== 모델 롤아웃 (재시작 없는 버전 교체) ==========
+
+class ModelStageRequest(BaseModel):
+    version: str = Field(..., description="모델 버전 (예: V12)")
+    mode: Literal['swap', 'shadow'] = 'swap'
+
+@app.get("/api/admin/models", tags=["Admin"])
+async def get_models():
+    """라이브/이전/섀도 모델, 디스크의 버전 목록, 롤아웃 진행 상태, 섀도 비교 통계"""
+    return await dispatcher.run('io', model_registry.get_stats)
+
+@app.post("/api/admin/models/{segment}/stage", tags=["Admin"])
+async def stage_model(segment: Literal['domestic', 'imported'], request: ModelStageRequest):
+    """
+    백그라운드 로드 → 워밍업 → swap(라이브 교체) 또는 shadow(비교 기록) - 즉시 반환, 진행 상태는 GET /api/admin/models
+    """
+    try:
+        status = await dispatcher.run('io', model_registry.stage, segment, request.version, request.mode)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"success": True, "segment": segment, "rollout": status}
+
+@app.post("/api/admin/models/{segment}/promote", tags=["Admin"])
+async def promote_model(segment: Literal['domestic', 'imported']):
+    """섀도 후보를 라이브로 교체"""
+    try:
+        return {"success": True, "segment": segment, "live": model_registry.promote(segment)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.post("/api/admin/models/{segment}/rollback", tags=["Admin"])
+async def rollback_model(segment: Literal['domestic', 'imported']):
+    """직전 라이브 모델로 되돌림"""
+    try:
+        return {"success": True, "segment": segment, "live": model_registry.rollback(segment)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.delete("/api/admin/models/{segment}/shadow", tags=["Admin"])
+async def clear_shadow_model(segment: Literal['domestic', 'imported']):
+    """섀도 비교 중단"""
+    return {"success": model_registry.clear_shadow(segment), "segment": segment}
+
 @app.get("/api/admin/dashboard-stats", tags=["Admin"])
 async def get_dashboard_stats():
     """대시보드 통계 (오늘 조회수, 전체 조회수, 인기 모델) - DB 기반"""
@@ -1126,6 +1206,11 @@ async def get_daily_requests(days: int = 7):
 
     return db_data
 
+@app.get("/api/admin/hourly-stats", tags=["Admin"])
+async def get_hourly_stats(hours: int = 24, kind: Literal["analysis", "view", "ai_log"] = "analysis"):
+    """시간대별 건수 (롤업 테이블, UTC 기준)"""
+    return db_service.get_hourly_counts(min(max(hours, 1), 24 * 14), kind)
+
 
 @app.get("/api/admin/vehicle-stats", tags=["Admin"])
 async def get_vehicle_stats():
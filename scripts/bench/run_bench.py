@@ -0,0 +1,362 @@
+"""
+ML 서비스 핫패스 벤치마크
+=========================
+합성 매물 데이터셋(기본 10k / 100k / 1M 행)으로 주요 경로의 지연 시간을 측정해 JSON으로 출력
+- 예측: PredictionServiceV12.predict (단건) / predict_batch (1,000건)
+- 유사 차량 분포: SimilarVehicleService.get_similar_distribution
+- 추천: RecommendationService.get_recommended_vehicles / get_model_deals
+- 관리자: AdminService.get_vehicles 페이지네이션 (첫 페이지 / 깊은 페이지 / 필터)
+- 이미지: compress_image (1600x1200 RGBA PNG)
+- SQLite 쓰기: save_analysis / queue_analysis+flush / save_ai_log / add_vehicle_view / add_favorite /
+  add_search_history
+
+외부 수집기(한국은행/네이버/Groq)는 호출하지 않도록 막고, 데이터·DB·캐시 파일은 모두 작업 폴더에
+만든다 (저장소의 data/ 는 건드리지 않음). 같은 시드면 같은 데이터셋이 만들어진다.
+
+사용:
+    python scripts/bench/run_bench.py --sizes 10k,100k --repeat 50 --output bench.json
+    python scripts/bench/run_bench.py --sizes 1m --only similar,recommend
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT / 'ml-service'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import pandas as pd
+
+from synthetic import ensure_dataset
+
+SCHEMA_VERSION = 1
+DEFAULT_SIZES = '10k,100k,1m'
+GROUPS = ('predict', 'similar', 'recommend', 'admin', 'image', 'sqlite')
+
+# 벤치 중 외부 API 호출 방지 (키가 없으면 수집기는 기본값으로 대체됨)
+EXTERNAL_ENV_KEYS = ('GROQ_API_KEY', 'BOK_API_KEY', 'NAVER_CLIENT_ID', 'NAVER_CLIENT_SECRET')
+
+# 측정 대상 차량 (합성 데이터에도 존재하는 모델명)
+SAMPLE_VEHICLES = [
+    ('현대', '그랜저', 2021, 40000, '가솔린'),
+    ('기아', '쏘렌토', 2020, 55000, '디젤'),
+    ('BMW', '5시리즈', 2019, 60000, '가솔린'),
+    ('벤츠', 'E-클래스', 2020, 45000, '가솔린'),
+]
+
+
+def parse_size(text: str) -> int:
+    """'10k' / '1m' / '25000' → 행 수"""
+    text = text.strip().lower().replace('_', '')
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+
+def max_rss_mb() -> float:
+    """프로세스 최대 RSS (MB) - Linux는 KB, macOS는 바이트 단위"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+class Bench:
+    """측정 결과 수집기"""
+
+    def __init__(self, repeat: int, warmup: int = 2, groups: Optional[List[str]] = None):
+        self.repeat = repeat
+        self.warmup = warmup
+        self.groups = set(groups or GROUPS)
+        self.results: List[Dict] = []
+
+    def enabled(self, group: str) -> bool:
+        return group in self.groups
+
+    def measure(self, name: str, fn: Callable, size: Optional[int] = None, params: Optional[Dict] = None,
+                repeat: Optional[int] = None, items: int = 1) -> Dict:
+        """
+        fn()을 warmup회 실행 후 repeat회 측정
+
+        Args:
+            items: 호출 1회가 처리하는 건수 (배치 예측 등) - items_per_sec 계산용
+        """
+        repeat = repeat or self.repeat
+        for _ in range(self.warmup):
+            fn()
+        gc.collect()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        mean = statistics.fmean(timings)
+        result = {
+            'name': name,
+            'size': size,
+            'params': params or {},
+            'n': repeat,
+            'mean_ms': round(mean, 4),
+            'p50_ms': round(_percentile(timings, 50), 4),
+            'p95_ms': round(_percentile(timings, 95), 4),
+            'min_ms': round(timings[0], 4),
+            'max_ms': round(timings[-1], 4),
+            'ops_per_sec': round(1000 / mean, 2) if mean > 0 else None,
+        }
+        if items > 1:
+            result['items_per_sec'] = round(items * 1000 / mean, 1) if mean > 0 else None
+        self.results.append(result)
+        print(f"  {name:<40} {'' if size is None else size:>8} "
+              f"p50 {result['p50_ms']:>10.3f}ms  p95 {result['p95_ms']:>10.3f}ms", file=sys.stderr)
+        return result
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """정렬된 값의 선형 보간 백분위수"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * pct / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def stub_external_collectors(workdir: Path):
+    """거시경제/트렌드/신차일정 수집기를 기본값 반환으로 교체, 스냅샷 파일은 작업 폴더로"""
+    for key in EXTERNAL_ENV_KEYS:
+        os.environ.pop(key, None)
+    try:
+        from services import data_collectors
+    except ImportError as e:
+        print(f"[WARN] 수집기 모듈 로드 실패 ({e}) - 외부 호출 경로 없음", file=sys.stderr)
+        return
+    data_collectors.SNAPSHOT_PATH = workdir / 'timing_snapshot.json'
+    data_collectors._fetch_macro = lambda: (dict(data_collectors.DEFAULT_MACRO), True)
+    data_collectors._fetch_trend = lambda car_model: (dict(data_collectors.DEFAULT_TREND), True)
+    data_collectors._fetch_schedule = lambda car_model: (dict(data_collectors.DEFAULT_SCHEDULE), True)
+
+
+# ========== 데이터셋 무관 ==========
+
+def bench_predict(bench: Bench, prediction_service):
+    brand, model, year, mileage, fuel = SAMPLE_VEHICLES[0]
+    bench.measure('predict.single', lambda: prediction_service.predict(brand, model, year, mileage, fuel=fuel),
+                  params={'brand': brand, 'model': model})
+
+    rng = np.random.default_rng(0)
+    items = []
+    for i in range(1000):
+        b, m, y, mi, f = SAMPLE_VEHICLES[i % len(SAMPLE_VEHICLES)]
+        items.append({'brand': b, 'model': m, 'year': int(y - rng.integers(0, 5)),
+                      'mileage': int(mi + rng.integers(0, 30000)), 'fuel': f})
+    bench.measure('predict.batch', lambda: prediction_service.predict_batch(items),
+                  params={'batch': len(items)}, repeat=max(3, bench.repeat // 10), items=len(items))
+
+
+def bench_image(bench: Bench, workdir: Path):
+    from services.image_cache import compress_image, PIL_AVAILABLE
+    if not PIL_AVAILABLE:
+        print("⚠️ PIL 없음 - 이미지 압축 벤치 생략", file=sys.stderr)
+        return
+    from PIL import Image
+
+    path = workdir / 'bench_image.png'
+    if not path.exists():
+        rng = np.random.default_rng(0)
+        pixels = rng.integers(0, 256, (1200, 1600, 4), dtype=np.uint8)
+        pixels[..., 3] = 255
+        Image.fromarray(pixels, 'RGBA').save(path)
+    bench.measure('image.compress', lambda: compress_image(str(path)),
+                  params={'width': 1600, 'height': 1200, 'mode': 'RGBA'})
+
+
+def bench_sqlite(bench: Bench, workdir: Path, recommendation_service):
+    from services.database_service import DatabaseService
+
+    db = DatabaseService(db_path=str(workdir / 'bench_car_sentix.db'))
+    analysis = {'user_id': 'bench', 'brand': '현대', 'model': '그랜저', 'year': 2021, 'mileage': 40000,
+                'fuel': '가솔린', 'predicted_price': 3200, 'actual_price': 3000, 'confidence': 85,
+                'model_name': 'domestic_v11'}
+    counter = iter(range(10 ** 9))
+
+    bench.measure('sqlite.save_analysis', lambda: db.save_analysis(analysis))
+
+    def queued(n=100):
+        for _ in range(n):
+            db.queue_analysis(analysis)
+        db.flush()
+    bench.measure('sqlite.queue_analysis_flush', queued, params={'batch': 100}, items=100)
+
+    bench.measure('sqlite.save_ai_log', lambda: db.save_ai_log('signal', {
+        'user_id': 'bench', 'brand': '현대', 'model': '그랜저', 'result': {'signal': 'buy'}}))
+    bench.measure('sqlite.add_vehicle_view', lambda: db.add_vehicle_view({
+        'user_id': 'bench', 'car_id': next(counter), 'brand': '현대', 'model': '그랜저',
+        'year': 2021, 'mileage': 40000, 'price': 3000}))
+    bench.measure('sqlite.add_favorite', lambda: db.add_favorite('bench', next(counter), {'brand': '현대'}))
+    bench.measure('sqlite.add_search_history', lambda: recommendation_service.add_search_history('bench', {
+        'brand': '현대', 'model': '그랜저', 'year': 2021, 'mileage': 40000, 'predicted_price': 3200}))
+
+
+# ========== 데이터셋 크기별 ==========
+
+def bench_dataset(bench: Bench, size: int, data_dir: Path, setup: Dict):
+    """한 데이터셋 크기에 대한 서비스 생성 + 측정. 생성된 서비스 반환 (SQLite 벤치 재사용용)"""
+    from services.vehicle_store import VehicleStore
+    from services.recommendation_service import RecommendationService
+    from services.similar_service import SimilarVehicleService
+    from services.admin_service import AdminService
+
+    store = VehicleStore(data_dir)
+    start = time.time()
+    for name in ('domestic', 'imported', 'combined', 'domestic_details', 'imported_details'):
+        store.get(name)
+    setup['load_seconds'] = round(time.time() - start, 3)
+
+    recommendation = RecommendationService(build_valuation_index=False, store=store)
+    start = time.time()
+    setup['valuation_index'] = recommendation.rebuild_valuation_index()
+    setup['valuation_build_seconds'] = round(time.time() - start, 3)
+    similar = SimilarVehicleService(store=store)
+    admin = AdminService(store=store)
+    setup['max_rss_mb'] = max_rss_mb()
+
+    if bench.enabled('similar'):
+        for brand, model, year, mileage, _ in SAMPLE_VEHICLES[:2]:
+            bench.measure('similar.distribution',
+                          lambda: similar.get_similar_distribution(brand, model, year, mileage, 3000),
+                          size=size, params={'brand': brand, 'model': model})
+
+    if bench.enabled('recommend'):
+        bench.measure('recommend.all', lambda: recommendation.get_recommended_vehicles(limit=10),
+                      size=size, params={'category': 'all', 'limit': 10})
+        bench.measure('recommend.budget', lambda: recommendation.get_recommended_vehicles(
+            budget_min=1500, budget_max=3000, category='domestic', limit=20),
+            size=size, params={'category': 'domestic', 'budget': [1500, 3000], 'limit': 20})
+        bench.measure('recommend.model_deals', lambda: recommendation.get_model_deals('현대', '그랜저', limit=10),
+                      size=size, params={'brand': '현대', 'model': '그랜저'})
+
+    if bench.enabled('admin'):
+        total_pages = max(1, admin.get_vehicles(page=1, limit=20).get('total_pages', 1))
+        bench.measure('admin.vehicles.first_page', lambda: admin.get_vehicles(page=1, limit=20),
+                      size=size, params={'page': 1, 'limit': 20})
+        deep = max(1, total_pages // 2)
+        bench.measure('admin.vehicles.deep_page', lambda: admin.get_vehicles(page=deep, limit=20),
+                      size=size, params={'page': deep, 'limit': 20})
+        bench.measure('admin.vehicles.filtered', lambda: admin.get_vehicles(
+            brand='현대', category='domestic', page=2, limit=20, price_min=1000, price_max=3000),
+            size=size, params={'brand': '현대', 'page': 2, 'price': [1000, 3000]})
+    return recommendation
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="ML 서비스 핫패스 벤치마크")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="데이터셋 행 수 (쉼표 구분, 예: 10k,100k,1m)")
+    parser.add_argument('--repeat', type=int, default=30, help="측정 반복 횟수")
+    parser.add_argument('--warmup', type=int, default=2, help="측정 전 워밍업 횟수")
+    parser.add_argument('--seed', type=int, default=0, help="합성 데이터 시드")
+    parser.add_argument('--only', default=','.join(GROUPS), help=f"측정 그룹 ({','.join(GROUPS)})")
+    parser.add_argument('--workdir', default=str(Path(tempfile.gettempdir()) / 'car_sentix_bench'),
+                        help="합성 데이터/DB 작업 폴더 (데이터셋은 재사용)")
+    parser.add_argument('--output', default='-', help="결과 JSON 경로 (기본: 표준출력)")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    groups = [g.strip() for g in args.only.split(',') if g.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"알 수 없는 그룹: {', '.join(sorted(unknown))}")
+    workdir = Path(args.workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    bench = Bench(args.repeat, args.warmup, groups)
+    setup: Dict[str, Dict] = {}
+
+    # 서비스 로그는 stderr로 (stdout은 결과 JSON 전용)
+    with contextlib.redirect_stdout(sys.stderr):
+        stub_external_collectors(workdir)
+        from services.prediction_v12 import get_prediction_service
+
+        start = time.time()
+        prediction_service = get_prediction_service()
+        setup['models'] = {'load_seconds': round(time.time() - start, 3),
+                           'versions': prediction_service.model_versions()}
+        if bench.enabled('predict'):
+            bench_predict(bench, prediction_service)
+        if bench.enabled('image'):
+            bench_image(bench, workdir)
+
+        recommendation = None
+        for size in sizes:
+            print(f"[bench] 데이터셋 {size:,}행", file=sys.stderr)
+            start = time.time()
+            data_dir = ensure_dataset(workdir / 'datasets', size, args.seed)
+            size_setup = {'dataset_seconds': round(time.time() - start, 3), 'data_dir': str(data_dir)}
+            setup[str(size)] = size_setup
+            recommendation = bench_dataset(bench, size, data_dir, size_setup)
+            gc.collect()
+
+        if bench.enabled('sqlite'):
+            if recommendation is None:
+                from services.recommendation_service import RecommendationService
+                from services.vehicle_store import VehicleStore
+                recommendation = RecommendationService(build_valuation_index=False,
+                                                       store=VehicleStore(workdir))
+            bench_sqlite(bench, workdir, recommendation)
+
+    report = {
+        'schema': SCHEMA_VERSION,
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'xgboost': _version('xgboost'),
+            'sizes': sizes,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'warmup': args.warmup,
+            'max_rss_mb': max_rss_mb(),
+        },
+        'setup': setup,
+        'results': bench.results,
+    }
+    body = json.dumps(report, ensure_ascii=False, indent=1, default=str)
+    if args.output == '-':
+        print(body)
+    else:
+        Path(args.output).write_text(body, encoding='utf-8')
+        print(f"✓ 벤치마크 결과 저장: {args.output}", file=sys.stderr)
+    return report
+
+
+def _version(module: str) -> Optional[str]:
+    try:
+        return __import__(module).__version__
+    except Exception:
+        return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+벤치마크용 합성 매물 데이터셋
+=============================
+엔카 수집 CSV와 같은 형식의 매물 데이터를 시드 고정으로 생성 (같은 크기 + 시드 → 같은 파일)
+- encar_raw_domestic.csv / encar_imported_data.csv: 원본 매물 (국산 65% / 외제 35%)
+- complete_domestic_details.csv / complete_imported_details.csv: 옵션·사고이력 (매물의 80%)
+- processed_encar_combined.csv: 유사 차량 분포용 전처리 통합 데이터
+
+모델명은 라이브 예측 모델의 인코더 키에서 뽑고, 가격은 인코딩 값 × 감가 × 잡음으로 만들어
+예측/가성비/유사 차량 경로가 실제 데이터와 비슷한 분포를 보게 한다.
+
+사용:
+    python scripts/bench/synthetic.py 100000 /tmp/car_sentix_bench/rows_100000
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ml-service'))
+
+from services.model_registry import get_model_registry
+
+DATASET_VERSION = 1
+
+DOMESTIC_SHARE = 0.65
+DETAIL_SHARE = 0.8
+
+BRANDS = {
+    'domestic': ['현대', '기아', '제네시스', '쉐보레', 'KG모빌리티(쌍용)', '르노코리아(삼성)'],
+    'imported': ['벤츠', 'BMW', '아우디', '폭스바겐', '볼보', '렉서스', '미니', '포르쉐'],
+}
+FUELS = ['가솔린', '디젤', 'LPG', '가솔린+전기']
+FUEL_WEIGHTS = [0.55, 0.3, 0.07, 0.08]
+REGIONS = ['서울', '경기', '인천', '부산', '대구', '대전', '광주']
+GRADES = ['normal', 'good', 'excellent']
+OPTION_COLUMNS = ['has_sunroof', 'has_led_lamp', 'has_parking_sensor', 'has_rear_camera', 'has_auto_ac',
+                  'has_smart_key', 'has_navigation', 'has_heated_seat', 'has_ventilated_seat',
+                  'has_leather_seat']
+
+# 첫 매물 ID (국산 / 외제)
+ID_BASE = {'domestic': 40_000_000, 'imported': 60_000_000}
+
+
+def _model_values(segment: str) -> Dict[str, float]:
+    """모델명 → 평균 가격(만원) - 라이브 모델 인코더, 없으면 고정 목록"""
+    bundle = get_model_registry().get(segment)
+    if bundle is not None and len(bundle.encoders.get('model_enc', {})):
+        return {k: float(v) for k, v in bundle.encoders['model_enc'].items()}
+    if segment == 'domestic':
+        return {'그랜저': 3000, '쏘나타': 2200, '아반떼': 1600, 'K5': 2100, '쏘렌토': 3000, 'G80': 5000}
+    return {'E-클래스': 5500, '5시리즈': 5000, 'A6': 4500, 'XC60': 4800, 'ES': 4300}
+
+
+def _listings(segment: str, rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    values = _model_values(segment)
+    names = np.array(list(values.keys()), dtype=object)
+    base = np.array(list(values.values()), dtype=np.float64)
+
+    pick = rng.integers(0, len(names), rows)
+    year = rng.integers(2008, 2026, rows)
+    age = 2025 - year
+    mileage = np.clip(age * rng.normal(15000, 5000, rows) + rng.integers(0, 8000, rows), 0, 400000)
+    price = base[pick] * (0.9 ** age) * rng.lognormal(0.0, 0.25, rows)
+    return pd.DataFrame({
+        'Id': np.arange(ID_BASE[segment], ID_BASE[segment] + rows),
+        'Manufacturer': rng.choice(BRANDS[segment], rows),
+        'Model': names[pick],
+        'Badge': rng.choice(['기본형', '프리미엄', '익스클루시브'], rows),
+        'Year': year * 100 + rng.integers(1, 13, rows),
+        'FormYear': year,
+        'Mileage': mileage.astype(np.int64),
+        'FuelType': rng.choice(FUELS, rows, p=FUEL_WEIGHTS),
+        'Price': np.clip(price, 100, 90000).astype(np.int64),
+        'OfficeCityState': rng.choice(REGIONS, rows),
+    })
+
+
+def _details(listings: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    rows = len(listings)
+    keep = np.sort(rng.choice(rows, int(rows * DETAIL_SHARE), replace=False))
+    df = pd.DataFrame({
+        'car_id': listings['Id'].to_numpy()[keep],
+        'is_accident_free': rng.integers(0, 2, len(keep)),
+        'inspection_grade': rng.choice(GRADES, len(keep), p=[0.6, 0.3, 0.1]),
+    })
+    for col in OPTION_COLUMNS:
+        df[col] = rng.integers(0, 2, len(keep))
+    df['region'] = listings['OfficeCityState'].to_numpy()[keep]
+    return df
+
+
+def generate_dataset(out_dir: Path, rows: int, seed: int = 0) -> Dict:
+    """합성 데이터셋 생성 (CSV 5개 + dataset.json)"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    start = time.time()
+
+    domestic_rows = int(rows * DOMESTIC_SHARE)
+    frames = {
+        'domestic': _listings('domestic', domestic_rows, rng),
+        'imported': _listings('imported', rows - domestic_rows, rng),
+    }
+    frames['domestic'].to_csv(out_dir / 'encar_raw_domestic.csv', index=False, encoding='utf-8-sig')
+    frames['imported'].to_csv(out_dir / 'encar_imported_data.csv', index=False, encoding='utf-8-sig')
+    _details(frames['domestic'], rng).to_csv(out_dir / 'complete_domestic_details.csv',
+                                             index=False, encoding='utf-8-sig')
+    _details(frames['imported'], rng).to_csv(out_dir / 'complete_imported_details.csv',
+                                             index=False, encoding='utf-8-sig')
+
+    combined = pd.concat([frames['domestic'].assign(car_type='Domestic'),
+                          frames['imported'].assign(car_type='Imported')], ignore_index=True)
+    combined = pd.DataFrame({
+        'brand': combined['Manufacturer'], 'model_name': combined['Model'], 'year': combined['FormYear'],
+        'mileage': combined['Mileage'], 'fuel': combined['FuelType'], 'price': combined['Price'],
+        'car_type': combined['car_type'],
+    })
+    combined.to_csv(out_dir / 'processed_encar_combined.csv', index=False, encoding='utf-8-sig')
+
+    meta = {'dataset_version': DATASET_VERSION, 'rows': rows, 'seed': seed,
+            'domestic_rows': domestic_rows, 'imported_rows': rows - domestic_rows,
+            'generate_seconds': round(time.time() - start, 3)}
+    (out_dir / 'dataset.json').write_text(json.dumps(meta, indent=1), encoding='utf-8')
+    return meta
+
+
+def ensure_dataset(root: Path, rows: int, seed: int = 0) -> Path:
+    """root/rows_<N>_seed<S> 에 데이터셋이 없으면 생성 (있으면 재사용)"""
+    out_dir = Path(root) / f"rows_{rows}_seed{seed}"
+    try:
+        meta = json.loads((out_dir / 'dataset.json').read_text(encoding='utf-8'))
+        if meta.get('dataset_version') == DATASET_VERSION and meta.get('rows') == rows:
+            return out_dir
+    except (OSError, ValueError):
+        pass
+    generate_dataset(out_dir, rows, seed)
+    return out_dir
+
+
+def list_files(out_dir: Path) -> List[str]:
+    return sorted(p.name for p in Path(out_dir).glob('*.csv'))
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    target = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(f"rows_{n}")
+    print(json.dumps(generate_dataset(target, n), ensure_ascii=False))
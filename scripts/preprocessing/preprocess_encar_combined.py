@@ -3,12 +3,52 @@
 - 국산차 데이터: processed_encar_data.csv (기존)
 - 수입차 데이터: encar_imported_data.csv (새로 수집)
 - 통합 데이터: processed_encar_combined.csv
+             processed_encar_combined/ (브랜드/연식 파티션 Parquet - 유사 차량 서비스가 필요한 파티션만 로드)
 
 v2.0 - 가격 이상치 필터링 강화 (연식 대비 비정상 가격 제거)
+v3.0 - 스트리밍 처리: 고정 크기 청크 단위로 읽고 벡터화 정제 후 바로 저장 (수집 데이터가 커져도 메모리 일정)
+       연식 대비 최소 가격은 조회 배열, YYYYMM 연식 파싱은 np.where
+
+사용:
+    python scripts/preprocessing/preprocess_encar_combined.py
+    python scripts/preprocessing/preprocess_encar_combined.py --chunk-rows 100000
 """
-import pandas as pd
-import numpy as np
+import argparse
 import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / 'ml-service'))
+from services.vehicle_store import PARQUET_AVAILABLE, PARTITIONED_DATASETS, ROW_ID, write_partitioned
+
+if PARQUET_AVAILABLE:
+    import pyarrow as pa
+
+# ========== 처리 설정 ==========
+BASE_YEAR = 2025        # 연식 계산 기준 연도 (이후 값은 YYYYMM으로 간주)
+CHUNK_ROWS = 200_000    # 청크당 행 수
+
+OUTPUT_COLUMNS = ['brand', 'model_name', 'year', 'mileage', 'fuel', 'price', 'car_type']
+
+# 수입차 데이터 컬럼명 매핑 (소문자 변환 후)
+IMPORTED_MAPPING = {
+    'manufacturer': 'brand',
+    'model': 'model_name',
+    'fueltype': 'fuel',
+    'cartype': 'car_type'
+}
+
+# (표시 이름, 파일, 차량 유형, 컬럼 매핑)
+SOURCES = [
+    ('국산차', 'processed_encar_data.csv', 'Domestic', {}),
+    ('수입차', 'encar_imported_data.csv', 'Imported', IMPORTED_MAPPING),
+]
 
 # ========== 가격 필터 상수 ==========
 # 엔카에서 "가격 미정", "가격 문의" 차량은 1, 11, 86 등 비정상적으로 낮은 가격으로 표시됨
@@ -65,232 +105,252 @@ def get_min_price_by_age(age: int, is_imported: bool) -> int:
     return price_table[ages[-1]]
 
 
-def preprocess_combined_data():
-    print("🔧 엔카 데이터 통합 전처리 시작...")
-    print("=" * 70)
-    
-    # ---------------------------------------------------------
-    # 1. 국산차 데이터 로드
-    # ---------------------------------------------------------
-    domestic_file = "data/processed_encar_data.csv"
-    if not os.path.exists(domestic_file):
-        print(f"❌ 국산차 데이터 파일을 찾을 수 없습니다: {domestic_file}")
-        return
-    
-    print(f"\n📂 국산차 데이터 로딩: {domestic_file}")
-    df_domestic = pd.read_csv(domestic_file)
-    
-    # 컬럼명 소문자 통일
-    df_domestic.columns = df_domestic.columns.str.lower()
-    
-    # CarType 컬럼이 없으면 추가
-    if 'car_type' not in df_domestic.columns:
-        df_domestic['car_type'] = 'Domestic'
-    
-    print(f"   ✓ 국산차: {len(df_domestic):,}건")
-    print(f"   컬럼: {list(df_domestic.columns)}")
-    
-    # ---------------------------------------------------------
-    # 2. 수입차 데이터 로드
-    # ---------------------------------------------------------
-    imported_file = "data/encar_imported_data.csv"
-    if not os.path.exists(imported_file):
-        print(f"\n⚠️  수입차 데이터 파일을 찾을 수 없습니다: {imported_file}")
-        print("   수입차 없이 국산차만 사용합니다.")
-        df_imported = pd.DataFrame()
-    else:
-        print(f"\n📂 수입차 데이터 로딩: {imported_file}")
-        df_imported = pd.read_csv(imported_file)
-        
-        # 컬럼명 소문자 통일
-        df_imported.columns = df_imported.columns.str.lower()
-        
-        print(f"   ✓ 수입차: {len(df_imported):,}건")
-        print(f"   컬럼: {list(df_imported.columns)}")
-    
-    # ---------------------------------------------------------
-    # 3. 데이터 병합 (컬럼명 통일 후)
-    # ---------------------------------------------------------
-    if len(df_imported) > 0:
-        print(f"\n🔗 데이터 병합 중...")
-        
-        # 수입차 데이터 컬럼명 매핑
-        imported_mapping = {
-            'manufacturer': 'brand',
-            'model': 'model_name',
-            'fueltype': 'fuel',
-            'cartype': 'car_type'
-        }
-        df_imported = df_imported.rename(columns=imported_mapping)
-        
-        # 필요한 컬럼 선택
-        required_cols = ['brand', 'model_name', 'year', 'mileage', 'fuel', 'price', 'car_type']
-        
-        # 국산차 데이터에서 필요 컬럼만 선택
-        domestic_cols = [col for col in required_cols if col in df_domestic.columns]
-        df_domestic_selected = df_domestic[domestic_cols].copy()
-        
-        # 수입차 데이터에서 필요 컬럼만 선택
-        imported_cols = [col for col in required_cols if col in df_imported.columns]
-        df_imported_selected = df_imported[imported_cols].copy()
-        
-        print(f"   국산차 컬럼: {domestic_cols}")
-        print(f"   수입차 컬럼: {imported_cols}")
-        
-        # 병합
-        df_combined = pd.concat([
-            df_domestic_selected,
-            df_imported_selected
-        ], ignore_index=True)
-        
-        print(f"   ✓ 통합 데이터: {len(df_combined):,}건")
-    else:
-        df_combined = df_domestic.copy()
-        print(f"\n⚠️  수입차 데이터 없음 - 국산차만 사용")
-    
-    # ---------------------------------------------------------
-    # 4. 데이터 전처리
-    # ---------------------------------------------------------
-    print(f"\n🔧 데이터 전처리 중...")
-    print(f"   현재 컬럼: {list(df_combined.columns)}")
-    
-    # 필수 컬럼 확인
-    required_cols = ['brand', 'model_name', 'year', 'mileage', 'fuel', 'price']
-    missing_cols = [col for col in required_cols if col not in df_combined.columns]
-    if missing_cols:
-        print(f"   ⚠️  누락된 컬럼: {missing_cols}")
-        # 누락된 컬럼은 'Unknown'으로 채움
-        for col in missing_cols:
-            df_combined[col] = 'Unknown'
-    
-    # 결측치 제거
-    initial_count = len(df_combined)
-    df_combined = df_combined.dropna(subset=['year', 'mileage', 'price'])
-    print(f"   ✓ 결측치 제거: {initial_count:,} → {len(df_combined):,}건 ({initial_count - len(df_combined):,}건 제거)")
-    
-    # 데이터 타입 변환
-    df_combined['year'] = pd.to_numeric(df_combined['year'], errors='coerce')
-    df_combined['mileage'] = pd.to_numeric(df_combined['mileage'], errors='coerce')
-    df_combined['price'] = pd.to_numeric(df_combined['price'], errors='coerce')
-    
+# 연식(0 ~ 최대 기준 연식)별 최소 가격 조회 배열 - get_min_price_by_age와 같은 값 (보간 포함)
+MIN_PRICE_LOOKUP = {
+    is_imported: np.array([get_min_price_by_age(age, is_imported)
+                           for age in range(max(IMPORTED_MIN_PRICE_BY_AGE if is_imported
+                                                else DOMESTIC_MIN_PRICE_BY_AGE) + 1)])
+    for is_imported in (False, True)
+}
+
+
+def min_price_by_age(age: np.ndarray, is_imported: np.ndarray) -> np.ndarray:
+    """get_min_price_by_age 벡터화 (기준 연식 범위 밖은 양 끝 값)"""
+    domestic, imported = MIN_PRICE_LOOKUP[False], MIN_PRICE_LOOKUP[True]
+    return np.where(is_imported,
+                    imported[np.clip(age, 0, len(imported) - 1)],
+                    domestic[np.clip(age, 0, len(domestic) - 1)])
+
+
+def _usecols(mapping: dict):
+    """필요한 원본 컬럼만 읽기 (대소문자 무시)"""
+    return lambda col: mapping.get(col.lower(), col.lower()) in OUTPUT_COLUMNS
+
+
+def clean_chunk(df: pd.DataFrame, car_type: str, mapping: dict, counts: Counter, samples: list) -> pd.DataFrame:
+    """
+    청크 하나 정제 (컬럼 통일 → 결측치 → YYYYMM 연식 → 기본 이상치 → 연식 대비 비정상 가격)
+
+    counts에 단계별 (단계, 차량 유형) 건수를, samples에 비정상 가격 예시(최대 10건)를 누적한다.
+    """
+    df.columns = df.columns.str.lower()
+    df = df.rename(columns=mapping)
+    if 'car_type' not in df.columns:
+        # CarType 컬럼이 없으면 국산차만 기본값 추가 (수입차는 NaN → 아래 유형별 이상치 필터에서 제외, 기존 동작 유지)
+        df['car_type'] = car_type if car_type == 'Domestic' else np.nan
+    for col in OUTPUT_COLUMNS:
+        if col not in df.columns:
+            counts[('missing', col)] += 1
+            df[col] = 'Unknown'  # 누락된 컬럼은 'Unknown'으로 채움
+    df = df[OUTPUT_COLUMNS]
+    counts[('read', car_type)] += len(df)
+
+    # 결측치 제거 + 수치 변환 (숫자가 아닌 값은 NaN → 아래 필터에서 제외)
+    df = df.dropna(subset=['year', 'mileage', 'price'])
+    counts[('dropna', car_type)] += len(df)
+    year = pd.to_numeric(df['year'], errors='coerce').to_numpy(dtype=np.float64)
+    mileage = pd.to_numeric(df['mileage'], errors='coerce').to_numpy(dtype=np.float64)
+    price = pd.to_numeric(df['price'], errors='coerce').to_numpy(dtype=np.float64)
+
     # Year 컬럼이 YYYYMM 형식인 경우 연도만 추출
-    df_combined['year'] = df_combined['year'].apply(lambda x: int(x // 100) if x > 2025 else x)
-    
-    # ---------------------------------------------------------
-    # 4-1. 기본 이상치 제거 (차량 유형별로 다르게)
-    # ---------------------------------------------------------
-    print(f"   이상치 제거 전: 국산차 {len(df_combined[df_combined['car_type']=='Domestic']):,}건, 수입차 {len(df_combined[df_combined['car_type']=='Imported']):,}건")
+    year = np.where(year > BASE_YEAR, year // 100, year)
 
-    # 공통 조건
-    common_filter = (
-        (df_combined['year'] >= 1990) &
-        (df_combined['year'] <= 2025) &
-        (df_combined['mileage'] >= 0) &
-        (df_combined['mileage'] <= 500000) &
-        (df_combined['price'] > 0)
-    )
+    # 기본 이상치 제거 (국산차 5억원 이하, 수입차 10억원 이하 - 고가 차량 보존)
+    types = df['car_type'].to_numpy(dtype=object)
+    is_domestic = types == 'Domestic'
+    is_imported = types == 'Imported'
+    valid = ((year >= 1990) & (year <= BASE_YEAR) &
+             (mileage >= 0) & (mileage <= 500000) & (price > 0) &
+             ((is_domestic & (price <= 50000)) | (is_imported & (price <= 100000))))
+    for name in ('Domestic', 'Imported'):
+        counts[('basic', name)] += int((valid & (types == name)).sum())
 
-    # 국산차: 5억원 이하
-    domestic_filter = common_filter & (df_combined['car_type'] == 'Domestic') & (df_combined['price'] <= 50000)
+    # 연식 대비 비정상 가격 필터링 (가격 미정/문의 차량 제거)
+    age = np.where(valid, BASE_YEAR - year, 0).astype(np.int64)
+    min_price = min_price_by_age(age, is_imported)
+    invalid = valid & (price < min_price)
+    keep = valid & ~invalid
+    if invalid.any() and len(samples) < 10:
+        for i in np.flatnonzero(invalid)[:10 - len(samples)]:
+            samples.append((df['brand'].iat[i], df['model_name'].iat[i], int(year[i]), price[i],
+                            int(min_price[i])))
 
-    # 수입차: 10억원 이하 (고가 차량 보존)
-    imported_filter = common_filter & (df_combined['car_type'] == 'Imported') & (df_combined['price'] <= 100000)
+    # 값은 변환 결과 그대로 (반올림 / 정수 변환 없음)
+    out = pd.DataFrame({
+        'brand': df['brand'].to_numpy()[keep],
+        'model_name': df['model_name'].to_numpy()[keep],
+        'year': year[keep],
+        'mileage': mileage[keep],
+        'fuel': df['fuel'].to_numpy()[keep],
+        'price': price[keep],
+        'car_type': types[keep],
+    })
+    for name in ('Domestic', 'Imported'):
+        counts[('final', name)] += int((out['car_type'] == name).sum())
+    return out
 
-    # 두 조건 합치기
-    df_combined = df_combined[domestic_filter | imported_filter]
 
-    print(f"   ✓ 기본 이상치 제거 후: {len(df_combined):,}건")
-    print(f"      - 국산차: {len(df_combined[df_combined['car_type']=='Domestic']):,}건")
-    print(f"      - 수입차: {len(df_combined[df_combined['car_type']=='Imported']):,}건")
+def _parquet_schema():
+    return pa.schema([
+        ('brand', pa.string()), ('model_name', pa.string()), ('year', pa.int32()),
+        ('mileage', pa.float64()), ('fuel', pa.string()), ('price', pa.float64()),
+        ('car_type', pa.string()), (ROW_ID, pa.int64()),
+    ])
+
+
+def preprocess_combined_data(data_dir=None, chunk_rows: int = CHUNK_ROWS):
+    """
+    국산차 + 수입차 CSV를 청크 단위로 정제해 통합 CSV와 브랜드/연식 파티션 Parquet로 저장
+
+    Returns:
+        요약 dict (건수 / 파티션 수 / 소요 시간), 국산차 파일이 없으면 None
+    """
+    data_dir = Path(data_dir) if data_dir else ROOT / 'data'
+    print("🔧 엔카 데이터 통합 전처리 시작 (스트리밍)...")
+    print("=" * 70)
+    start = time.time()
 
     # ---------------------------------------------------------
-    # 4-2. 연식 대비 비정상 가격 필터링 (가격 미정/문의 차량 제거)
+    # 1. 입력 파일 확인
     # ---------------------------------------------------------
-    print(f"\n   🔍 연식 대비 비정상 가격 필터링...")
-
-    # 연식 계산 (2025년 기준)
-    df_combined['age'] = 2025 - df_combined['year']
-
-    # 연식별 최소 가격 계산
-    def check_price_validity(row):
-        """연식 대비 가격이 정상인지 확인"""
-        age = int(row['age']) if pd.notna(row['age']) else 0
-        price = row['price']
-        is_imported = row['car_type'] == 'Imported'
-
-        min_price = get_min_price_by_age(age, is_imported)
-        return price >= min_price
-
-    before_filter = len(df_combined)
-
-    # 비정상 가격 차량 로깅
-    invalid_mask = ~df_combined.apply(check_price_validity, axis=1)
-    invalid_count = invalid_mask.sum()
-
-    if invalid_count > 0:
-        print(f"   ⚠️  연식 대비 비정상 가격 차량 {invalid_count}건 발견:")
-        invalid_samples = df_combined[invalid_mask][['brand', 'model_name', 'year', 'price', 'car_type']].head(10)
-        for _, row in invalid_samples.iterrows():
-            age = 2025 - int(row['year'])
-            min_price = get_min_price_by_age(age, row['car_type'] == 'Imported')
-            print(f"      - {row['brand']} {row['model_name']} ({int(row['year'])}년): {row['price']:.0f}만원 (최소 {min_price}만원 필요)")
-
-    # 정상 가격 차량만 유지
-    df_combined = df_combined[~invalid_mask]
-
-    # age 컬럼 제거 (임시 컬럼)
-    df_combined = df_combined.drop(columns=['age'])
-
-    print(f"   ✓ 연식 대비 비정상 가격 필터링 후: {len(df_combined):,}건 ({before_filter - len(df_combined):,}건 제거)")
-    print(f"      - 국산차: {len(df_combined[df_combined['car_type']=='Domestic']):,}건")
-    print(f"      - 수입차: {len(df_combined[df_combined['car_type']=='Imported']):,}건")
-    
-    # 중복 제거
-    if 'id' in df_combined.columns:
-        df_combined = df_combined.drop_duplicates(subset=['id'])
-        print(f"   ✓ 중복 제거 후: {len(df_combined):,}건")
-    
+    sources = []
+    for label, filename, car_type, mapping in SOURCES:
+        path = data_dir / filename
+        if path.exists():
+            sources.append((label, path, car_type, mapping))
+            print(f"📂 {label} 데이터: {path} ({path.stat().st_size / 1024 / 1024:,.1f}MB)")
+        elif car_type == 'Domestic':
+            print(f"❌ 국산차 데이터 파일을 찾을 수 없습니다: {path}")
+            return None
+        else:
+            print(f"⚠️  {label} 데이터 파일을 찾을 수 없습니다: {path}")
+            print("   수입차 없이 국산차만 사용합니다.")
+    print(f"   청크 크기: {chunk_rows:,}행")
+
     # ---------------------------------------------------------
-    # 5. 최종 저장
+    # 2. 청크 단위 정제 → CSV 추가 쓰기 + 파티션 Parquet 스트리밍
     # ---------------------------------------------------------
-    output_file = "data/processed_encar_combined.csv"
-    df_combined.to_csv(output_file, index=False, encoding='utf-8-sig')
-    
+    csv_path = data_dir / "processed_encar_combined.csv"
+    parquet_root = data_dir / PARTITIONED_DATASETS['combined']
+    csv_tmp = csv_path.with_name(f".{csv_path.name}.{os.getpid()}.tmp")
+    counts, samples = Counter(), []
+    brands, by_type = Counter(), Counter()
+    totals = {'rows': 0, 'price_sum': 0.0, 'price_min': np.inf, 'price_max': -np.inf,
+              'mileage_sum': 0.0, 'year_sum': 0.0, 'year_min': np.inf, 'year_max': -np.inf}
+
+    def cleaned_chunks():
+        row_id = 0
+        header = True
+        for label, path, car_type, mapping in sources:
+            print(f"\n🔧 {label} 정제 중...")
+            for n, chunk in enumerate(pd.read_csv(path, chunksize=chunk_rows, usecols=_usecols(mapping),
+                                                  low_memory=False), 1):
+                rows_in = len(chunk)
+                out = clean_chunk(chunk, car_type, mapping, counts, samples)
+                out[ROW_ID] = np.arange(row_id, row_id + len(out), dtype=np.int64)
+                row_id += len(out)
+
+                out.drop(columns=[ROW_ID]).to_csv(csv_file, header=header, index=False)
+                header = False
+                brands.update(out['brand'].value_counts().to_dict())
+                by_type.update(out['car_type'].value_counts().to_dict())
+                if len(out):
+                    totals['rows'] += len(out)
+                    totals['price_sum'] += float(out['price'].sum())
+                    totals['price_min'] = min(totals['price_min'], float(out['price'].min()))
+                    totals['price_max'] = max(totals['price_max'], float(out['price'].max()))
+                    totals['mileage_sum'] += float(out['mileage'].sum())
+                    totals['year_sum'] += float(out['year'].sum())
+                    totals['year_min'] = min(totals['year_min'], float(out['year'].min()))
+                    totals['year_max'] = max(totals['year_max'], float(out['year'].max()))
+                print(f"   ✓ 청크 {n}: {rows_in:,} → {len(out):,}건")
+                # 파티션 키: 연식은 정수, 브랜드 결측은 'Unknown' (CSV에는 원래 값)
+                yield out.assign(year=out['year'].astype(np.int32), brand=out['brand'].fillna('Unknown'))
+
+    manifest = None
+    try:
+        with open(csv_tmp, 'w', encoding='utf-8-sig', newline='') as csv_file:
+            if PARQUET_AVAILABLE:
+                manifest = write_partitioned(cleaned_chunks(), parquet_root, _parquet_schema(),
+                                             meta={'chunk_rows': chunk_rows,
+                                                   'sources': [path.name for _, path, _, _ in sources]})
+            else:
+                print("⚠️  pyarrow 미설치 - 파티션 Parquet 없이 CSV만 저장합니다")
+                for _ in cleaned_chunks():
+                    pass
+        os.replace(csv_tmp, csv_path)
+    finally:
+        if csv_tmp.exists():
+            csv_tmp.unlink()
+
+    # ---------------------------------------------------------
+    # 3. 단계별 건수
+    # ---------------------------------------------------------
+    for (stage, col), n in counts.items():
+        if stage == 'missing':
+            print(f"   ⚠️  누락된 컬럼: {col} ('Unknown'으로 채움, {n}개 청크)")
+    read_total = counts[('read', 'Domestic')] + counts[('read', 'Imported')]
+    dropna_total = counts[('dropna', 'Domestic')] + counts[('dropna', 'Imported')]
+    basic_total = counts[('basic', 'Domestic')] + counts[('basic', 'Imported')]
+    print(f"\n   ✓ 결측치 제거: {read_total:,} → {dropna_total:,}건 ({read_total - dropna_total:,}건 제거)")
+    print(f"   ✓ 기본 이상치 제거 후: {basic_total:,}건")
+    print(f"      - 국산차: {counts[('basic', 'Domestic')]:,}건")
+    print(f"      - 수입차: {counts[('basic', 'Imported')]:,}건")
+    if samples:
+        print(f"   ⚠️  연식 대비 비정상 가격 차량 {basic_total - totals['rows']}건 발견 (예시):")
+        for brand, model_name, year, price, min_price in samples:
+            print(f"      - {brand} {model_name} ({year}년): {price:.0f}만원 (최소 {min_price}만원 필요)")
+    print(f"   ✓ 연식 대비 비정상 가격 필터링 후: {totals['rows']:,}건 ({basic_total - totals['rows']:,}건 제거)")
+    print(f"      - 국산차: {counts[('final', 'Domestic')]:,}건")
+    print(f"      - 수입차: {counts[('final', 'Imported')]:,}건")
+
     print("\n" + "=" * 70)
-    print(f"✅ 통합 데이터 전처리 완료!")
-    print(f"📁 저장 위치: {os.path.abspath(output_file)}")
-    print(f"📊 최종 데이터: {len(df_combined):,}건")
-    
+    print(f"✅ 통합 데이터 전처리 완료! ({time.time() - start:.1f}초)")
+    print(f"📁 저장 위치: {csv_path}")
+    if manifest:
+        print(f"📁 파티션 Parquet: {parquet_root} (파티션 {manifest['partitions']:,}개, 파일 {manifest['files']:,}개)")
+    print(f"📊 최종 데이터: {totals['rows']:,}건")
+    if not totals['rows']:
+        return {'rows': 0, 'partitions': manifest['partitions'] if manifest else 0}
+
     # ---------------------------------------------------------
-    # 6. 통계 요약
+    # 4. 통계 요약 (중위수는 가격 / 주행거리 컬럼만 다시 읽어 계산)
     # ---------------------------------------------------------
     print("\n📊 데이터 통계 요약")
     print("-" * 70)
-    
-    if 'car_type' in df_combined.columns:
-        print("\n🚗 차량 유형별 분포:")
-        print(df_combined['car_type'].value_counts())
-    
-    if 'brand' in df_combined.columns:
-        print("\n🏭 브랜드별 Top 10:")
-        print(df_combined['brand'].value_counts().head(10))
-    
+
+    print("\n🚗 차량 유형별 분포:")
+    for name, n in by_type.most_common():
+        print(f"   {name:10s} {n:>10,}")
+
+    print("\n🏭 브랜드별 Top 10:")
+    for name, n in brands.most_common(10):
+        print(f"   {name:10s} {n:>10,}")
+
+    medians = pd.read_csv(csv_path, usecols=['price', 'mileage']).median()
+    rows = totals['rows']
     print(f"\n📈 가격 통계:")
-    print(f"   평균: {df_combined['price'].mean():.0f}만원")
-    print(f"   중위수: {df_combined['price'].median():.0f}만원")
-    print(f"   최소: {df_combined['price'].min():.0f}만원")
-    print(f"   최대: {df_combined['price'].max():.0f}만원")
-    
+    print(f"   평균: {totals['price_sum'] / rows:.0f}만원")
+    print(f"   중위수: {medians['price']:.0f}만원")
+    print(f"   최소: {totals['price_min']:.0f}만원")
+    print(f"   최대: {totals['price_max']:.0f}만원")
+
     print(f"\n🏃 주행거리 통계:")
-    print(f"   평균: {df_combined['mileage'].mean():,.0f}km")
-    print(f"   중위수: {df_combined['mileage'].median():,.0f}km")
-    
+    print(f"   평균: {totals['mileage_sum'] / rows:,.0f}km")
+    print(f"   중위수: {medians['mileage']:,.0f}km")
+
     print(f"\n📅 연식 통계:")
-    print(f"   최신: {df_combined['year'].max():.0f}년")
-    print(f"   최구: {df_combined['year'].min():.0f}년")
-    print(f"   평균: {df_combined['year'].mean():.0f}년")
-    
-    return df_combined
+    print(f"   최신: {totals['year_max']:.0f}년")
+    print(f"   최구: {totals['year_min']:.0f}년")
+    print(f"   평균: {totals['year_sum'] / rows:.0f}년")
+
+    return {'rows': rows, 'domestic': counts[('final', 'Domestic')], 'imported': counts[('final', 'Imported')],
+            'partitions': manifest['partitions'] if manifest else 0, 'seconds': round(time.time() - start, 1)}
+
 
 if __name__ == "__main__":
-    preprocess_combined_data()
+    parser = argparse.ArgumentParser(description='엔카 국산차 + 수입차 통합 전처리 (스트리밍)')
+    parser.add_argument('--data-dir', default=str(ROOT / 'data'))
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='청크당 행 수')
+    args = parser.parse_args()
+    preprocess_combined_data(args.data_dir, chunk_rows=args.chunk_rows)
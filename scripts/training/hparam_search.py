@@ -0,0 +1,339 @@
+"""
+하이퍼파라미터 탐색 (병렬 trial + 조기 가지치기 + 재개)
+=====================================================
+학습 스크립트를 복사해 손으로 값을 바꾸는 대신, 같은 전처리 캐시 / 피처 / 평가 지표로 trial을 돌린다.
+- 데이터: train_all_models와 같은 전처리 캐시 → 학습 분할(test 20%는 건드리지 않음)을 다시 학습 / 검증으로 나눔
+- trial: 프로세스 풀에서 병렬 실행, trial별 XGBoost n_jobs = CPU 예산 / 동시 trial 수
+  trial 0은 학습 스크립트 기본값(DEFAULT_PARAMS), 나머지는 (seed, trial 번호)로 결정되는 무작위 샘플
+- 가지치기: 검증 RMSE 곡선을 --prune-interval 라운드마다 기록해, 같은 라운드에서 앞선 trial들의 중앙값보다
+  나쁘면 중단 (--prune-warmup 라운드 이후, 비교 대상이 --prune-min-trials개 이상일 때)
+- 결과: logs/hparam/<study>.csv 에 trial이 끝날 때마다 한 줄씩 추가
+  (파라미터, 검증 MAPE / MAE / R², 5·10·15% 이내 비율, 최적 라운드, 가지치기 지점, 소요 시간)
+- 재개: 같은 명령을 다시 실행하면 CSV에 완료/가지치기로 기록된 trial은 건너뜀
+
+사용:
+    python scripts/training/hparam_search.py --job domestic_v12 --trials 60
+    python scripts/training/hparam_search.py --job imported_v14 --trials 40 --workers 4 --cpus 8
+    python scripts/training/train_all_models.py --params logs/hparam/domestic_v12_search_best.json
+"""
+import argparse
+import csv
+import importlib
+import json
+import math
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+TRAINING_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TRAINING_DIR))
+from train_all_models import ROOT, THREAD_ENV_VARS, TRAINERS, available_cpus
+
+# 탐색 공간: 이름 → (분포, 하한, 상한)
+SEARCH_SPACE = {
+    'max_depth': ('int', 4, 12),
+    'learning_rate': ('log', 0.01, 0.2),
+    'subsample': ('float', 0.5, 1.0),
+    'colsample_bytree': ('float', 0.5, 1.0),
+    'min_child_weight': ('log', 1.0, 30.0),
+    'reg_lambda': ('log', 0.1, 20.0),
+    'gamma': ('float', 0.0, 0.3),
+}
+
+METRIC_COLUMNS = ['best_iteration', 'rounds', 'pruned_at', 'valid_rmse', 'mape', 'mae', 'r2',
+                  'within_5', 'within_10', 'within_15']
+DONE_STATUSES = ('complete', 'pruned')
+XGB_DEFAULTS = {'reg_lambda': 1.0, 'gamma': 0.0}  # DEFAULT_PARAMS에 없는 탐색 항목의 XGBoost 기본값
+
+# 워커 프로세스 상태 (initializer에서 한 번 준비)
+_WORKER = {}
+
+
+def sample_params(trial: int, seed: int, defaults: dict) -> dict:
+    """trial 파라미터 - (seed, trial)로 결정되므로 재개해도 같은 값"""
+    if trial == 0:
+        return {k: {**XGB_DEFAULTS, **defaults}[k] for k in SEARCH_SPACE}
+    rng = np.random.default_rng([seed, trial])
+    params = {}
+    for name, (kind, low, high) in SEARCH_SPACE.items():
+        if kind == 'int':
+            params[name] = int(rng.integers(low, high + 1))
+        elif kind == 'log':
+            params[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+        else:
+            params[name] = float(rng.uniform(low, high))
+    return params
+
+
+class MedianPruner:
+    """XGBoost 콜백: 검증 곡선이 같은 라운드의 앞선 trial 중앙값보다 나쁘면 학습 중단"""
+
+    def __init__(self, reference: dict, interval: int, warmup: int, min_trials: int):
+        import xgboost as xgb
+
+        class _Callback(xgb.callback.TrainingCallback):
+            def after_iteration(cb, model, epoch, evals_log):
+                return self._check(epoch + 1, evals_log)
+
+        self.callback = _Callback()
+        self.reference = reference  # 라운드 → 앞선 trial들의 검증 RMSE 목록
+        self.interval = interval
+        self.warmup = warmup
+        self.min_trials = min_trials
+        self.curve = {}
+        self.pruned_at = None
+
+    def _check(self, rounds: int, evals_log) -> bool:
+        if rounds % self.interval:
+            return False
+        history = next(iter(evals_log.values()))
+        value = float(next(iter(history.values()))[-1])
+        self.curve[rounds] = value
+        ref = self.reference.get(rounds, [])
+        if rounds >= self.warmup and len(ref) >= self.min_trials and value > float(np.median(ref)):
+            self.pruned_at = rounds
+            return True
+        return False
+
+
+def _init_worker(job: str, data_dir: str, cache_dir: str, valid_size: float, seed: int, threads: int):
+    """워커 초기화: 스레드 제한 → 캐시된 전처리 결과 로드 → 학습 / 검증 행렬 한 번 생성"""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    sys.path.insert(0, str(TRAINING_DIR))
+    from sklearn.model_selection import train_test_split
+
+    module = importlib.import_module(TRAINERS[job][0])
+    df, _ = module.load(data_dir, cache_dir=cache_dir)
+    train_df, _ = train_test_split(df, test_size=0.2, random_state=42)  # 학습 스크립트와 같은 test 분할 제외
+    fit_df, valid_df = train_test_split(train_df, test_size=valid_size, random_state=seed)
+    _WORKER.update(module=module, split=module.prepare_split(fit_df, valid_df), threads=threads)
+
+
+def _run_trial(trial: int, params: dict, reference: dict, prune: dict, max_rounds: int) -> dict:
+    """trial 하나 학습 + 검증 지표"""
+    start = time.perf_counter()
+    module, split = _WORKER['module'], _WORKER['split']
+    pruner = MedianPruner(reference, **prune)
+    model = module.build_model({**params, 'n_estimators': max_rounds}, n_jobs=_WORKER['threads'],
+                               callbacks=[pruner.callback])
+    model.fit(split['X_fit'], split['y_fit'], eval_set=[(split['X_eval'], split['y_eval'])], verbose=False)
+
+    metrics = module.evaluate(model, split)
+    rmse = model.evals_result()['validation_0']['rmse']
+    return {
+        'trial': trial,
+        'status': 'pruned' if pruner.pruned_at else 'complete',
+        **params,
+        'best_iteration': int(model.best_iteration),
+        'rounds': len(rmse),
+        'pruned_at': pruner.pruned_at or '',
+        'valid_rmse': float(min(rmse)),
+        **{k: metrics[k] for k in METRIC_COLUMNS if k in metrics},
+        'seconds': round(time.perf_counter() - start, 2),
+        'curve': json.dumps(pruner.curve),
+        'finished_at': datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+# ========== 결과 테이블 ==========
+
+def _columns() -> list:
+    return ['trial', 'status'] + list(SEARCH_SPACE) + METRIC_COLUMNS + ['seconds', 'curve', 'finished_at']
+
+
+def read_results(path: Path) -> dict:
+    """trial 번호 → 마지막 기록 (같은 trial이 여러 번 기록되면 나중 것)"""
+    results = {}
+    if not path.exists():
+        return results
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            try:
+                results[int(row['trial'])] = row
+            except (KeyError, ValueError):
+                continue
+    return results
+
+
+def append_result(path: Path, row: dict):
+    new = not path.exists()
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=_columns(), extrasaction='ignore')
+        if new:
+            writer.writeheader()
+        writer.writerow(row)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def reference_curves(results: dict) -> dict:
+    """라운드 → 완료 / 가지치기된 trial들의 검증 RMSE (가지치기 비교 기준)"""
+    reference = {}
+    for row in results.values():
+        if row.get('status') not in DONE_STATUSES:
+            continue
+        for rounds, value in json.loads(row.get('curve') or '{}').items():
+            reference.setdefault(int(rounds), []).append(float(value))
+    return reference
+
+
+def _fmt(row: dict, key: str, spec: str) -> str:
+    try:
+        return format(float(row[key]), spec)
+    except (KeyError, TypeError, ValueError):
+        return '-'
+
+
+def print_table(results: dict, top: int):
+    done = [r for r in results.values() if r.get('status') == 'complete' and r.get('mape') not in (None, '')]
+    done.sort(key=lambda r: float(r['mape']))
+    print(f"\n   {'trial':>5} {'MAPE':>7} {'5%':>6} {'10%':>6} {'15%':>6} {'R²':>7} {'best':>6}  파라미터")
+    for row in done[:top]:
+        params = ', '.join(f"{k}={_fmt(row, k, '.3g')}" for k in SEARCH_SPACE)
+        print(f"   {row['trial']:>5} {_fmt(row, 'mape', '6.2f')}% {_fmt(row, 'within_5', '5.1f')}% "
+              f"{_fmt(row, 'within_10', '5.1f')}% {_fmt(row, 'within_15', '5.1f')}% {_fmt(row, 'r2', '7.4f')} "
+              f"{row.get('best_iteration', '-'):>6}  {params}")
+
+
+def best_params(results: dict, defaults: dict):
+    """검증 MAPE가 가장 낮은 완료 trial의 전체 파라미터 (DEFAULT_PARAMS + 탐색 값)"""
+    done = [r for r in results.values() if r.get('status') == 'complete' and r.get('mape') not in (None, '')]
+    if not done:
+        return None, None
+    row = min(done, key=lambda r: float(r['mape']))
+    params = dict(defaults)
+    for name, (kind, _, _) in SEARCH_SPACE.items():
+        if row.get(name) not in (None, ''):
+            params[name] = int(float(row[name])) if kind == 'int' else float(row[name])
+    return row, params
+
+
+# ========== 실행 ==========
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='하이퍼파라미터 탐색 (병렬 trial + 조기 가지치기 + 재개)')
+    parser.add_argument('--job', required=True, choices=list(TRAINERS))
+    parser.add_argument('--trials', type=int, default=40, help='전체 trial 수 (재개 시 이미 끝난 trial 포함)')
+    parser.add_argument('--study', default=None, help='결과 이름 (기본: <job>_search)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cpus', type=int, default=available_cpus(), help='전체 CPU 예산')
+    parser.add_argument('--workers', type=int, default=None, help='동시 trial 수 (기본: cpus, 최대 trial 수)')
+    parser.add_argument('--valid-size', type=float, default=0.2, help='학습 분할 중 검증 비율')
+    parser.add_argument('--max-rounds', type=int, default=None, help='trial당 최대 부스팅 라운드 (기본: 학습 스크립트 값)')
+    parser.add_argument('--prune-interval', type=int, default=50, help='곡선 기록 / 가지치기 판단 간격 (라운드)')
+    parser.add_argument('--prune-warmup', type=int, default=200, help='이 라운드 전에는 가지치기 안 함')
+    parser.add_argument('--prune-min-trials', type=int, default=4, help='비교 대상 trial 최소 수')
+    parser.add_argument('--top', type=int, default=10, help='결과 표에 보일 상위 trial 수')
+    parser.add_argument('--data-dir', default=str(ROOT / 'data'))
+    parser.add_argument('--cache-dir', default=str(ROOT / 'data' / 'cache' / 'training'))
+    parser.add_argument('--out-dir', default=str(ROOT / 'logs' / 'hparam'))
+    args = parser.parse_args(argv)
+
+    import training_cache
+
+    module = importlib.import_module(TRAINERS[args.job][0])
+    study = args.study or f"{args.job}_search"
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results_path = out_dir / f"{study}.csv"
+    meta_path = out_dir / f"{study}.json"
+    max_rounds = args.max_rounds or module.DEFAULT_PARAMS['n_estimators']
+
+    # 전처리 캐시를 먼저 만들어 워커들이 동시에 다시 계산하지 않게 함
+    df, _ = module.load(args.data_dir, cache_dir=args.cache_dir)
+    data_key = training_cache.cache_key(module.NAME, module.input_paths(args.data_dir), module.PREPROCESS_VERSION)
+
+    meta = {'job': args.job, 'seed': args.seed, 'valid_size': args.valid_size, 'max_rounds': max_rounds,
+            'space': {k: list(v) for k, v in SEARCH_SPACE.items()}, 'data_key': data_key}
+    if meta_path.exists():
+        previous = json.loads(meta_path.read_text(encoding='utf-8'))
+        changed = [k for k in ('job', 'seed', 'valid_size', 'max_rounds', 'space') if previous.get(k) != meta[k]]
+        if changed:
+            parser.error(f"'{study}' 설정이 이전 실행과 다릅니다 ({', '.join(changed)}) - --study로 새 이름을 지정하세요")
+        if previous.get('data_key') != data_key:
+            print("[WARN] 이전 실행 이후 학습 데이터가 바뀌었습니다 - 이전 trial과 검증 지표가 직접 비교되지 않을 수 있습니다")
+    meta_path.write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding='utf-8')
+
+    results = read_results(results_path)
+    todo = [t for t in range(args.trials) if results.get(t, {}).get('status') not in DONE_STATUSES]
+    cpus = max(1, args.cpus)
+    workers = max(1, min(args.workers or cpus, len(todo) or 1))
+    threads = max(1, cpus // workers)
+    prune = {'interval': args.prune_interval, 'warmup': args.prune_warmup, 'min_trials': args.prune_min_trials}
+
+    print("="*80)
+    print(f"🔎 하이퍼파라미터 탐색: {study}")
+    print("="*80)
+    print(f"   작업: {args.job} ({len(df):,}행) | trial: {args.trials} (남은 {len(todo)}) | "
+          f"동시 trial: {workers} × n_jobs {threads}")
+    print(f"   결과: {results_path}")
+    print("="*80)
+
+    start = time.time()
+    interrupted = False
+    if todo:
+        ctx = mp.get_context('spawn')
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                   initargs=(args.job, args.data_dir, args.cache_dir, args.valid_size, args.seed,
+                                             threads))
+        pending = {}
+        try:
+            while todo or pending:
+                # 제출 시점의 앞선 trial 곡선을 기준으로 가지치기 (동시 trial 수만큼만 미리 제출)
+                while todo and len(pending) < workers:
+                    trial = todo.pop(0)
+                    params = sample_params(trial, args.seed, module.DEFAULT_PARAMS)
+                    future = pool.submit(_run_trial, trial, params, reference_curves(results), prune, max_rounds)
+                    pending[future] = (trial, params)
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    trial, params = pending.pop(future)
+                    try:
+                        row = future.result()
+                    except Exception as e:
+                        row = {'trial': trial, 'status': 'failed', **params,
+                               'finished_at': datetime.now().strftime('%Y-%m-%dT%H:%M:%S')}
+                        print(f"   ❌ trial {trial} 실패: {type(e).__name__}: {e}")
+                    append_result(results_path, row)
+                    results[trial] = {k: ('' if v is None else v) for k, v in row.items()}
+                    if row['status'] != 'failed':
+                        mark = '✂️ ' if row['status'] == 'pruned' else '✓'
+                        where = f" (라운드 {row['pruned_at']}에서 중단)" if row['status'] == 'pruned' else ''
+                        print(f"   {mark} trial {trial:>3}: MAPE {row['mape']:.2f}% | 10% 이내 {row['within_10']:.1f}% | "
+                              f"{row['rounds']} 라운드, {row['seconds']:.1f}초{where}")
+        except KeyboardInterrupt:
+            interrupted = True
+            print("\n⚠️ 중단됨 - 완료된 trial은 저장되었습니다. 같은 명령으로 다시 실행하면 이어서 진행합니다.")
+            pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            pool.shutdown()
+
+    # 최종 결과
+    results = read_results(results_path)
+    counts = {s: sum(1 for r in results.values() if r.get('status') == s) for s in ('complete', 'pruned', 'failed')}
+    print("\n" + "="*80)
+    print("📊 탐색 결과 (검증 MAPE 순)")
+    print("="*80)
+    print(f"   완료 {counts['complete']} | 가지치기 {counts['pruned']} | 실패 {counts['failed']} | "
+          f"이번 실행 {(time.time() - start)/60:.1f}분")
+    print_table(results, args.top)
+
+    row, params = best_params(results, module.DEFAULT_PARAMS)
+    if params:
+        best_path = out_dir / f"{study}_best.json"
+        best_path.write_text(json.dumps({args.job: params}, ensure_ascii=False, indent=1), encoding='utf-8')
+        print(f"\n⭐ 최적 trial {row['trial']}: 검증 MAPE {float(row['mape']):.2f}%")
+        print(f"   적용: python scripts/training/train_all_models.py --only {args.job} --params {best_path}")
+    print("="*80)
+    return 130 if interrupted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,109 +1,239 @@
 """
-전체 모델 일괄 학습 스크립트
-1. 제네시스 모델
-2. 일반 국산차 모델 (제네시스 제외)
-3. 수입차 모델 (나중에)
+전체 모델 일괄 학습 스크립트 (병렬 오케스트레이터)
+1. 전처리: 세그먼트별 병합 / 정제를 한 번만 계산해 캐시 (입력 CSV 해시 키, Parquet)
+2. 학습: 국산차 / 수입차 학습을 프로세스 풀로 동시에 실행
+   - 작업별 XGBoost n_jobs를 CPU 예산 안에서 나눠 배정 (행 수 비례, 과다 구독 방지)
+   - 작업별 출력은 logs/training/<작업>.log
+3. 인코더 갱신 (--refresh-encoders): 재학습 없이 저장된 타깃 인코딩 통계에 새 매물 행만 반영
+
+사용:
+    python scripts/training/train_all_models.py
+    python scripts/training/train_all_models.py --only domestic_v12 --cpus 4
+    python scripts/training/train_all_models.py --rebuild-cache
+    python scripts/training/train_all_models.py --refresh-encoders     # 야간 데이터 갱신 후
+    python scripts/training/train_all_models.py --params logs/hparam/domestic_v12_search_best.json
 """
-import subprocess
+import argparse
+import contextlib
+import importlib
+import json
+import multiprocessing as mp
+import os
 import sys
 import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from pathlib import Path
 
-def run_training(script_name, model_name):
-    """학습 스크립트 실행"""
-    print("\n" + "="*80)
-    print(f"🚀 {model_name} 학습 시작...")
-    print("="*80)
-    print(f"⏰ 시작 시각: {datetime.now().strftime('%H:%M:%S')}")
-    print()
-    
-    start_time = time.time()
-    
+TRAINING_DIR = Path(__file__).resolve().parent
+ROOT = TRAINING_DIR.parents[1]
+
+# 작업 이름 → (학습 모듈, 표시 이름)
+# 학습 모듈 인터페이스: NAME, load(data_dir, cache_dir, rebuild), train(df, model_dir, n_jobs, params),
+#                      refresh_encoders(df, model_dir)
+#                      (hparam_search.py용: DEFAULT_PARAMS, prepare_split, build_model, evaluate)
+TRAINERS = {
+    'domestic_v12': ('train_domestic_v12_fuel', '국산차 V12 (연료)'),
+    'imported_v14': ('train_imported_v14_fuel', '수입차 V14 (연료)'),
+}
+
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+def available_cpus() -> int:
     try:
-        result = subprocess.run(
-            [sys.executable, script_name],
-            capture_output=False,
-            text=True,
-            check=True
-        )
-        
-        elapsed = time.time() - start_time
-        print()
-        print("="*80)
-        print(f"✅ {model_name} 학습 완료!")
-        print(f"⏱️ 소요 시간: {elapsed/60:.1f}분")
-        print("="*80)
-        
-        return True
-        
-    except subprocess.CalledProcessError as e:
-        elapsed = time.time() - start_time
-        print()
-        print("="*80)
-        print(f"❌ {model_name} 학습 실패!")
-        print(f"⏱️ 소요 시간: {elapsed/60:.1f}분")
-        print(f"오류: {e}")
-        print("="*80)
-        
-        return False
-
-def main():
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def plan_threads(rows: dict, cpus: int, workers: int) -> dict:
+    """
+    작업별 n_jobs 배정
+
+    동시에 도는 작업(workers >= 작업 수)이면 CPU를 행 수 비례로 나누고(최소 1),
+    작업이 더 많아 순차 대기가 생기면 워커당 균등 몫(cpus // workers)을 준다.
+    어느 쪽이든 동시에 쓰는 스레드 합은 cpus를 넘지 않는다 (작업 수가 cpus보다 많을 때의 최소 1 제외).
+    """
+    names = list(rows)
+    if not names:
+        return {}
+    if workers < len(names):
+        return {name: max(1, cpus // workers) for name in names}
+
+    total = sum(max(rows[n], 1) for n in names)
+    shares = {n: cpus * max(rows[n], 1) / total for n in names}
+    plan = {n: max(1, int(shares[n])) for n in names}
+    # 남는 코어는 소수점 이하가 큰 작업부터
+    spare = cpus - sum(plan.values())
+    for n in sorted(names, key=lambda n: shares[n] - int(shares[n]), reverse=True):
+        if spare <= 0:
+            break
+        plan[n] += 1
+        spare -= 1
+    return plan
+
+
+def _init_worker(threads: int):
+    """워커 프로세스 초기화: 라이브러리 import 전에 스레드 수 제한"""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    sys.path.insert(0, str(TRAINING_DIR))
+
+
+@contextlib.contextmanager
+def _job_log(log_dir: Path, name: str, phase: str):
+    log_dir.mkdir(parents=True, exist_ok=True)
+    with open(log_dir / f"{name}.log", 'a', encoding='utf-8') as f:
+        f.write(f"\n===== {phase} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} =====\n")
+        with contextlib.redirect_stdout(f), contextlib.redirect_stderr(f):
+            yield
+
+
+def _prepare_job(name: str, data_dir: str, cache_dir: str, log_dir: str, rebuild: bool) -> dict:
+    """전처리 (캐시 적중 시 읽기만)"""
+    start = time.perf_counter()
+    with _job_log(Path(log_dir), name, '전처리'):
+        module = importlib.import_module(TRAINERS[name][0])
+        df, hit = module.load(data_dir, cache_dir=cache_dir, rebuild=rebuild)
+    return {'name': name, 'rows': len(df), 'cache_hit': hit, 'seconds': time.perf_counter() - start}
+
+
+def _train_job(name: str, data_dir: str, cache_dir: str, model_dir: str, log_dir: str, n_jobs: int,
+               params: dict = None) -> dict:
+    """캐시된 전처리 결과로 학습 (params: XGBoost 하이퍼파라미터 덮어쓰기)"""
+    start = time.perf_counter()
+    with _job_log(Path(log_dir), name, f'학습 (n_jobs={n_jobs})'):
+        module = importlib.import_module(TRAINERS[name][0])
+        df, _ = module.load(data_dir, cache_dir=cache_dir)
+        _, _, metrics = module.train(df, model_dir=model_dir, n_jobs=n_jobs, params=params)
+    metrics.update(name=name, n_jobs=n_jobs, seconds=time.perf_counter() - start)
+    return metrics
+
+
+def _refresh_job(name: str, data_dir: str, cache_dir: str, model_dir: str, log_dir: str) -> dict:
+    """저장된 인코딩 통계에 새 행만 반영 (모델 재학습 없음)"""
+    start = time.perf_counter()
+    with _job_log(Path(log_dir), name, '인코더 갱신'):
+        module = importlib.import_module(TRAINERS[name][0])
+        df, _ = module.load(data_dir, cache_dir=cache_dir)
+        added = module.refresh_encoders(df, model_dir=model_dir)
+    return {'name': name, 'added': added, 'seconds': time.perf_counter() - start}
+
+
+def _run(pool, fn, jobs: dict, label: str) -> dict:
+    """jobs: 작업 이름 → 인자 튜플. Returns 작업 이름 → 결과 dict (실패 시 error 포함)"""
+    futures = {pool.submit(fn, *args): name for name, args in jobs.items()}
+    results = {}
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            results[name] = future.result()
+            print(f"   ✓ {TRAINERS[name][1]} {label} 완료 ({results[name]['seconds']:.1f}초)")
+        except Exception as e:
+            results[name] = {'name': name, 'error': f"{type(e).__name__}: {e}"}
+            print(f"   ❌ {TRAINERS[name][1]} {label} 실패: {e}")
+            traceback.print_exception(type(e), e, e.__traceback__, limit=3)
+    return results
+
+
+def main(argv=None):
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='모델 일괄 학습 (전처리 캐시 + 병렬 학습)')
+    parser.add_argument('--only', default=','.join(TRAINERS), help=f"학습할 작업 (쉼표 구분): {', '.join(TRAINERS)}")
+    parser.add_argument('--cpus', type=int, default=available_cpus(), help='전체 CPU 예산 (기본: 사용 가능 코어 수)')
+    parser.add_argument('--workers', type=int, default=None, help='동시 작업 수 (기본: min(작업 수, cpus))')
+    parser.add_argument('--data-dir', default=str(ROOT / 'data'))
+    parser.add_argument('--model-dir', default=str(ROOT / 'models'))
+    parser.add_argument('--cache-dir', default=str(ROOT / 'data' / 'cache' / 'training'))
+    parser.add_argument('--log-dir', default=str(ROOT / 'logs' / 'training'))
+    parser.add_argument('--rebuild-cache', action='store_true', help='전처리 캐시를 무시하고 다시 계산')
+    parser.add_argument('--refresh-encoders', action='store_true',
+                        help='학습 없이 타깃 인코딩 통계에 새 매물 행만 반영해 인코더 갱신')
+    parser.add_argument('--params', default=None,
+                        help='작업별 하이퍼파라미터 JSON ({작업: {파라미터: 값}}, hparam_search.py의 *_best.json)')
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(',') if n.strip()]
+    unknown = [n for n in names if n not in TRAINERS]
+    if unknown:
+        parser.error(f"알 수 없는 작업: {', '.join(unknown)} (가능: {', '.join(TRAINERS)})")
+    params = {}
+    if args.params:
+        with open(args.params, encoding='utf-8') as f:
+            params = json.load(f)
+
+    cpus = max(1, args.cpus)
+    workers = max(1, min(args.workers or cpus, len(names)))
+    per_worker = max(1, cpus // workers)
+
     print("="*80)
     print("🎯 중고차 가격 예측 모델 일괄 학습")
     print("="*80)
     print(f"⏰ 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"   작업: {', '.join(names)} | CPU 예산: {cpus} | 동시 작업: {workers}")
+    print(f"   로그: {args.log_dir}")
+    if params:
+        print(f"   하이퍼파라미터: {args.params} ({', '.join(n for n in names if n in params) or '해당 작업 없음'})")
     print("="*80)
-    
+
     total_start = time.time()
-    results = {}
-    
-    # 1. 제네시스 모델 (최종 버전)
-    results['제네시스'] = run_training('train_genesis_ultimate.py', '제네시스 최종 모델')
-    time.sleep(2)
-    
-    # 2. 일반 국산차 모델 (최종 버전)
-    results['국산차'] = run_training('train_domestic_ultimate.py', '국산차 최종 모델')
-    time.sleep(2)
-    
-    # 3. 수입차 모델 (최종 버전)
-    results['수입차'] = run_training('train_imported_ultimate.py', '수입차 최종 모델')
-    
+    ctx = mp.get_context('spawn')  # 부모의 스레드 풀 상태를 물려받지 않도록
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(per_worker,)) as pool:
+        print("\n📦 전처리 (캐시)...")
+        prepared = _run(pool, _prepare_job, {
+            n: (n, args.data_dir, args.cache_dir, args.log_dir, args.rebuild_cache) for n in names
+        }, '전처리')
+
+        ready = {n: r['rows'] for n, r in prepared.items() if 'error' not in r}
+        if args.refresh_encoders:
+            print("\n🔁 인코더 갱신...")
+            refreshed = _run(pool, _refresh_job, {
+                n: (n, args.data_dir, args.cache_dir, args.model_dir, args.log_dir) for n in ready
+            }, '인코더 갱신')
+            for name in names:
+                result = refreshed.get(name) or prepared.get(name, {})
+                status = f"❌ {result['error']}" if 'error' in result else f"✅ 새 행 {result['added']:,}개"
+                print(f"   {name:18s} {status}")
+            return 1 if any('error' in r for r in list(prepared.values()) + list(refreshed.values())) else 0
+
+        plan = plan_threads(ready, cpus, workers)
+        print(f"\n🔥 학습... (n_jobs 배정: {', '.join(f'{n}={t}' for n, t in plan.items()) or '-'})")
+        trained = _run(pool, _train_job, {
+            n: (n, args.data_dir, args.cache_dir, args.model_dir, args.log_dir, plan[n], params.get(n))
+            for n in ready
+        }, '학습')
+
     # 최종 결과
     total_elapsed = time.time() - total_start
-    
+
     print("\n\n")
     print("="*80)
     print("📊 전체 학습 결과")
     print("="*80)
     print()
-    
-    for model_name, success in results.items():
-        status = "✅ 성공" if success else "❌ 실패"
-        print(f"   {model_name:15s}: {status}")
-    
+    print(f"   {'작업':18s} {'상태':6s} {'전처리':8s} {'행 수':>9s} {'n_jobs':>6s} {'학습(초)':>9s} {'MAPE':>7s} {'R²':>7s}")
+    failed = []
+    for name in names:
+        prep = prepared.get(name, {})
+        result = trained.get(name) or prep
+        if 'error' in result:
+            failed.append(name)
+            print(f"   {name:18s} ❌ 실패  {result['error']}")
+            continue
+        cache = '캐시' if prep.get('cache_hit') else '계산'
+        print(f"   {name:18s} ✅ 성공  {cache:8s} {result['rows']:>9,} {result['n_jobs']:>6} "
+              f"{result['seconds']:>9.1f} {result['mape']:>6.1f}% {result['r2']:>7.4f}")
+
+    job_seconds = sum(r.get('seconds', 0) for r in list(prepared.values()) + list(trained.values()))
     print()
-    print(f"⏱️ 총 소요 시간: {total_elapsed/60:.1f}분")
+    print(f"⏱️ 총 소요 시간: {total_elapsed/60:.1f}분 (작업 시간 합계 {job_seconds/60:.1f}분)")
     print(f"⏰ 완료 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*80)
-    
-    # 성공한 모델 목록
-    success_models = [name for name, success in results.items() if success]
-    if success_models:
-        print()
-        print("✅ 학습 완료된 모델:")
-        for model_name in success_models:
-            print(f"   - {model_name}")
-    
-    # 실패한 모델 목록
-    failed_models = [name for name, success in results.items() if not success]
-    if failed_models:
-        print()
-        print("❌ 학습 실패한 모델:")
-        for model_name in failed_models:
-            print(f"   - {model_name}")
-    
-    print("="*80)
+    return 1 if failed else 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -2,7 +2,17 @@
 V12: FuelType 추가 학습
 ========================
 V11 기반 + FuelType 피처 추가
+피처 생성은 서빙과 같은 피처 파이프라인(ml-service/services/feature_pipeline.py) 사용
+전처리(병합 / 정제) 결과는 training_cache로 캐시되며,
+train_all_models.py가 preprocess() / train()을, hparam_search.py가 prepare_split() / build_model() / evaluate()를
+병렬 작업으로 호출한다.
+타깃 인코딩: 학습 피처는 K-fold Out-of-Fold, 서빙 인코더는 전체 행 통계 (TargetEncoderStats)
+통계는 models/domestic_v12_te_stats.*에 저장되어 refresh_encoders()로 새 매물만 증분 반영
 """
+import os
+import sys
+import time
+from pathlib import Path
 import pandas as pd
 import numpy as np
 import xgboost as xgb
@@ -12,112 +22,30 @@ from sklearn.metrics import mean_absolute_error, r2_score
 import warnings
 warnings.filterwarnings('ignore')
 
-print("="*70)
-print("🚗 V12: FuelType 포함 학습")
-print("="*70)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'ml-service'))
+from services.feature_pipeline import FeaturePipeline, OPTION_COLUMNS, encoder_keys, normalize_fuel
+from services.target_encoding import TargetEncoderStats
+import training_cache
 
-# ========== 1. 데이터 로드 ==========
-df = pd.read_csv('../../data/encar_raw_domestic.csv')
-df_detail = pd.read_csv('../../data/complete_domestic_details.csv')
-df = df.merge(df_detail, left_on='Id', right_on='car_id', how='inner')
-df = df.dropna(subset=['Price', 'Mileage', 'Year', 'Model', 'FuelType'])
+ROOT = Path(__file__).resolve().parents[2]
+DATA_DIR = ROOT / 'data'
+MODEL_DIR = ROOT / 'models'
+
+NAME = 'domestic_v12'
+INPUT_FILES = ('encar_raw_domestic.csv', 'complete_domestic_details.csv')
+PREPROCESS_VERSION = 2
 
 # 이상치 필터링 (가격)
 PRICE_MIN = 100      # 100만원 이상
 PRICE_MAX = 50000    # 5억 이하
 SPECIAL_PRICES = {9999, 8888, 7777, 6666, 5555, 1111, 10000, 1234, 4321}  # 특수 가격
 
-df = df[(df['Price'] >= PRICE_MIN) & (df['Price'] <= PRICE_MAX)]
-df = df[~df['Price'].isin(SPECIAL_PRICES)]  # 특수 가격 제거 (가격 미정 등)
-df = df[df['Mileage'] < 300000]
-df = df.drop_duplicates(subset=['Model', 'Year', 'Mileage', 'Price'])
-df['YearOnly'] = (df['Year'] // 100).astype(int)
-df['Age'] = 2025 - df['YearOnly']
-df['Km_per_Year'] = df['Mileage'] / (df['Age'] + 1)
-df = df[df['Km_per_Year'] <= 40000]
-print(f"원본 데이터: {len(df):,}행")
-
-# ========== 2. FuelType 처리 ==========
-print("\n⛽ FuelType 처리...")
-# 연료 타입 정규화
-def normalize_fuel(f):
-    f = str(f).lower()
-    if '하이브리드' in f or '전기' in f:
-        return '하이브리드'
-    elif 'lpg' in f:
-        return 'LPG'
-    elif '디젤' in f:
-        return '디젤'
-    else:
-        return '가솔린'
-
-df['Fuel'] = df['FuelType'].apply(normalize_fuel)
-fuel_dist = df['Fuel'].value_counts()
-print("연료 분포:")
-for fuel, cnt in fuel_dist.items():
-    print(f"   {fuel}: {cnt:,}개 ({cnt/len(df)*100:.1f}%)")
-
-# ========== 3. 아웃라이어 제거 ==========
-print("\n🔍 아웃라이어 제거...")
-df['Model_Year'] = df['Model'] + '_' + df['YearOnly'].astype(str)
-model_year_stats = df.groupby('Model_Year')['Price'].agg(['mean', 'std', 'count'])
-df = df.merge(model_year_stats[['mean', 'std']], left_on='Model_Year', right_index=True, suffixes=('', '_my'))
-df['z_score'] = np.abs(df['Price'] - df['mean']) / (df['std'] + 1)
-df = df[df['z_score'] <= 1.0].copy()
-print(f"정제 후: {len(df):,}행")
-
-# ========== 4. 피처 엔지니어링 ==========
-def get_mg(m):
-    if m < 30000: return 'A'
-    elif m < 60000: return 'B'
-    elif m < 100000: return 'C'
-    elif m < 150000: return 'D'
-    return 'E'
-df['MG'] = df['Mileage'].apply(get_mg)
-df['Model_Year_MG'] = df['Model_Year'] + '_' + df['MG']
-
-# Target Encoding
-model_enc = df.groupby('Model')['Price'].mean()
-model_year_enc = df.groupby('Model_Year')['Price'].mean()
-model_year_mg_enc = df.groupby('Model_Year_MG')['Price'].mean()
-brand_enc = df.groupby('Manufacturer')['Price'].mean()
-fuel_enc = df.groupby('Fuel')['Price'].mean()  # 연료별 평균 가격
-
-df['Model_enc'] = df['Model'].map(model_enc).fillna(df['Price'].mean())
-df['Model_Year_enc'] = df['Model_Year'].map(model_year_enc).fillna(df['Model_enc'])
-df['Model_Year_MG_enc'] = df['Model_Year_MG'].map(model_year_mg_enc).fillna(df['Model_Year_enc'])
-df['Brand_enc'] = df['Manufacturer'].map(brand_enc).fillna(df['Price'].mean())
-df['Fuel_enc'] = df['Fuel'].map(fuel_enc).fillna(df['Price'].mean())  # 연료 인코딩
-
-# 연료 원핫 인코딩 (추가)
-df['is_diesel'] = (df['Fuel'] == '디젤').astype(int)
-df['is_hybrid'] = (df['Fuel'] == '하이브리드').astype(int)
-df['is_lpg'] = (df['Fuel'] == 'LPG').astype(int)
-
-df['Age_log'] = np.log1p(df['Age'])
-df['Mile_log'] = np.log1p(df['Mileage'])
-df['Age_sq'] = df['Age'] ** 2
-
-# 상태
-df['is_accident_free'] = df['is_accident_free'].fillna(0).astype(int)
-grade_map = {'normal': 0, 'good': 1, 'excellent': 2}
-df['inspection_grade_enc'] = df['inspection_grade'].map(grade_map).fillna(0)
-
-# 옵션
-opt_cols = ['has_sunroof','has_leather_seat','has_led_lamp','has_smart_key',
-            'has_navigation','has_heated_seat','has_ventilated_seat','has_rear_camera']
-for c in opt_cols:
-    df[c] = df[c].fillna(0).astype(int) if c in df.columns else 0
-df['Opt_Count'] = sum(df[c] for c in opt_cols)
-df['Opt_Premium'] = (df['has_sunroof']*3 + df['has_leather_seat']*2 + 
-                     df['has_ventilated_seat']*3 + df['has_led_lamp']*2)
-
-# ========== 5. Train/Test ==========
-train_df, test_df = train_test_split(df, test_size=0.2, random_state=42)
-print(f"\n✓ Train: {len(train_df):,}행, Test: {len(test_df):,}행")
-
-# ========== 6. 피처 (FuelType 추가!) ==========
-features = [
+# 캐시에 남기는 컬럼 (피처 파이프라인 표준 컬럼 + 타깃)
+CACHE_COLUMNS = ['Id', 'brand', 'model', 'year', 'mileage', 'fuel', 'Fuel', 'Price',
+                 'is_accident_free', 'inspection_grade'] + OPTION_COLUMNS
+
+FEATURES = [
     'Model_enc', 'Model_Year_enc', 'Model_Year_MG_enc', 'Brand_enc',
     'Fuel_enc', 'is_diesel', 'is_hybrid', 'is_lpg',  # 연료 피처 추가!
     'Age', 'Age_log', 'Age_sq',
@@ -129,122 +57,239 @@ features = [
 ]
 
 # 단조제약 (연료는 제약 없음, 옵션은 양의 효과)
-mono = (0,0,0,0, 0,0,0,0, 0,0,0, 0,0,0, 1,1, 1,1, 1,1,1,1,1,1,1,1)
-
-X_train = train_df[features]
-y_train = np.log1p(train_df['Price'])
-X_test = test_df[features]
-y_test = np.log1p(test_df['Price'])
-
-# ========== 7. 학습 ==========
-print("\n🔥 학습...")
-model = xgb.XGBRegressor(
-    n_estimators=2000,
-    max_depth=9,
-    learning_rate=0.02,
-    subsample=0.8,
-    colsample_bytree=0.8,
-    min_child_weight=3,
-    monotone_constraints=mono,
-    early_stopping_rounds=100,
-    random_state=42,
-    verbosity=1
-)
-model.fit(X_train, y_train, eval_set=[(X_test, y_test)], verbose=200)
-
-# ========== 8. 평가 ==========
-print("\n" + "="*70)
-print("📈 평가")
-print("="*70)
-
-pred = np.expm1(model.predict(X_test))
-actual = test_df['Price'].values
-mae = mean_absolute_error(actual, pred)
-mape = np.mean(np.abs(actual - pred) / actual) * 100
-r2 = r2_score(y_test, model.predict(X_test))
-
-print(f"✓ R²: {r2:.4f}")
-print(f"✓ MAE: {mae:.0f}만원")
-print(f"✓ MAPE: {mape:.1f}%")
-
-errors = np.abs(actual - pred) / actual * 100
-print(f"\n📊 오차 분포:")
-print(f"   5% 이내: {np.mean(errors <= 5)*100:.1f}%")
-print(f"   10% 이내: {np.mean(errors <= 10)*100:.1f}%")
-print(f"   15% 이내: {np.mean(errors <= 15)*100:.1f}%")
-
-print("\n⭐ Feature Importance (상위 15):")
-for f,i in sorted(zip(features, model.feature_importances_), key=lambda x:-x[1])[:15]:
-    print(f"   {f}: {i:.4f}")
-
-# ========== 9. 저장 ==========
-joblib.dump(model, '../../models/domestic_v12.pkl')
-joblib.dump(features, '../../models/domestic_v12_features.pkl')
-joblib.dump({
-    'model_enc': model_enc.to_dict(),
-    'model_year_enc': model_year_enc.to_dict(),
-    'model_year_mg_enc': model_year_mg_enc.to_dict(),
-    'brand_enc': brand_enc.to_dict(),
-    'fuel_enc': fuel_enc.to_dict(),  # 연료 인코딩 저장!
-}, '../../models/domestic_v12_encoders.pkl')
-print("✅ 저장 완료!")
-
-# ========== 10. 테스트 ==========
-print("\n" + "="*70)
-print("🧪 연료별 테스트")
-print("="*70)
-
-def predict_v12(name, year, mileage, fuel='가솔린', opts=None, accident_free=1, grade='normal'):
-    age = 2025 - year
-    mg = get_mg(mileage)
-    my = f"{name}_{year}"
-    mymg = f"{my}_{mg}"
-    grade_enc_val = {'normal':0, 'good':1, 'excellent':2}.get(grade, 0)
-    
-    opt_values = opts if opts else {}
-    opt_count = sum(opt_values.get(c, 0) for c in opt_cols)
-    opt_premium = (opt_values.get('has_sunroof',0)*3 + opt_values.get('has_leather_seat',0)*2 +
-                   opt_values.get('has_ventilated_seat',0)*3 + opt_values.get('has_led_lamp',0)*2)
-    
-    f = {
-        'Model_enc': model_enc.get(name, 2500),
-        'Model_Year_enc': model_year_enc.get(my, model_enc.get(name, 2500)),
-        'Model_Year_MG_enc': model_year_mg_enc.get(mymg, model_year_enc.get(my, 2500)),
-        'Brand_enc': brand_enc.get('현대', 2500),
-        'Fuel_enc': fuel_enc.get(fuel, 2500),
-        'is_diesel': 1 if fuel == '디젤' else 0,
-        'is_hybrid': 1 if fuel == '하이브리드' else 0,
-        'is_lpg': 1 if fuel == 'LPG' else 0,
-        'Age': age, 'Age_log': np.log1p(age), 'Age_sq': age**2,
-        'Mileage': mileage, 'Mile_log': np.log1p(mileage),
-        'Km_per_Year': mileage/(age+1),
-        'is_accident_free': accident_free,
-        'inspection_grade_enc': grade_enc_val,
-        'Opt_Count': opt_count,
-        'Opt_Premium': opt_premium,
-        **{c: opt_values.get(c, 0) for c in opt_cols}
+MONO = (0,0,0,0, 0,0,0,0, 0,0,0, 0,0,0, 1,1, 1,1, 1,1,1,1,1,1,1,1)
+
+# XGBoost 기본 하이퍼파라미터 (hparam_search.py 결과는 train(params=...)로 덮어씀)
+DEFAULT_PARAMS = {
+    'n_estimators': 2000,
+    'max_depth': 9,
+    'learning_rate': 0.02,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'min_child_weight': 3,
+}
+EARLY_STOPPING_ROUNDS = 100
+
+# 오차 구간 (실제가 대비 %)
+ERROR_BANDS = (5, 10, 15)
+
+
+def input_paths(data_dir=DATA_DIR):
+    return [Path(data_dir) / f for f in INPUT_FILES]
+
+
+def preprocess(data_dir=DATA_DIR):
+    """원본 병합 → 정제. Returns 정제된 DataFrame (표준 컬럼)"""
+    # ========== 1. 데이터 로드 ==========
+    raw_path, detail_path = input_paths(data_dir)
+    df = pd.read_csv(raw_path)
+    df_detail = pd.read_csv(detail_path)
+    df = df.merge(df_detail, left_on='Id', right_on='car_id', how='inner')
+    df = df.dropna(subset=['Price', 'Mileage', 'Year', 'Model', 'FuelType'])
+
+    df = df[(df['Price'] >= PRICE_MIN) & (df['Price'] <= PRICE_MAX)]
+    df = df[~df['Price'].isin(SPECIAL_PRICES)]  # 특수 가격 제거 (가격 미정 등)
+    df = df[df['Mileage'] < 300000]
+    df = df.drop_duplicates(subset=['Model', 'Year', 'Mileage', 'Price'])
+    df['YearOnly'] = (df['Year'] // 100).astype(int)
+    df['Age'] = 2025 - df['YearOnly']
+    df['Km_per_Year'] = df['Mileage'] / (df['Age'] + 1)
+    df = df[df['Km_per_Year'] <= 40000]
+
+    # 피처 파이프라인 표준 컬럼
+    df['brand'] = df['Manufacturer']
+    df['model'] = df['Model']
+    df['year'] = df['YearOnly']
+    df['mileage'] = df['Mileage']
+    df['fuel'] = df['FuelType']
+    print(f"원본 데이터: {len(df):,}행")
+
+    # ========== 2. FuelType 처리 ==========
+    print("\n⛽ FuelType 처리...")
+    df['Fuel'] = df['FuelType'].map(normalize_fuel)
+    fuel_dist = df['Fuel'].value_counts()
+    print("연료 분포:")
+    for fuel, cnt in fuel_dist.items():
+        print(f"   {fuel}: {cnt:,}개 ({cnt/len(df)*100:.1f}%)")
+
+    # ========== 3. 아웃라이어 제거 ==========
+    print("\n🔍 아웃라이어 제거...")
+    df['Model_Year'] = encoder_keys(df, include_class=False)['model_year']
+    model_year_stats = df.groupby('Model_Year')['Price'].agg(['mean', 'std', 'count'])
+    df = df.merge(model_year_stats[['mean', 'std']], left_on='Model_Year', right_index=True, suffixes=('', '_my'))
+    df['z_score'] = np.abs(df['Price'] - df['mean']) / (df['std'] + 1)
+    df = df[df['z_score'] <= 1.0].copy()
+    print(f"정제 후: {len(df):,}행")
+    return df[[c for c in CACHE_COLUMNS if c in df.columns]]
+
+
+def load(data_dir=DATA_DIR, cache_dir=None, rebuild=False):
+    """캐시된 전처리 결과 (없으면 preprocess 후 저장). Returns (DataFrame, 캐시 적중 여부)"""
+    return training_cache.load_or_build(NAME, input_paths(data_dir), lambda: preprocess(data_dir),
+                                        version=PREPROCESS_VERSION, cache_dir=cache_dir, rebuild=rebuild)
+
+
+def encoder_stats(df):
+    """전체 행 타깃 인코딩 통계 (서빙 인코더)"""
+    stats = TargetEncoderStats()
+    stats.update(encoder_keys(df, include_class=False), df['Price'], ids=df['Id'])
+    return stats
+
+
+def prepare_split(fit_df, eval_df):
+    """
+    학습 / 평가 행렬 (타깃 인코딩: 학습 행은 자기 폴드를 뺀 통계(Out-of-Fold), 평가 행은 학습 행 전체 통계)
+
+    Returns:
+        {'X_fit', 'y_fit', 'X_eval', 'y_eval', 'eval_df'}
+    """
+    # 모델 / 모델_연식 / 모델_연식_주행구간 / 브랜드 / 연료별 평균 가격
+    keys = encoder_keys(fit_df, include_class=False)
+    stats = TargetEncoderStats()
+    oof = stats.out_of_fold(keys, fit_df['Price'])
+    stats.update(keys, fit_df['Price'])
+
+    pipeline = FeaturePipeline('domestic', FEATURES, stats.encoders())
+    return {
+        'X_fit': pipeline.transform(fit_df, encodings=oof), 'y_fit': np.log1p(fit_df['Price']),
+        'X_eval': pipeline.transform(eval_df), 'y_eval': np.log1p(eval_df['Price']), 'eval_df': eval_df,
+    }
+
+
+def build_model(params=None, n_jobs=None, callbacks=None):
+    """DEFAULT_PARAMS에 params를 덮어쓴 XGBRegressor (단조제약 / 조기 종료 포함)"""
+    return xgb.XGBRegressor(
+        **{**DEFAULT_PARAMS, **(params or {})},
+        monotone_constraints=MONO,
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+        random_state=42,
+        n_jobs=n_jobs,
+        callbacks=callbacks,
+        verbosity=1
+    )
+
+
+def evaluate(model, split):
+    """평가 행 지표: R² / MAE / MAPE / 오차 구간(5·10·15% 이내 비율)"""
+    pred_log = model.predict(split['X_eval'])
+    pred = np.expm1(pred_log)
+    actual = split['eval_df']['Price'].values
+    errors = np.abs(actual - pred) / actual * 100
+    return {
+        'r2': float(r2_score(split['y_eval'], pred_log)),
+        'mae': float(mean_absolute_error(actual, pred)),
+        'mape': float(np.mean(errors)),
+        **{f'within_{band}': float(np.mean(errors <= band) * 100) for band in ERROR_BANDS},
     }
-    
-    return np.expm1(model.predict(pd.DataFrame([f])[features])[0])
-
-print("\n1️⃣ 연료별 가격 비교 (그랜저 2022년 3만km):")
-print("-"*60)
-base_gasoline = predict_v12('더 뉴 그랜저 IG', 2022, 30000, '가솔린')
-for fuel in ['가솔린', '디젤', '하이브리드', 'LPG']:
-    p = predict_v12('더 뉴 그랜저 IG', 2022, 30000, fuel)
-    diff = p - base_gasoline
-    print(f"   {fuel:10}: {p:,.0f}만원 ({diff:+,.0f})")
-
-print("\n2️⃣ 옵션 효과 (가솔린):")
-print("-"*60)
-no_opt = predict_v12('더 뉴 그랜저 IG', 2022, 30000, '가솔린', {})
-full_opt = predict_v12('더 뉴 그랜저 IG', 2022, 30000, '가솔린',
-    {'has_sunroof':1,'has_leather_seat':1,'has_led_lamp':1,'has_smart_key':1,
-     'has_ventilated_seat':1,'has_heated_seat':1,'has_navigation':1,'has_rear_camera':1})
-print(f"   노옵션: {no_opt:,.0f}만원")
-print(f"   풀옵션: {full_opt:,.0f}만원")
-print(f"   차이: +{full_opt - no_opt:,.0f}만원")
-
-print("\n" + "="*70)
-print("✅ V12 완료!")
-print("="*70)
+
+
+def train(df, model_dir=MODEL_DIR, n_jobs=None, params=None, verbose=200):
+    """학습 + 평가 + 저장. Returns (model, pipeline, metrics)"""
+    start = time.perf_counter()
+
+    # ========== 4. Train/Test ==========
+    train_df, test_df = train_test_split(df, test_size=0.2, random_state=42)
+    print(f"\n✓ Train: {len(train_df):,}행, Test: {len(test_df):,}행")
+
+    # ========== 5~6. Target Encoding / 피처 (FuelType 추가!) ==========
+    split = prepare_split(train_df, test_df)
+
+    # ========== 7. 학습 ==========
+    print(f"\n🔥 학습... (n_jobs={n_jobs or 'auto'})")
+    model = build_model(params, n_jobs)
+    model.fit(split['X_fit'], split['y_fit'], eval_set=[(split['X_eval'], split['y_eval'])], verbose=verbose)
+
+    # ========== 8. 평가 ==========
+    print("\n" + "="*70)
+    print("📈 평가")
+    print("="*70)
+
+    metrics = evaluate(model, split)
+    print(f"✓ R²: {metrics['r2']:.4f}")
+    print(f"✓ MAE: {metrics['mae']:.0f}만원")
+    print(f"✓ MAPE: {metrics['mape']:.1f}%")
+
+    print(f"\n📊 오차 분포:")
+    for band in ERROR_BANDS:
+        print(f"   {band}% 이내: {metrics[f'within_{band}']:.1f}%")
+
+    print("\n⭐ Feature Importance (상위 15):")
+    for f,i in sorted(zip(FEATURES, model.feature_importances_), key=lambda x:-x[1])[:15]:
+        print(f"   {f}: {i:.4f}")
+
+    # ========== 9. 저장 ==========
+    # 서빙 인코더는 평가 후 전체 행 통계로 (학습에 쓰지 않은 평가 행도 반영)
+    stats = encoder_stats(df)
+    encoders = stats.encoders()
+    pipeline = FeaturePipeline('domestic', FEATURES, encoders)
+    model_dir = Path(model_dir)
+    joblib.dump(model, model_dir / 'domestic_v12.pkl')
+    joblib.dump(FEATURES, model_dir / 'domestic_v12_features.pkl')
+    joblib.dump(encoders, model_dir / 'domestic_v12_encoders.pkl')  # 연료 인코딩 + global_mean 포함
+    stats.save(model_dir / 'domestic_v12_te_stats')
+    print("✅ 저장 완료!")
+
+    metrics.update(rows=len(df), best_iteration=int(model.best_iteration), seconds=time.perf_counter() - start)
+    return model, pipeline, metrics
+
+
+def refresh_encoders(df, model_dir=MODEL_DIR) -> int:
+    """
+    저장된 인코딩 통계에 새 매물(Id > 워터마크)만 반영해 서빙 인코더 갱신 (모델 재학습 없음)
+
+    Returns:
+        반영한 행 수
+    """
+    model_dir = Path(model_dir)
+    stats = TargetEncoderStats.load(model_dir / 'domestic_v12_te_stats')
+    added = stats.update(encoder_keys(df, include_class=False), df['Price'], ids=df['Id'])
+    if added:
+        joblib.dump(stats.encoders(), model_dir / 'domestic_v12_encoders.pkl')
+        stats.save(model_dir / 'domestic_v12_te_stats')
+    print(f"✓ {NAME} 인코더 갱신: 새 행 {added:,}개 (누적 {len(stats):,}행)")
+    return added
+
+
+def main():
+    print("="*70)
+    print("🚗 V12: FuelType 포함 학습")
+    print("="*70)
+
+    df, _ = load()
+    model, pipeline, _ = train(df)
+
+    # ========== 10. 테스트 ==========
+    print("\n" + "="*70)
+    print("🧪 연료별 테스트")
+    print("="*70)
+
+    def predict_v12(name, year, mileage, fuel='가솔린', opts=None, accident_free=1, grade='normal'):
+        row = pipeline.row({'brand': '현대', 'model': name, 'year': year, 'mileage': mileage, 'fuel': fuel,
+                            'options': opts or {}, 'is_accident_free': accident_free, 'inspection_grade': grade})
+        return np.expm1(model.predict(np.array([row]))[0])
+
+    print("\n1️⃣ 연료별 가격 비교 (그랜저 2022년 3만km):")
+    print("-"*60)
+    base_gasoline = predict_v12('더 뉴 그랜저 IG', 2022, 30000, '가솔린')
+    for fuel in ['가솔린', '디젤', '하이브리드', 'LPG']:
+        p = predict_v12('더 뉴 그랜저 IG', 2022, 30000, fuel)
+        diff = p - base_gasoline
+        print(f"   {fuel:10}: {p:,.0f}만원 ({diff:+,.0f})")
+
+    print("\n2️⃣ 옵션 효과 (가솔린):")
+    print("-"*60)
+    no_opt = predict_v12('더 뉴 그랜저 IG', 2022, 30000, '가솔린', {})
+    full_opt = predict_v12('더 뉴 그랜저 IG', 2022, 30000, '가솔린',
+        {'has_sunroof':1,'has_leather_seat':1,'has_led_lamp':1,'has_smart_key':1,
+         'has_ventilated_seat':1,'has_heated_seat':1,'has_navigation':1,'has_rear_camera':1})
+    print(f"   노옵션: {no_opt:,.0f}만원")
+    print(f"   풀옵션: {full_opt:,.0f}만원")
+    print(f"   차이: +{full_opt - no_opt:,.0f}만원")
+
+    print("\n" + "="*70)
+    print("✅ V12 완료!")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
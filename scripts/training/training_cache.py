@@ -0,0 +1,122 @@
+"""
+학습 전처리 캐시
+================
+원본 CSV 병합 → 정제(이상치 / z-score)까지의 결과를 한 번만 계산해 저장한다.
+(타깃 인코딩은 학습 분할 후 TargetEncoderStats로 계산 - Out-of-Fold)
+- 키: 입력 파일 내용 해시 + 전처리 버전 + FEATURE_PIPELINE_VERSION
+  (CSV나 전처리 규칙이 바뀌면 자동으로 새로 계산)
+- 형식: Parquet (pyarrow, 컬럼 단위) - pyarrow가 없으면 pickle로 대체
+- 저장은 임시 파일 → rename (동시에 실행된 학습 작업이 반쯤 쓰인 파일을 읽지 않도록)
+
+사용:
+    df, hit = load_or_build('domestic_v12', inputs, preprocess, version=1)
+"""
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Tuple
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / 'ml-service'))
+from services.feature_pipeline import FEATURE_PIPELINE_VERSION
+
+DEFAULT_CACHE_DIR = ROOT / 'data' / 'cache' / 'training'
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+    print("[WARN] pyarrow 미설치 - 전처리 캐시를 pickle로 저장합니다")
+
+
+def file_digest(path, chunk_size: int = 1 << 20) -> str:
+    """파일 내용 해시 (blake2b)"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(name: str, inputs: Iterable, version) -> str:
+    """전처리 결과 키: 입력 파일 해시 + 전처리 버전 + 피처 파이프라인 버전"""
+    h = hashlib.blake2b(digest_size=10)
+    h.update(f"{name}|v{version}|fp{FEATURE_PIPELINE_VERSION}".encode())
+    for path in inputs:
+        h.update(f"|{Path(path).name}:{file_digest(path)}".encode())
+    return h.hexdigest()
+
+
+def _cache_path(cache_dir: Path, name: str, key: str) -> Path:
+    suffix = 'parquet' if PARQUET_AVAILABLE else 'pkl'
+    return Path(cache_dir) / f"{name}_{key}.{suffix}"
+
+
+def _read(path: Path) -> pd.DataFrame:
+    if not PARQUET_AVAILABLE:
+        return pd.read_pickle(path)
+    return pq.read_table(path).to_pandas()
+
+
+def _write(path: Path, df: pd.DataFrame):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if PARQUET_AVAILABLE:
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def _prune(cache_dir: Path, name: str, keep: Path):
+    """같은 이름의 오래된 캐시 삭제 (입력이 바뀌면 이전 결과는 다시 쓰이지 않음)"""
+    for old in Path(cache_dir).glob(f"{name}_*.*"):
+        if old != keep and not old.name.startswith('.'):
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+def load_or_build(name: str, inputs: Iterable, build: Callable[[], pd.DataFrame],
+                  version=1, cache_dir: Optional[Path] = None,
+                  rebuild: bool = False) -> Tuple[pd.DataFrame, bool]:
+    """
+    캐시된 전처리 결과를 읽거나, 없으면 build()로 만들어 저장
+
+    Args:
+        name: 전처리 이름 (예: 'domestic_v12')
+        inputs: 결과에 영향을 주는 입력 파일 경로들
+        build: () -> 정제된 DataFrame
+        version: 전처리 규칙 버전 (규칙을 바꾸면 올림)
+        rebuild: True면 캐시를 무시하고 다시 계산
+
+    Returns:
+        (DataFrame, 캐시 적중 여부)
+    """
+    cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+    path = _cache_path(cache_dir, name, cache_key(name, list(inputs), version))
+
+    if path.exists() and not rebuild:
+        try:
+            df = _read(path)
+            print(f"✓ 전처리 캐시 사용: {path.name} ({len(df):,}행)")
+            return df, True
+        except Exception as e:
+            print(f"[WARN] 전처리 캐시 읽기 실패, 다시 계산: {e}")
+
+    start = time.perf_counter()
+    df = build().reset_index(drop=True)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _write(path, df)
+        _prune(cache_dir, name, path)
+        print(f"✓ 전처리 캐시 저장: {path.name} ({len(df):,}행, {time.perf_counter() - start:.1f}초)")
+    except Exception as e:
+        print(f"[WARN] 전처리 캐시 저장 실패: {e}")
+    return df, False